@@ -0,0 +1,155 @@
+import argparse
+import hashlib
+import os
+import struct
+import pygame
+from config import *
+from assets import asset_cache
+from game_objects import (BACKGROUND_IMAGE_PATH, SHIP_IMAGE_PATH, BULLET_IMAGE_PATH, ASTEROID_IMAGES,
+                          EXPLOSION_IMAGES)
+import text_cache
+
+# Формат пакета ресурсов: заголовок, далее записи с уже декодированными пикселями RGBA
+# (без сжатия: распаковка PNG или zlib при запуске стоит столько же, сколько чтение с диска)
+MAGIC = b"ASTB"
+VERSION = 2
+HEADER = struct.Struct("<4sBQHI")  # MAGIC, версия, ключ параметров, длина списка шрифтов, число записей
+ENTRY = struct.Struct("<HBHHI")  # длина имени, тип, ширина, высота, длина данных
+
+# Типы записей
+IMAGE = 0
+MISSING = 1  # файла нет: кэш сразу запоминает None, без обращения к диску
+FONT = 2
+
+# Файлы, которые запрашивает игра (пути - как в вызовах asset_cache.get)
+ASSET_FILES = [BACKGROUND_IMAGE_PATH, SHIP_IMAGE_PATH, "ship_thrust.png", BULLET_IMAGE_PATH] + \
+    ASTEROID_IMAGES + EXPLOSION_IMAGES
+FONT_ENTRIES = ("font", "font_bold")
+
+
+def font_file(bold):
+    """Файл шрифта, который выбрал бы pygame.font.SysFont (или стандартный шрифт pygame)"""
+    if FONT_PATH:
+        return FONT_PATH
+    path = pygame.font.match_font(FONT_NAME, bold=bold)
+    if path is None:
+        path = os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font())
+    return path
+
+
+def config_key():
+    """Ключ параметров, от которых зависит содержимое пакета (список файлов и выбор шрифта)"""
+    digest = hashlib.sha256(repr((ASSET_FILES, FONT_ENTRIES, FONT_PATH, FONT_NAME)).encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def source_files(fonts=()):
+    """Исходные файлы пакета (для проверки, не устарел ли он); fonts - файлы шрифтов из пакета"""
+    return [path for path in ASSET_FILES + list(fonts) if os.path.exists(path)]
+
+
+def read_header(path):
+    """Заголовок пакета: версия, ключ параметров и файлы шрифтов, из которых он собран"""
+    with open(path, "rb") as file:
+        data = file.read(HEADER.size)
+        magic, version, key, fonts_length, _ = HEADER.unpack(data)
+        if magic != MAGIC:
+            raise ValueError(f"Неподдерживаемый пакет ресурсов: {path}")
+        fonts = file.read(fonts_length).decode().split("\n") if fonts_length else []
+    return version, key, fonts
+
+
+def is_stale(path=ASSET_BUNDLE_PATH):
+    """Нужно ли пересобрать пакет
+
+    Да, если его нет, он другой версии, изменились список файлов или шрифт (FONT_PATH, FONT_NAME)
+    либо исходные изображения или файлы шрифтов новее пакета. Системный шрифт заново
+    не ищется: путь к нему записан в пакете при сборке.
+    """
+    if not os.path.exists(path):
+        return True
+    try:
+        version, key, fonts = read_header(path)
+    except (ValueError, struct.error):
+        return True
+    if version != VERSION or key != config_key():
+        return True
+    if not all(os.path.exists(font) for font in fonts):
+        return True
+    built = os.path.getmtime(path)
+    return any(os.path.getmtime(source) > built for source in source_files(fonts))
+
+
+def build_bundle(path=ASSET_BUNDLE_PATH):
+    """Сборка пакета ресурсов из исходных файлов; возвращает число записей"""
+    entries = []
+    for name in ASSET_FILES:
+        if not os.path.exists(name):
+            entries.append((name, MISSING, 0, 0, b""))
+            continue
+        surface = pygame.image.load(name)
+        width, height = surface.get_size()
+        entries.append((name, IMAGE, width, height, pygame.image.tobytes(surface, "RGBA")))
+    fonts = []
+    for name, bold in zip(FONT_ENTRIES, (False, True)):
+        fonts.append(font_file(bold))
+        with open(fonts[-1], "rb") as file:
+            entries.append((name, FONT, 0, 0, file.read()))
+
+    encoded_fonts = "\n".join(fonts).encode()
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, config_key(), len(encoded_fonts), len(entries)))
+        file.write(encoded_fonts)
+        for name, kind, width, height, data in entries:
+            encoded = name.encode()
+            file.write(ENTRY.pack(len(encoded), kind, width, height, len(data)))
+            file.write(encoded)
+            file.write(data)
+    return len(entries)
+
+
+def load_bundle(path=ASSET_BUNDLE_PATH):
+    """Загрузка пакета одним чтением: изображения попадают в asset_cache, шрифты - в text_cache
+
+    Вызывается после создания окна, чтобы изображения сразу перевести в формат экрана.
+    Возвращает число записей.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    magic, version, _, fonts_length, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Неподдерживаемый пакет ресурсов: {path}")
+
+    view = memoryview(data)
+    offset = HEADER.size + fonts_length
+    for _ in range(count):
+        name_length, kind, width, height, length = ENTRY.unpack_from(data, offset)
+        offset += ENTRY.size
+        name = bytes(view[offset:offset + name_length]).decode()
+        offset += name_length
+        payload = view[offset:offset + length]
+        offset += length
+
+        if kind == IMAGE:
+            surface = pygame.image.frombuffer(payload, (width, height), "RGBA")
+            asset_cache.add(name, surface.convert_alpha() if asset_cache.convert else surface)
+        elif kind == MISSING:
+            asset_cache.add(name, None)
+        elif kind == FONT:
+            text_cache.font_files[name == "font_bold"] = bytes(payload)
+    return count
+
+
+def main():
+    """Сборка пакета ресурсов из командной строки"""
+    parser = argparse.ArgumentParser(description="Сборка пакета ресурсов игры Астероиды")
+    parser.add_argument("path", nargs="?", default=ASSET_BUNDLE_PATH, help="файл пакета")
+    args = parser.parse_args()
+
+    pygame.font.init()
+    count = build_bundle(args.path)
+    print(f"{args.path}: {count} записей, {os.path.getsize(args.path) // 1024} КБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import pygame
+import os
+import weakref
+from config import *
+
+
+class AssetCache:
+    """Общий кэш изображений: каждый файл загружается с диска только один раз"""
+
+    def __init__(self):
+        # Ключ - (путь, масштаб, размер), значение - Surface или None, если файла нет
+        self.surfaces = {}
+        self.hits = 0
+        self.misses = 0
+        # Без видеорежима (симуляция) изображения не преобразуются в формат экрана
+        self.convert = True
+
+    def get(self, image_path, scale=1.0, size=None):
+        """Возвращает общее изображение (только для чтения) или None, если файл недоступен"""
+        key = (image_path, scale, size)
+        if key in self.surfaces:
+            self.hits += 1
+            return self.surfaces[key]
+
+        self.misses += 1
+        if size is None and scale == 1.0:
+            surface = self.load(image_path)
+        else:
+            # Масштабированные варианты (например, осколки астероидов) строятся из
+            # исходного изображения в кэше, а не загружаются с диска заново
+            surface = self.scale(self.get_original(image_path), scale, size)
+        self.surfaces[key] = surface
+        return surface
+
+    def get_original(self, image_path):
+        """Исходное изображение для построения вариантов (не учитывается в счетчиках)"""
+        key = (image_path, 1.0, None)
+        if key not in self.surfaces:
+            self.surfaces[key] = self.load(image_path)
+        return self.surfaces[key]
+
+    def add(self, image_path, surface):
+        """Добавление готового изображения (например, из пакета ресурсов)"""
+        self.surfaces[(image_path, 1.0, None)] = surface
+
+    def load(self, image_path):
+        """Загрузка изображения с диска"""
+        try:
+            if not os.path.exists(image_path):
+                print(f"Файл {image_path} не найден")
+                return None
+            surface = pygame.image.load(image_path)
+            if self.convert:
+                surface = surface.convert_alpha()
+        except pygame.error as e:
+            print(f"Ошибка загрузки изображения {image_path}: {e}")
+            return None
+        return surface
+
+    def scale(self, surface, scale, size):
+        """Масштабирование изображения (None остается None)"""
+        if surface is None:
+            return None
+        if size is not None:
+            surface = pygame.transform.scale(surface, size)
+        elif scale != 1.0:
+            new_width = int(surface.get_width() * scale)
+            new_height = int(surface.get_height() * scale)
+            surface = pygame.transform.scale(surface, (new_width, new_height))
+        return surface
+
+    def get_stats(self):
+        """Счетчики попаданий и промахов кэша"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.surfaces),
+        }
+
+    def clear(self):
+        """Очистка кэша (например, после смены видеорежима)"""
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class RotationAtlas:
+    """Набор заранее повернутых кадров одного изображения"""
+
+    def __init__(self, image, frame_count, lazy=True):
+        # Ссылку на исходное изображение не храним, иначе атлас не освободится
+        self.frame_count = frame_count
+        self.step = 360.0 / frame_count
+        self.frames = [None] * frame_count
+        if not lazy:
+            for index in range(frame_count):
+                self.render_frame(image, index)
+
+    def render_frame(self, image, index):
+        """Построение кадра для заданного индекса угла"""
+        frame = pygame.transform.rotate(image, index * self.step)
+        self.frames[index] = frame
+        return frame
+
+    def get_frame(self, image, angle):
+        """Кадр, ближайший к заданному углу (в градусах)"""
+        index = int(round(angle / self.step)) % self.frame_count
+        frame = self.frames[index]
+        if frame is None:
+            frame = self.render_frame(image, index)
+        return frame
+
+    def memory_usage(self):
+        """Объем памяти, занятый построенными кадрами (в байтах)"""
+        total = 0
+        for frame in self.frames:
+            if frame is not None:
+                total += frame.get_width() * frame.get_height() * frame.get_bytesize()
+        return total
+
+
+class RotationCache:
+    """Кэш атласов поворота, общий для всех объектов с одинаковым изображением"""
+
+    def __init__(self, frame_count=ROTATION_FRAMES, lazy=ROTATION_LAZY):
+        self.frame_count = frame_count
+        self.lazy = lazy
+        # Атлас живет, пока жив исходный Surface
+        self.atlases = weakref.WeakKeyDictionary()
+
+    def get_atlas(self, image):
+        """Атлас для изображения (создается при первом обращении)"""
+        atlas = self.atlases.get(image)
+        if atlas is None:
+            atlas = RotationAtlas(image, self.frame_count, self.lazy)
+            self.atlases[image] = atlas
+        return atlas
+
+    def get_frame(self, image, angle):
+        """Повернутое изображение из атласа"""
+        return self.get_atlas(image).get_frame(image, angle)
+
+    def get_stats(self):
+        """Размер каждого атласа: число построенных кадров и занятая память"""
+        stats = []
+        for image, atlas in self.atlases.items():
+            stats.append({
+                "size": image.get_size(),
+                "frames": sum(1 for frame in atlas.frames if frame is not None),
+                "frame_count": atlas.frame_count,
+                "bytes": atlas.memory_usage(),
+            })
+        return stats
+
+    def clear(self):
+        """Очистка всех атласов"""
+        self.atlases = weakref.WeakKeyDictionary()
+
+
+class ScaleCache:
+    """Кэш уменьшенных и увеличенных копий изображений для отрисовки в другом разрешении"""
+
+    def __init__(self):
+        # Изображение -> {масштаб: Surface}; копии живут, пока жив исходный Surface
+        self.images = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, image, scale):
+        """Копия изображения в масштабе scale (размер округляется до пикселя)"""
+        scaled = self.images.get(image)
+        if scaled is None:
+            scaled = self.images[image] = {}
+        surface = scaled.get(scale)
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        if not image.get_width() or not image.get_height():
+            # Пустое изображение (например, текст из пустой строки) нечего масштабировать
+            scaled[scale] = image
+            return image
+        size = (max(1, round(image.get_width() * scale)), max(1, round(image.get_height() * scale)))
+        # Сглаживание не подходит для изображений с цветовым ключом: ключ смешался бы с краями
+        if image.get_bitsize() >= 24 and image.get_colorkey() is None:
+            surface = pygame.transform.smoothscale(image, size)
+        else:
+            surface = pygame.transform.scale(image, size)
+        scaled[scale] = surface
+        return surface
+
+    def get_stats(self):
+        """Счетчики попаданий и промахов кэша"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": sum(len(scaled) for scaled in self.images.values()),
+        }
+
+    def clear(self):
+        """Очистка кэша (например, после смены размера окна)"""
+        self.images = weakref.WeakKeyDictionary()
+
+
+# Единые кэши для всего процесса
+asset_cache = AssetCache()
+rotation_cache = RotationCache()
+scale_cache = ScaleCache()
+# Кэши поворотов по (ROTATION_FRAMES, ROTATION_LAZY) для игр с переопределенными параметрами
+rotation_caches = {(rotation_cache.frame_count, rotation_cache.lazy): rotation_cache}
+
+
+def get_rotation_cache(config):
+    """Кэш поворотов для параметров игры (общий для игр с одинаковыми ROTATION_FRAMES и ROTATION_LAZY)"""
+    key = (config.ROTATION_FRAMES, config.ROTATION_LAZY)
+    cache = rotation_caches.get(key)
+    if cache is None:
+        cache = rotation_caches[key] = RotationCache(*key)
+    return cache
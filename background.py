@@ -0,0 +1,77 @@
+import pygame
+import math
+import random
+from config import *
+
+
+class ScrollingBackground:
+    """Фон, один раз подготовленный в непрозрачные слои формата экрана"""
+
+    def __init__(self, image=None, mode=BACKGROUND_MODE, rng=random, parallax_factor=BACKGROUND_PARALLAX_FACTOR,
+                 tile_size=BACKGROUND_TILE_SIZE):
+        self.mode = mode
+        self.tile_size = tile_size
+        # Слои: (изображение, множитель скорости прокрутки)
+        self.layers = []
+
+        base = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        base.fill(BLACK)
+        if image is None:
+            # Стандартный фон рисуется один раз, а не каждый кадр
+            self.draw_rocks(base, rng)
+        elif mode == "tiled":
+            self.draw_tiles(base, image)
+        else:
+            # Масштабирование изображения под размер экрана
+            scaled = pygame.transform.scale(image, (SCREEN_WIDTH, SCREEN_HEIGHT))
+            scaled.set_alpha(128)
+            base.blit(scaled, (0, 0))
+
+        if mode == "parallax" and image is not None:
+            # Дальний слой движется медленнее ближнего слоя с астероидами
+            self.layers.append((base, parallax_factor))
+            near = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+            near.fill(BLACK)
+            near.set_colorkey(BLACK, pygame.RLEACCEL)
+            self.draw_rocks(near, rng)
+            self.layers.append((near, 1.0))
+        else:
+            self.layers.append((base, 1.0))
+
+    def draw_tiles(self, surface, image):
+        """Заполнение слоя уменьшенными копиями изображения"""
+        size = self.tile_size
+        tile = pygame.transform.scale(image, (size, size))
+        tile.set_alpha(128)
+        for x in range(0, SCREEN_WIDTH, size):
+            for y in range(0, SCREEN_HEIGHT, size):
+                surface.blit(tile, (x, y))
+
+    def draw_rocks(self, surface, rng):
+        """Рисование фоновых астероидов (с переносом через край для бесшовной прокрутки)"""
+        rocks = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        for i in range(5):
+            x = i * 200
+            for j in range(4):
+                y = j * 150
+                size = 15 + i * 2
+
+                # Простой астероид для фона
+                points = []
+                num_points = 6
+                for k in range(num_points):
+                    angle = 2 * math.pi * k / num_points
+                    distance = size * rng.uniform(0.8, 1.0)
+                    points.append((math.cos(angle) * distance, math.sin(angle) * distance))
+
+                for shift in (-SCREEN_WIDTH, 0, SCREEN_WIDTH):
+                    pygame.draw.polygon(rocks, (100, 100, 100, 100),
+                                        [(x + shift + px, y + py) for px, py in points], 1)
+        surface.blit(rocks, (0, 0))
+
+    def draw(self, screen, offset):
+        """Отрисовка слоев: по два непрозрачных блита на слой для бесшовной прокрутки"""
+        for surface, factor in self.layers:
+            x = math.floor(offset * factor) % SCREEN_WIDTH
+            screen.blit(surface, (x, 0))
+            screen.blit(surface, (x - SCREEN_WIDTH, 0))
@@ -0,0 +1,127 @@
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from config import *
+from simulation import HeadlessSimulation, idle_policy, make_random_policy
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Колонки итогового файла (помимо переопределенных параметров)
+RESULT_COLUMNS = ("episode", "seed", "policy", "score", "lives", "ticks", "game_over",
+                  "mean_tick_us", "max_tick_us")
+
+
+def run_episode(spec):
+    """Одна игра без экрана с собственными параметрами, зерном и стратегией ввода"""
+    config = GameConfig(**spec["overrides"])
+    seed = spec["seed"]
+    policy = make_random_policy(seed) if spec["policy"] == "random" else idle_policy
+    simulation = HeadlessSimulation(policy, tick_ms=1000 / config.FPS, seed=seed, config=config)
+
+    # Стоимость каждого тика
+    max_tick = 0
+    started = time.perf_counter_ns()
+    while simulation.tick < spec["ticks"] and simulation.game.game_state == "playing":
+        tick_started = time.perf_counter_ns()
+        simulation.step()
+        max_tick = max(max_tick, time.perf_counter_ns() - tick_started)
+    elapsed = time.perf_counter_ns() - started
+
+    game = simulation.game
+    row = {
+        "episode": spec["episode"],
+        "seed": seed,
+        "policy": spec["policy"],
+        "score": game.score,
+        "lives": game.lives,
+        "ticks": simulation.tick,
+        "game_over": game.game_state == "game_over",
+        "mean_tick_us": elapsed / max(1, simulation.tick) / 1000,
+        "max_tick_us": max_tick / 1000,
+    }
+    row.update(spec["overrides"])
+    return row
+
+
+def parse_value(text):
+    """Преобразование значения параметра из командной строки"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def build_episodes(params, seeds, policy, ticks):
+    """Все сочетания значений параметров, каждое - с seeds разными зернами"""
+    names = list(params)
+    episodes = []
+    for values in itertools.product(*(params[name] for name in names)):
+        overrides = dict(zip(names, values))
+        for seed in range(seeds):
+            episodes.append({
+                "episode": len(episodes),
+                "seed": seed,
+                "policy": policy,
+                "ticks": ticks,
+                "overrides": overrides,
+            })
+    return episodes
+
+
+def save_results(rows, columns, path):
+    """Сохранение результатов по колонкам (.npz при наличии NumPy или .csv)"""
+    rows = sorted(rows, key=lambda row: row["episode"])
+    if path.endswith(".npz"):
+        if np is None:
+            raise RuntimeError("Для формата .npz нужен NumPy")
+        np.savez(path, **{column: np.array([row[column] for row in rows]) for column in columns})
+        return
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow([row[column] for column in columns])
+
+
+def main():
+    """Перебор параметров config.py на нескольких процессах"""
+    parser = argparse.ArgumentParser(description="Пакетная симуляция игры Астероиды")
+    parser.add_argument("--param", action="append", default=[],
+                        help="параметр и значения через запятую, например BULLET_SPEED=5,7,9")
+    parser.add_argument("--seeds", type=int, default=4, help="число зерен на сочетание параметров")
+    parser.add_argument("--ticks", type=int, default=60 * FPS, help="максимум тиков в игре")
+    parser.add_argument("--policy", choices=("idle", "random"), default="random", help="стратегия ввода")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="число процессов")
+    parser.add_argument("--out", default="batch_results.csv", help="файл результатов (.csv или .npz)")
+    args = parser.parse_args()
+
+    params = {}
+    for item in args.param:
+        name, values = item.split("=", 1)
+        params[name] = [parse_value(value) for value in values.split(",")]
+    # Проверка имен до запуска процессов
+    GameConfig(**{name: values[0] for name, values in params.items()})
+
+    episodes = build_episodes(params, args.seeds, args.policy, args.ticks)
+    started = time.perf_counter()
+    # Небольшие порции равномерно загружают процессы при разной длине игр
+    chunksize = max(1, len(episodes) // (args.workers * 4))
+    with multiprocessing.Pool(args.workers) as pool:
+        rows = list(pool.imap_unordered(run_episode, episodes, chunksize=chunksize))
+    elapsed = time.perf_counter() - started
+
+    save_results(rows, RESULT_COLUMNS + tuple(params), args.out)
+    total_ticks = sum(row["ticks"] for row in rows)
+    print(f"{len(rows)} игр за {elapsed:.2f} с на {args.workers} процессах "
+          f"({total_ticks / elapsed:.0f} тиков/с), результаты: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
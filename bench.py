@@ -0,0 +1,235 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import pygame
+from config import *
+from game_logic import GameLogic
+from profiler import FrameProfiler
+from render_queue import RenderQueue
+from render_target import RenderTarget
+from replay import state_checksum
+from simulation import ScriptedInput
+from snapshot import save_snapshot, restore_snapshot
+from text_cache import get_font
+
+# Сценарии нагрузки: число объектов, поддерживаемое каждый тик, или ввод игрока
+SCENARIOS = {
+    "small": {"asteroids": 20, "bullets": 5, "explosions": 2, "ticks": 300},
+    "crowd": {"asteroids": 500, "bullets": 20, "explosions": 10, "ticks": 300},
+    # Та же нагрузка при отрисовке в половинном разрешении (уровень динамического разрешения)
+    "crowd_half_res": {"asteroids": 500, "bullets": 20, "explosions": 10, "ticks": 300, "render_scale": 0.5},
+    "stress": {"asteroids": 2000, "bullets": 50, "explosions": 30, "ticks": 120},
+    # Быстрые ракеты: без проверки пройденного отрезка часть из них пролетала бы сквозь астероиды
+    "bullet_storm": {"asteroids": 300, "bullets": 400, "explosions": 10, "ticks": 300,
+                     "config": {"BULLET_SPEED": 30}},
+    "idle_session": {"keys": (), "ticks": 20000},
+    "constant_fire": {"keys": (pygame.K_LEFT, pygame.K_SPACE), "ticks": 3000},
+}
+
+# Проверка скорости снимков: число объектов и предел на сохранение и восстановление (мс)
+SNAPSHOT_POPULATION = {"asteroids": 3000, "bullets": 50, "explosions": 30}
+SNAPSHOT_BUDGET_MS = 1.0
+# Без ENTITY_STORE каждому объекту задаются поля по одному: предел ловит только
+# возврат к пересозданию Surface для каждой сущности
+SNAPSHOT_LIST_BUDGET_MS = 10.0
+
+# Фазы, попадающие в таблицу и в сохраненный результат
+BENCH_PHASES = ("update", "collisions", "asteroids", "bullets", "explosions", "upscale", "ui", "frame")
+
+
+def fill_population(game, rng, asteroids, bullets, explosions):
+    """Пополнение игры объектами до заданного числа"""
+    while len(game.asteroids) < asteroids:
+        game.spawn_asteroid()
+        x = rng.uniform(0, SCREEN_WIDTH)
+        y = rng.uniform(0, SCREEN_HEIGHT)
+        # Астероиды сценария появляются на экране и не покидают его
+        if game.use_entity_store:
+            index = len(game.asteroids) - 1
+            game.asteroids.x[index] = x
+            game.asteroids.y[index] = y
+            game.asteroids.max_age[index] = float("inf")
+        else:
+            asteroid = game.asteroids[-1]
+            asteroid.x = x
+            asteroid.y = y
+            asteroid.max_age = float("inf")
+            asteroid.rect.center = (x, y)
+    while len(game.bullets) < bullets:
+        game.spawn_bullet(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT), rng.uniform(0, 360))
+    while len(game.explosions) < explosions:
+        game.spawn_explosion(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT))
+
+
+def run_scenario(name, screen, font, seed=0):
+    """Выполнение сценария; возвращает статистику по фазам"""
+    scenario = SCENARIOS[name]
+    rng = random.Random(seed)
+    game = GameLogic(seed=seed, config=GameConfig(**scenario.get("config", {})))
+    game.game_state = "playing"
+
+    keys = ScriptedInput()
+    keys.pressed = set(scenario.get("keys", ()))
+    game.input_source = keys
+    tick_ms = 1000 / FPS
+    ticks = [0]
+    game.clock = lambda: int(ticks[0] * tick_ms)
+
+    scripted = "keys" in scenario
+    if not scripted:
+        # Лимиты пулов и численности не должны ограничивать сценарий
+        for pool in game.pools.values():
+            pool.capacity = 10 ** 6
+        game.spawner.max_population = 10 ** 6
+
+    profiler = FrameProfiler(enabled=True, window=scenario["ticks"], output_path=None)
+    queue = RenderQueue()
+    target = RenderTarget(screen, levels=(scenario.get("render_scale", 1.0),), dynamic=False)
+    canvas = target.canvas
+    game.profiler = profiler
+
+    started = time.perf_counter()
+    for tick in range(scenario["ticks"]):
+        if not scripted:
+            fill_population(game, rng, scenario["asteroids"], scenario["bullets"], scenario["explosions"])
+
+        profiler.begin_frame()
+        game.handle_events([])
+        game.update()
+        profiler.mark("update")
+
+        game.draw_background(canvas)
+        for layer, objects in game.render_layers():
+            queue.add_objects(layer, objects)
+            queue.submit(canvas, layer)
+            profiler.mark(layer)
+        target.resolve()
+        profiler.mark("upscale")
+        game.draw_ui(target.hud, font)
+        profiler.mark("ui")
+        profiler.end_frame(game)
+        ticks[0] += 1
+
+        # Жизни восстанавливаются, чтобы сценарий не закончился раньше времени
+        game.lives = INITIAL_LIVES
+        game.game_state = "playing"
+    elapsed = time.perf_counter() - started
+
+    stats = {phase: values for phase, values in profiler.get_stats().items() if phase in BENCH_PHASES}
+    return {
+        "ticks": scenario["ticks"],
+        "ticks_per_second": scenario["ticks"] / elapsed,
+        "hits": game.score,
+        "final_counts": dict(profiler.counts),
+        "phases": stats,
+    }
+
+
+def check_snapshot(seed=0, repeats=20):
+    """Проверка скорости save_snapshot/restore_snapshot; возвращает список превышений предела"""
+    failures = []
+    for entity_store, budget in ((True, SNAPSHOT_BUDGET_MS), (False, SNAPSHOT_LIST_BUDGET_MS)):
+        game = GameLogic(seed=seed, config=GameConfig(ENTITY_STORE=entity_store))
+        game.game_state = "playing"
+        for pool in game.pools.values():
+            pool.capacity = 10 ** 6
+        fill_population(game, random.Random(seed), SNAPSHOT_POPULATION["asteroids"],
+                        SNAPSHOT_POPULATION["bullets"], SNAPSHOT_POPULATION["explosions"])
+        data = save_snapshot(game)
+        checksum = state_checksum(game)
+        restore_snapshot(game, data)
+        if state_checksum(game) != checksum:
+            failures.append(f"ENTITY_STORE={entity_store}: восстановленное состояние отличается от сохраненного")
+
+        # Лучшее время из нескольких повторов: проверка не должна зависеть от случайных пауз
+        timings = {}
+        for name, action in (("save", lambda: save_snapshot(game)), ("restore", lambda: restore_snapshot(game, data))):
+            best = float("inf")
+            for _ in range(repeats):
+                started = time.perf_counter()
+                action()
+                best = min(best, time.perf_counter() - started)
+            timings[name] = best * 1000
+        print(f"ENTITY_STORE={entity_store}: {len(game.asteroids)} астероидов, {len(data) // 1024} КБ, "
+              f"сохранение {timings['save']:.3f} мс, восстановление {timings['restore']:.3f} мс "
+              f"(предел {budget:.1f} мс)")
+        failures.extend(f"ENTITY_STORE={entity_store}: {name} {value:.3f} мс > {budget:.1f} мс"
+                        for name, value in timings.items() if value > budget)
+    return failures
+
+
+def print_table(results):
+    """Вывод таблицы результатов"""
+    print(f"{'сценарий':<14} {'фаза':<11} {'p50 мс':>8} {'p95 мс':>8} {'p99 мс':>8}")
+    for name, result in results.items():
+        for phase in BENCH_PHASES:
+            values = result["phases"].get(phase)
+            if values is None:
+                continue
+            print(f"{name:<14} {phase:<11} {values['p50']:8.3f} {values['p95']:8.3f} {values['p99']:8.3f}")
+        counts = ", ".join(f"{key}: {value}" for key, value in result["final_counts"].items())
+        print(f"{name:<14} {result['ticks_per_second']:.0f} тиков/с, попаданий: {result.get('hits', 0)} "
+              f"({counts})")
+
+
+def compare(results, baseline, tolerance):
+    """Сравнение медиан с сохраненным результатом; возвращает список регрессий"""
+    regressions = []
+    for name, result in results.items():
+        for phase, values in result["phases"].items():
+            old = baseline.get(name, {}).get("phases", {}).get(phase)
+            if old is None or old["p50"] <= 0:
+                continue
+            ratio = values["p50"] / old["p50"]
+            if ratio > 1 + tolerance:
+                regressions.append(f"{name}/{phase}: p50 {old['p50']:.3f} -> {values['p50']:.3f} мс "
+                                   f"(x{ratio:.2f})")
+    return regressions
+
+
+def main():
+    """Запуск тестов производительности из командной строки"""
+    parser = argparse.ArgumentParser(description="Тесты производительности игры Астероиды")
+    parser.add_argument("scenarios", nargs="*", default=list(SCENARIOS), help="сценарии для запуска")
+    parser.add_argument("--seed", type=int, default=0, help="зерно генератора")
+    parser.add_argument("--save", help="сохранить результат в JSON")
+    parser.add_argument("--compare", help="сравнить с сохраненным JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допустимое замедление (доля)")
+    parser.add_argument("--check-snapshot", action="store_true",
+                        help="проверить скорость сохранения и восстановления снимка")
+    args = parser.parse_args()
+
+    # Без окна: отрисовка выполняется в памяти
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    font = get_font(24)
+
+    if args.check_snapshot:
+        failures = check_snapshot(args.seed)
+        for line in failures:
+            print(f"Превышение: {line}")
+        sys.exit(1 if failures else 0)
+
+    results = {name: run_scenario(name, screen, font, args.seed) for name in args.scenarios}
+    print_table(results)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"Регрессия: {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+import argparse
+import socket
+import time
+from collections import deque
+from config import *
+from netcode import (JOIN, INPUT, LEAVE, STATE, MESSAGE_TYPE, INPUT_MESSAGE, FRAME_LENGTH, FULL, POSITION_SCALE,
+                     key_mask, decode_state, dequantize_angle)
+from profiler import percentile
+from simulation import ScriptedInput, make_random_policy
+from snapshot import restore_ship, restore_bullets, restore_asteroids
+
+
+class NetworkClient:
+    """Клиент сервера игры (server.py): отправка клавиш и прием снимков без блокировки"""
+
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT, session="default", udp=False):
+        self.udp = udp
+        if udp:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.socket.connect((host, port))
+        else:
+            self.socket = socket.create_connection((host, port))
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.socket.setblocking(False)
+        self.closed = False
+        # Недочитанная часть потока TCP и еще не отправленные кадры
+        self.buffer = bytearray()
+        self.outgoing = bytearray()
+
+        # Полученные снимки по номеру тика (базы для разностей) и последний из них
+        self.history = {}
+        self.latest = None
+        self.seq = 0
+        self.started = time.perf_counter()
+
+        # Статистика: задержка ввода до снимка (мс), трафик и снимки без базы
+        self.rtt = deque(maxlen=SIMULATION_STATS_WINDOW)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.states = 0
+        self.undecodable = 0
+
+        self.join_message = MESSAGE_TYPE.pack(JOIN) + session.encode("utf-8")
+        self.last_join = self.get_stamp()
+        self.send(self.join_message)
+
+    def get_stamp(self):
+        """Метка времени клиента в миллисекундах (эхо возвращается сервером в снимке)"""
+        return int((time.perf_counter() - self.started) * 1000) & 0xFFFFFFFF
+
+    def send(self, message):
+        """Отправка сообщения
+
+        Пакет UDP при заполненном буфере сокета пропускается. Кадр TCP попадает в очередь
+        целиком и уходит по мере готовности сокета (flush); если очередь переполнена,
+        пропускается весь кадр, а не его часть.
+        """
+        if self.closed:
+            return
+        if self.udp:
+            try:
+                self.socket.send(message)
+            except BlockingIOError:
+                return
+            except OSError:
+                self.closed = True
+                return
+            self.bytes_sent += len(message)
+            return
+        if len(self.outgoing) > CLIENT_SEND_BUFFER:
+            return
+        self.outgoing += FRAME_LENGTH.pack(len(message)) + message
+        self.flush()
+
+    def flush(self):
+        """Отправка очереди TCP без блокировки: сколько примет сокет, остальное - при следующем вызове"""
+        while self.outgoing and not self.closed:
+            try:
+                sent = self.socket.send(self.outgoing)
+            except BlockingIOError:
+                break
+            except OSError:
+                self.closed = True
+                break
+            self.bytes_sent += sent
+            del self.outgoing[:sent]
+
+    def send_input(self, keys):
+        """Отправка состояния клавиш (pygame.key.get_pressed()) с подтверждением последнего снимка"""
+        stamp = self.get_stamp()
+        # Потерянный пакет UDP с запросом подключения повторяется до первого снимка
+        if self.udp and self.latest is None and stamp - self.last_join > CLIENT_JOIN_RESEND_MS:
+            self.last_join = stamp
+            self.send(self.join_message)
+        ack = self.latest.tick if self.latest is not None else FULL
+        self.send(INPUT_MESSAGE.pack(INPUT, self.seq, key_mask(keys), ack, stamp))
+        self.seq += 1
+
+    def receive(self):
+        """Все сообщения, пришедшие с прошлого вызова"""
+        messages = []
+        while not self.closed:
+            try:
+                data = self.socket.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                self.closed = True
+                break
+            if not data and not self.udp:
+                self.closed = True
+                break
+            self.bytes_received += len(data)
+            if self.udp:
+                messages.append(data)
+                continue
+            self.buffer += data
+            while len(self.buffer) >= FRAME_LENGTH.size:
+                (length,) = FRAME_LENGTH.unpack_from(self.buffer)
+                end = FRAME_LENGTH.size + length
+                if len(self.buffer) < end:
+                    break
+                messages.append(bytes(self.buffer[FRAME_LENGTH.size:end]))
+                del self.buffer[:end]
+        return messages
+
+    def poll(self):
+        """Прием снимков; возвращает самый новый из полученных или None
+
+        После разрыва соединения (в том числе закрытия его сервером) closed = True.
+        """
+        self.flush()
+        newest = None
+        for message in self.receive():
+            if not message or message[0] != STATE:
+                continue
+            state = decode_state(message, self.history)
+            if state is None:
+                # База разности уже удалена: сервер пришлет полный снимок по старому подтверждению
+                self.undecodable += 1
+                continue
+            self.states += 1
+            if self.latest is not None and state.tick <= self.latest.tick:
+                # Пакет UDP пришел не по порядку
+                continue
+            self.history[state.tick] = state
+            self.latest = newest = state
+            if state.echo:
+                self.rtt.append((self.get_stamp() - state.echo) & 0xFFFFFFFF)
+
+        if newest is not None:
+            oldest = newest.tick - SERVER_HISTORY * SERVER_SEND_INTERVAL
+            for tick in [tick for tick in self.history if tick < oldest]:
+                del self.history[tick]
+        return newest
+
+    def close(self):
+        """Выход из сессии"""
+        self.send(MESSAGE_TYPE.pack(LEAVE))
+        self.closed = True
+        self.socket.close()
+
+    def get_stats(self):
+        """Статистика: задержка от ввода до снимка (мс) и входящий трафик"""
+        elapsed = time.perf_counter() - self.started
+        rtt = sorted(self.rtt)
+        return {
+            "states": self.states,
+            "undecodable": self.undecodable,
+            "rtt_p50": percentile(rtt, 0.5),
+            "rtt_p95": percentile(rtt, 0.95),
+            "bytes_received": self.bytes_received,
+            "bytes_sent": self.bytes_sent,
+            "received_per_second": self.bytes_received / elapsed if elapsed > 0 else 0,
+            "bytes_per_state": self.bytes_received / self.states if self.states else 0,
+        }
+
+
+def apply_state(game, state, images=None):
+    """Перенос снимка сервера в локальную игру для отрисовки (скорости не передаются и равны нулю)
+
+    images - кэш исходных изображений астероидов между вызовами.
+    """
+    game.game_state = state.game_state
+    game.score = state.score
+    game.lives = state.lives
+    ships, bullets, asteroids, explosions = state.entities
+
+    # Корабли по порядку номеров
+    while len(game.ships) < len(ships):
+        game.add_ship()
+    while len(game.ships) > max(1, len(ships)):
+        game.remove_ship(len(game.ships) - 1)
+    for ship, (x, y, angle, thrusting) in zip(game.ships, (ships[index] for index in sorted(ships))):
+        restore_ship(ship, x / POSITION_SCALE, y / POSITION_SCALE, 0, 0, dequantize_angle(angle), 0,
+                     bool(thrusting))
+
+    restore_bullets(game, [(x / POSITION_SCALE, y / POSITION_SCALE, 0, 0, dequantize_angle(angle), 1)
+                           for x, y, angle in bullets.values()])
+    restore_asteroids(game, [(x / POSITION_SCALE, y / POSITION_SCALE, 0, 0, dequantize_angle(angle), 0,
+                              size, 0, float("inf"), image_index)
+                             for x, y, angle, size, image_index in asteroids.values()], images)
+
+    # Таймер взрыва считается по тику появления; кадр анимации - одним обновлением
+    duration = game.config.EXPLOSION_DURATION
+    timers = [(x / POSITION_SCALE, y / POSITION_SCALE, duration - ((state.tick - born) & 0xFFFF))
+              for x, y, born in explosions.values()]
+    if game.use_particle_system:
+        system = game.explosions
+        system.clear()
+        for x, y, timer in timers:
+            if system.spawn(x, y):
+                system.timer[system.count - 1] = timer + 1
+        system.update()
+    else:
+        pool = game.pools["explosions"]
+        pool.release_all()
+        for x, y, timer in timers:
+            explosion = pool.take(x, y)
+            explosion.timer = timer + 1
+            explosion.update()
+        pool.release_inactive()
+
+
+def run_bots(host, port, sessions, players, seconds, udp):
+    """Нагрузка на сервер: sessions сессий по players игроков со случайным вводом"""
+    clients = [NetworkClient(host, port, f"bots-{session}", udp)
+               for session in range(sessions) for _ in range(players)]
+    policies = [make_random_policy(index) for index in range(len(clients))]
+    keys = ScriptedInput()
+    tick_seconds = 1 / FPS
+    next_time = time.perf_counter()
+    end = next_time + seconds
+    tick = 0
+    while time.perf_counter() < end:
+        for client, policy in zip(clients, policies):
+            keys.pressed = set(policy(None, tick))
+            client.send_input(keys)
+            client.poll()
+        tick += 1
+        next_time += tick_seconds
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    stats = [client.get_stats() for client in clients]
+    for client in clients:
+        client.close()
+    return stats
+
+
+def main():
+    """Нагрузочный тест сервера ботами"""
+    parser = argparse.ArgumentParser(description="Боты для нагрузки на сервер игры Астероиды")
+    parser.add_argument("--host", default=SERVER_HOST, help="адрес сервера")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="порт сервера")
+    parser.add_argument("--bots", default="8x2", help="сессий x игроков, например 24x2")
+    parser.add_argument("--seconds", type=float, default=10, help="длительность теста")
+    parser.add_argument("--udp", action="store_true", help="UDP вместо TCP")
+    args = parser.parse_args()
+
+    sessions, players = (int(value) for value in args.bots.split("x"))
+    stats = run_bots(args.host, args.port, sessions, players, args.seconds, args.udp)
+    rtt_p50 = percentile(sorted(row["rtt_p50"] for row in stats), 0.5)
+    rtt_p95 = percentile(sorted(row["rtt_p95"] for row in stats), 0.95)
+    states = sum(row["states"] for row in stats)
+    undecodable = sum(row["undecodable"] for row in stats)
+    per_state = sum(row["bytes_received"] for row in stats) / max(1, states)
+    per_player = sum(row["received_per_second"] for row in stats) / len(stats)
+    print(f"{len(stats)} игроков в {sessions} сессиях ({'UDP' if args.udp else 'TCP'}): "
+          f"снимков {states}, без базы {undecodable}; задержка p50 {rtt_p50:.1f} мс, p95 {rtt_p95:.1f} мс; "
+          f"{per_state:.0f} байт на снимок, {per_player / 1024:.2f} КБ/с на игрока")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+from config import *
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HALF_WIDTH = SCREEN_WIDTH / 2
+HALF_HEIGHT = SCREEN_HEIGHT / 2
+
+
+def wrap_delta(delta, period):
+    """Кратчайшая разность координат на торе (работает и с массивами NumPy)"""
+    half = period / 2
+    return (delta + half) % period - half
+
+
+def circles_overlap(x1, y1, radius1, x2, y2, radius2):
+    """Пересекаются ли круги (сравнение квадратов расстояний с учетом переноса через край)"""
+    dx = x2 - x1
+    dy = y2 - y1
+    # Перенос через край (координаты отличаются не больше чем на ширину экрана с запасом)
+    if dx > HALF_WIDTH:
+        dx -= SCREEN_WIDTH
+    elif dx < -HALF_WIDTH:
+        dx += SCREEN_WIDTH
+    if dy > HALF_HEIGHT:
+        dy -= SCREEN_HEIGHT
+    elif dy < -HALF_HEIGHT:
+        dy += SCREEN_HEIGHT
+    reach = radius1 + radius2
+    return dx * dx + dy * dy < reach * reach
+
+
+def first_swept_hit(bullet, targets):
+    """Первая активная цель, которую задевает отрезок, пройденный ракетой за тик (или None)
+
+    Отрезок проверяется относительно движущейся цели, поэтому быстрая ракета
+    не пролетает сквозь астероид между кадрами. Проверка встроена в цикл:
+    она выполняется для каждой пары, и вызов функции на пару заметно дороже.
+    """
+    x, y, vx, vy, size = bullet.x, bullet.y, bullet.vx, bullet.vy, bullet.size
+    for target in targets:
+        if not target.active:
+            continue
+        reach = target.size + size
+        # Центр цели относительно конца отрезка и смещение ракеты относительно цели
+        px = target.x - x
+        if px > HALF_WIDTH:
+            px -= SCREEN_WIDTH
+        elif px < -HALF_WIDTH:
+            px += SCREEN_WIDTH
+        dx = vx - target.vx
+        px += dx
+        # Быстрый отказ: по оси x отрезок целиком дальше радиуса
+        if (px > reach and px - dx > reach) or (px < -reach and px - dx < -reach):
+            continue
+
+        py = target.y - y
+        if py > HALF_HEIGHT:
+            py -= SCREEN_HEIGHT
+        elif py < -HALF_HEIGHT:
+            py += SCREEN_HEIGHT
+        dy = vy - target.vy
+        py += dy
+
+        # Ближайшая к центру точка отрезка (px, py - центр относительно начала отрезка)
+        dot = px * dx + py * dy
+        if dot > 0:
+            length2 = dx * dx + dy * dy
+            if dot >= length2:
+                px -= dx
+                py -= dy
+            else:
+                t = dot / length2
+                px -= t * dx
+                py -= t * dy
+        if px * px + py * py < reach * reach:
+            return target
+    return None
+
+
+def wrap_once(delta, period):
+    """Перенос разности через край не больше одного раза, как в circles_overlap (для массивов NumPy)"""
+    half = period / 2
+    return delta - period * (delta > half) + period * (delta < -half)
+
+
+def overlap_matrix(x1, y1, radius1, x2, y2, radius2):
+    """circles_overlap для массивов NumPy (с поэлементным транслированием форм)"""
+    dx = wrap_once(x2 - x1, SCREEN_WIDTH)
+    dy = wrap_once(y2 - y1, SCREEN_HEIGHT)
+    reach = radius1 + radius2
+    return dx * dx + dy * dy < reach * reach
+
+
+def swept_hit_matrix(x, y, vx, vy, size, tx, ty, tvx, tvy, tsize):
+    """Задевает ли ракета цель за тик (проверка first_swept_hit) для массивов NumPy
+
+    Вычисления повторяют first_swept_hit операция в операцию, поэтому результат
+    совпадает с ним и для пограничных случаев.
+    """
+    reach = tsize + size
+    dx = vx - tvx
+    dy = vy - tvy
+    px = wrap_once(tx - x, SCREEN_WIDTH) + dx
+    py = wrap_once(ty - y, SCREEN_HEIGHT) + dy
+    dot = px * dx + py * dy
+    length2 = dx * dx + dy * dy
+    ahead = dot > 0
+    # Доля отрезка до ближайшей к центру точки (только там, где dot > 0, иначе начало отрезка)
+    t = np.divide(dot, length2, out=np.zeros_like(dot), where=ahead)
+    beyond = ahead & (dot >= length2)
+    middle = ahead & ~beyond
+    px = np.where(beyond, px - dx, np.where(middle, px - t * dx, px))
+    py = np.where(beyond, py - dy, np.where(middle, py - t * dy, py))
+    return px * px + py * py < reach * reach
+
+
+class SpatialHash:
+    """Равномерная сетка для быстрого поиска соседей на торе"""
+
+    def __init__(self, cell_size=COLLISION_CELL_SIZE, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+        # Число ячеек подбирается так, чтобы сетка ровно покрывала экран
+        self.cols = max(1, int(width // cell_size))
+        self.rows = max(1, int(height // cell_size))
+        self.cell_width = width / self.cols
+        self.cell_height = height / self.rows
+        self.cells = {}
+
+    def clear(self):
+        """Очистка сетки перед новым кадром"""
+        self.cells.clear()
+
+    def cell_of(self, x, y):
+        """Ячейка, в которую попадает точка (с учетом тороидальной геометрии)"""
+        return (int(x // self.cell_width) % self.cols,
+                int(y // self.cell_height) % self.rows)
+
+    def insert(self, x, y, item):
+        """Добавление объекта в ячейку его центра"""
+        cell = self.cell_of(x, y)
+        bucket = self.cells.get(cell)
+        if bucket is None:
+            self.cells[cell] = [item]
+        else:
+            bucket.append(item)
+
+    def rebuild(self, objects):
+        """Заполнение сетки номерами объектов списка (вместо clear и insert для каждого)"""
+        # Расчет ячейки встроен в цикл: он выполняется для каждого астероида каждый кадр
+        cell_width, cell_height, cols, rows = self.cell_width, self.cell_height, self.cols, self.rows
+        cells = {}
+        for index, obj in enumerate(objects):
+            cell = (int(obj.x // cell_width) % cols, int(obj.y // cell_height) % rows)
+            bucket = cells.get(cell)
+            if bucket is None:
+                cells[cell] = [index]
+            else:
+                bucket.append(index)
+        self.cells = cells
+
+    def query(self, x, y, radius):
+        """Все объекты из ячеек, пересекающих квадрат со стороной 2 * radius"""
+        first_col = int((x - radius) // self.cell_width)
+        last_col = int((x + radius) // self.cell_width)
+        first_row = int((y - radius) // self.cell_height)
+        last_row = int((y + radius) // self.cell_height)
+
+        # Индексы переносятся через край экрана, повторы отбрасываются
+        cols = range(first_col, last_col + 1)
+        if first_col < 0 or last_col >= self.cols:
+            cols = {col % self.cols for col in cols}
+        rows = range(first_row, last_row + 1)
+        if first_row < 0 or last_row >= self.rows:
+            rows = {row % self.rows for row in rows}
+
+        found = []
+        for col in cols:
+            for row in rows:
+                bucket = self.cells.get((col, row))
+                if bucket:
+                    found.extend(bucket)
+        return found
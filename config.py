@@ -5,6 +5,7 @@
 # Размеры окна
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
+FPS = 60  # частота обновления игры (тиков в секунду)
 
 # Цвета
 BLACK = (0, 0, 0)
@@ -25,6 +26,11 @@ SHIP_SIZE = 20
 BULLET_SPEED = 7
 BULLET_LIFETIME = 60  # в кадрах
 BULLET_SIZE = 3
+SHOT_COOLDOWN_MS = 300  # минимальный интервал между выстрелами
+
+# Ввод (input_queue.py)
+INPUT_COMMANDS = True  # команды KEYDOWN/KEYUP с метками времени (False - опрос клавиш раз в кадр)
+INPUT_STATS_WINDOW = 300  # число команд для статистики задержки от ввода до изображения
 
 # Параметры астероидов
 ASTEROID_MIN_SPEED = 1
@@ -34,15 +40,145 @@ ASTEROID_MAX_ROTATION = 2
 ASTEROID_MIN_SIZE = 20
 ASTEROID_MAX_SIZE = 50
 ASTEROID_SPAWN_RATE = 60  # кадры между появлениями
+ASTEROID_MAX_POPULATION = 100  # максимум астероидов одновременно
+ASTEROID_MAX_AGE = 30 * FPS  # кадров до того, как астероид перестает переноситься через край
+ASTEROID_MAX_DISTANCE = 4000  # пройденный путь (в пикселях) с тем же эффектом
+ADAPTIVE_SPAWN = True  # реже создавать астероиды, если кадр не укладывается в бюджет
+FRAME_BUDGET_MS = 1000 / FPS  # бюджет времени кадра
+ASTEROID_SPAWN_MAX_SLOWDOWN = 4  # во сколько раз максимум может вырасти интервал появления
+
+# Раскалывание астероидов
+ASTEROID_SPLIT = True  # сбитый астероид раскалывается на осколки
+ASTEROID_FRAGMENTS = 2  # число осколков
+ASTEROID_FRAGMENT_SCALE = 0.6  # размер осколка относительно астероида (не меньше ASTEROID_MIN_SIZE)
+ASTEROID_FRAGMENT_SPEED = 1.5  # скорость разлета осколков (добавляется к скорости астероида)
+ASTEROID_FRAGMENT_BUDGET = 8  # максимум осколков за кадр; осколки учитываются в ASTEROID_MAX_POPULATION
 
 # Игровые параметры
 INITIAL_LIVES = 3
 INITIAL_SCORE = 0
 EXPLOSION_DURATION = 20  # в кадрах
 
+# Емкости пулов объектов
+BULLET_POOL_CAPACITY = 64
+ASTEROID_POOL_CAPACITY = 512
+EXPLOSION_POOL_CAPACITY = 64
+
+# Параметры проверки столкновений
+COLLISION_BROAD_PHASE = "grid"  # "grid" - пространственная сетка, "brute" - полный перебор
+COLLISION_CELL_SIZE = 100  # размер ячейки сетки в пикселях
+
+# Хранилище сущностей на массивах NumPy (для очень большого числа астероидов)
+ENTITY_STORE = False
+ENTITY_STORE_CAPACITY = 1024  # начальная емкость массивов
+
+# Система частиц: все взрывы в общих массивах NumPy (без NumPy - отдельные объекты Explosion)
+PARTICLE_SYSTEM = True
+PARTICLE_CAPACITY = 256  # предел одновременных взрывов
+
+# Симуляция на отдельном потоке (отрисовка интерполирует между двумя последними тиками)
+SIMULATION_THREAD = False
+SIMULATION_MAX_CATCHUP = 5  # тиков, которые симуляция догоняет после задержки (остальные пропускаются)
+SIMULATION_MAX_JUMP = 100  # смещение за тик в пикселях, при котором объект не интерполируется
+SIMULATION_STATS_WINDOW = 600  # число тиков для статистики опоздания
+SIMULATION_SWITCH_INTERVAL_MS = 1  # интервал переключения потоков Python (sys.setswitchinterval)
+
+# Сетевая игра (server.py, client.py)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 5555
+SERVER_SEND_INTERVAL = 2  # тиков между рассылками снимков
+SERVER_HISTORY = 128  # тиков, за которые хранятся снимки (базы для разностей)
+SERVER_RESTART_DELAY = 3 * FPS  # тиков после конца игры до перезапуска сессии
+SERVER_CLIENT_TIMEOUT = 5  # секунд без пакетов до отключения игрока UDP
+SERVER_SEND_BUFFER = 64 * 1024  # байт в буфере TCP, при которых снимок игроку пропускается
+SERVER_STATS_INTERVAL = 5  # секунд между выводом статистики сервера
+CLIENT_JOIN_RESEND_MS = 250  # повтор запроса подключения по UDP до первого снимка
+CLIENT_SEND_BUFFER = 16 * 1024  # неотправленных байт TCP, при которых ввод пропускается
+
+# Пакетная среда для ботов (vector_env.py)
+ENV_MAX_TICKS = 60 * FPS  # длина эпизода, после которой игра начинается заново
+ENV_NEAREST_ASTEROIDS = 4  # число ближайших астероидов в наблюдении
+
+# Запись повторов
+REPLAY_RECORDING = False  # сохранять ввод каждой сессии
+REPLAY_DIR = "replays"
+REPLAY_CHECKSUM_INTERVAL = 60  # тиков между контрольными суммами
+
+# Профилирование кадра
+PROFILER_ENABLED = False  # собирать замеры с самого запуска
+PROFILER_WINDOW = 300  # число кадров для перцентилей
+PROFILER_OUTPUT = None  # путь к файлу .csv или .jsonl для покадровой записи
+
+# Шрифты и кэш текста
+FONT_NAME = "Arial"
+FONT_PATH = None  # путь к файлу .ttf (быстрее, чем поиск системного шрифта)
+TEXT_CACHE_SIZE = 128  # число строк в кэше
+
+# Запуск
+ASSET_BUNDLE_PATH = "assets.bundle"  # пакет изображений и шрифтов (python asset_bundle.py)
+ASSET_BUNDLE_AUTOBUILD = True  # пересобирать пакет при запуске, если его нет или он устарел
+WARMUP_BUDGET_MS = 4  # время на прогрев кэшей за кадр начального экрана
+
+# Фон и отрисовка
+BACKGROUND_SCROLL_SPEED = 1  # пикселей за кадр (0 - неподвижный фон)
+BACKGROUND_MODE = "scroll"  # "scroll" - одно изображение, "tiled" - плитка, "parallax" - два слоя
+BACKGROUND_TILE_SIZE = 200  # размер плитки для режима "tiled"
+BACKGROUND_PARALLAX_FACTOR = 0.5  # скорость дальнего слоя относительно ближнего
+DIRTY_RECTS = False  # обновлять на экране только измененные области (отключает прокрутку фона, см. main.py)
+DIRTY_RECTS_THRESHOLD = 0.5  # доля экрана, при которой выгоднее обновить его целиком
+RENDER_CULL = True  # не отправлять на отрисовку объекты за пределами экрана
+
+# Окно и динамическое разрешение (render_target.py)
+WINDOW_WIDTH = SCREEN_WIDTH  # размер окна; игровое поле масштабируется в него с сохранением пропорций
+WINDOW_HEIGHT = SCREEN_HEIGHT
+DYNAMIC_RESOLUTION = True  # снижать разрешение отрисовки, если кадр не укладывается в бюджет
+RENDER_SCALE_LEVELS = (1.0, 0.75, 0.5)  # доли разрешения окна, от лучшего к худшему
+RENDER_SCALE_DOWN = 0.9  # доля бюджета кадра, выше которой разрешение снижается
+RENDER_SCALE_UP = 0.5  # доля бюджета кадра, ниже которой разрешение повышается
+RENDER_SCALE_WINDOW = 30  # число кадров, по которым усредняется время кадра
+
+# Параметры кэша поворотов
+ROTATION_FRAMES = 64  # число заранее повернутых кадров на изображение
+ROTATION_LAZY = True  # строить кадры по мере необходимости
+ROTATE_SPRITES = True  # поворачивать изображения астероидов и ракет (False - игра без отрисовки)
+
 # Заголовки и тексты
 GAME_TITLE = "АСТЕРОИДЫ"
 START_TEXT = "Щелкните для начала игры"
 GAME_OVER_TEXT = "ИГРА ОКОНЧЕНА"
 SCORE_TEXT = "Очки: "
-LIVES_TEXT = "Жизни: "
\ No newline at end of file
+LIVES_TEXT = "Жизни: "
+
+
+# Параметры, вычисляемые из других (значения выше - для параметров по умолчанию)
+derived_parameters = {
+    "ASTEROID_MAX_AGE": lambda config: 30 * config.FPS,
+    "FRAME_BUDGET_MS": lambda config: 1000 / config.FPS,
+    "SERVER_RESTART_DELAY": lambda config: 3 * config.FPS,
+    "ENV_MAX_TICKS": lambda config: 60 * config.FPS,
+}
+
+
+class GameConfig:
+    """Параметры одной игры: значения этого модуля с возможностью переопределения
+
+    Позволяет запускать в одном процессе игры с разными настройками,
+    например GameConfig(BULLET_SPEED=9).
+    """
+
+    def __init__(self, **overrides):
+        for name, value in globals().items():
+            if name.isupper():
+                setattr(self, name, value)
+        for name, value in overrides.items():
+            if not name.isupper() or not hasattr(self, name):
+                raise ValueError(f"Неизвестный параметр конфигурации: {name}")
+            setattr(self, name, value)
+        # Производные значения пересчитываются по переопределенным (если не заданы явно)
+        for name, compute in derived_parameters.items():
+            if name not in overrides:
+                setattr(self, name, compute(self))
+
+
+# Параметры по умолчанию (без переопределений)
+default_config = GameConfig()
@@ -0,0 +1,287 @@
+import pygame
+from config import *
+from assets import rotation_cache as default_rotation_cache
+from collisions import overlap_matrix, swept_hit_matrix
+from pools import serials
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def available():
+    """Доступно ли хранилище (нужен NumPy)"""
+    return np is not None
+
+
+def round_center(values):
+    """Округление координат центра так же, как в Rect.center (половина - от нуля)"""
+    return np.trunc(values + np.copysign(0.5, values)).astype(int)
+
+
+class EntityProxy:
+    """Легковесное представление одной сущности хранилища для отрисовки"""
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def x(self):
+        return float(self.store.x[self.index])
+
+    @property
+    def y(self):
+        return float(self.store.y[self.index])
+
+    @property
+    def angle(self):
+        return float(self.store.angle[self.index])
+
+    @property
+    def size(self):
+        return float(self.store.size[self.index])
+
+    @property
+    def active(self):
+        return bool(self.store.active[self.index])
+
+    def draw(self, screen):
+        """Отрисовка сущности так же, как GameObject.draw; возвращает измененную область"""
+        store = self.store
+        image = store.images[self.index]
+        if image is None:
+            # Резервная отрисовка (красный прямоугольник)
+            return pygame.draw.rect(screen, RED, (self.x - 10, self.y - 10, 20, 20), 2)
+        if store.spinning[self.index]:
+            image = store.rotation_cache.get_frame(image, -store.angle[self.index])
+        return screen.blit(image, image.get_rect(center=(self.x, self.y)))
+
+
+class EntityStore:
+    """Хранилище однотипных сущностей в виде массивов NumPy (структура массивов)"""
+
+    FIELDS = ("x", "y", "vx", "vy", "angle", "rotation_speed", "size", "lifetime", "age", "max_age",
+              "image_index")
+    # Массивы, которые переносятся при росте и уплотнении хранилища
+    ARRAYS = FIELDS + ("active", "spinning", "serial")
+
+    def __init__(self, capacity=ENTITY_STORE_CAPACITY, rotation_cache=default_rotation_cache):
+        self.capacity = capacity
+        self.rotation_cache = rotation_cache
+        self.count = 0
+        for name in self.FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float64))
+        self.active = np.zeros(capacity, dtype=bool)
+        self.spinning = np.zeros(capacity, dtype=bool)
+        # Порядковые номера сущностей (pools.serials): ключи интерполяции снимков
+        self.serial = np.zeros(capacity, dtype=np.int64)
+        # Изображения остаются обычным списком: это общие Surface из кэша
+        # (None - хранилище без отрисовки, изображения не запоминаются)
+        self.images = [None] * capacity
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield EntityProxy(self, index)
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return EntityProxy(self, index)
+
+    def grow(self):
+        """Увеличение емкости массивов вдвое"""
+        new_capacity = self.capacity * 2
+        for name in self.ARRAYS:
+            old = getattr(self, name)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        if self.images is not None:
+            self.images.extend([None] * (new_capacity - self.capacity))
+        self.capacity = new_capacity
+
+    def append(self, obj):
+        """Перенос игрового объекта (Asteroid, Bullet) в хранилище"""
+        if self.count == self.capacity:
+            self.grow()
+        index = self.count
+        self.x[index] = obj.x
+        self.y[index] = obj.y
+        self.vx[index] = obj.vx
+        self.vy[index] = obj.vy
+        self.angle[index] = obj.angle
+        self.rotation_speed[index] = getattr(obj, "rotation_speed", 0)
+        self.size[index] = getattr(obj, "size", 0)
+        # Сущности без времени жизни живут бесконечно
+        self.lifetime[index] = getattr(obj, "lifetime", np.inf)
+        self.age[index] = getattr(obj, "age", 0)
+        self.max_age[index] = getattr(obj, "max_age", np.inf)
+        self.image_index[index] = getattr(obj, "image_index", -1)
+        self.active[index] = obj.active
+        self.serial[index] = next(serials)
+
+        # Вращающиеся объекты рисуются из атласа, остальные - готовым изображением
+        self.spinning[index] = hasattr(obj, "rotation_speed")
+        if self.images is not None:
+            self.images[index] = obj.original_image if self.spinning[index] else obj.image
+        self.count += 1
+        return index
+
+    def update(self):
+        """Векторное обновление: движение, тороидальный перенос, вращение и время жизни"""
+        n = self.count
+        if n == 0:
+            return
+        x = self.x[:n]
+        y = self.y[:n]
+        x += self.vx[:n]
+        y += self.vy[:n]
+
+        # Отслужившие сущности улетают за край экрана вместо переноса (как Asteroid.update)
+        age = self.age[:n]
+        age += 1
+        outside = (x < 0) | (x > SCREEN_WIDTH) | (y < 0) | (y > SCREEN_HEIGHT)
+        self.active[:n] &= ~(outside & (age >= self.max_age[:n]))
+
+        # Тороидальная геометрия (как в GameObject.update)
+        left = x < 0
+        right = x > SCREEN_WIDTH
+        x[left] = SCREEN_WIDTH
+        x[right] = 0
+        top = y < 0
+        bottom = y > SCREEN_HEIGHT
+        y[top] = SCREEN_HEIGHT
+        y[bottom] = 0
+
+        self.angle[:n] += self.rotation_speed[:n]
+
+        lifetime = self.lifetime[:n]
+        lifetime -= 1
+        self.active[:n] &= lifetime > 0
+
+    def remove(self, mask):
+        """Удаление сущностей по маске с уплотнением массивов"""
+        n = self.count
+        keep = ~mask[:n]
+        kept = int(keep.sum())
+        if kept == n:
+            return
+        for name in self.ARRAYS:
+            array = getattr(self, name)
+            array[:kept] = array[:n][keep]
+        images = self.images
+        if images is not None:
+            self.images = [images[index] for index in np.flatnonzero(keep)]
+            self.images.extend([None] * (self.capacity - kept))
+        self.count = kept
+
+    def remove_indices(self, indices):
+        """Удаление сущностей по списку индексов"""
+        if not indices:
+            return
+        mask = np.zeros(self.count, dtype=bool)
+        mask[list(indices)] = True
+        self.remove(mask)
+
+    def compact(self):
+        """Удаление неактивных сущностей"""
+        self.remove(~self.active[:self.count])
+
+    def hits(self, x, y, radius):
+        """Маска сущностей, круг которых пересекает круг (x, y, radius) с учетом переноса через край"""
+        n = self.count
+        return overlap_matrix(x, y, radius, self.x[:n], self.y[:n], self.size[:n])
+
+    def first_hit(self, x, y, radius):
+        """Индекс первой сущности, пересекающей круг, или None"""
+        mask = self.hits(x, y, radius)
+        if not mask.any():
+            return None
+        return int(mask.argmax())
+
+    def collide(self, other):
+        """Пары (индекс в other, индекс в self) для попаданий сущностей other
+
+        Проверяется отрезок, пройденный сущностью other за тик относительно
+        сущности self (collisions.swept_hit_matrix - те же правила, что
+        у first_swept_hit). Каждая сущность other поражает первую еще не
+        пораженную сущность self, как и при переборе списков в GameLogic.
+        """
+        n = self.count
+        m = other.count
+        if n == 0 or m == 0:
+            return []
+        matrix = swept_hit_matrix(other.x[:m, None], other.y[:m, None], other.vx[:m, None], other.vy[:m, None],
+                                  other.size[:m, None], self.x[None, :n], self.y[None, :n], self.vx[None, :n],
+                                  self.vy[None, :n], self.size[None, :n])
+
+        pairs = []
+        taken = np.zeros(n, dtype=bool)
+        for row in np.flatnonzero(matrix.any(axis=1)):
+            candidates = matrix[row] & ~taken
+            if candidates.any():
+                col = int(candidates.argmax())
+                taken[col] = True
+                pairs.append((int(row), col))
+        return pairs
+
+    def assign_serials(self, count):
+        """Новые порядковые номера первым count сущностям (после записи массивов целиком)"""
+        first = serials.reserve(count)
+        self.serial[:count] = np.arange(first, first + count)
+
+    def positions(self):
+        """Номера и координаты сущностей с изображением, в порядке пар sprites(None) (копии)"""
+        n = self.count
+        drawn = np.fromiter((image is not None for image in self.images[:n]), dtype=bool, count=n)
+        return self.serial[:n][drawn], self.x[:n][drawn], self.y[:n][drawn]
+
+    def sprites(self, view=None):
+        """Пары (изображение, позиция) для Surface.blits, как при EntityProxy.draw
+
+        view - область отсечения (Rect) или None. Возвращает пары и сущности без
+        изображения, которые рисуются своим draw (резервный прямоугольник).
+        """
+        n = self.count
+        if n == 0:
+            return [], []
+        center_x = round_center(self.x[:n]).tolist()
+        center_y = round_center(self.y[:n]).tolist()
+        # Номер кадра атласа для каждой сущности (как RotationAtlas.get_frame)
+        rotation_cache = self.rotation_cache
+        frame_count = rotation_cache.frame_count
+        frames = (np.rint(-self.angle[:n] / (360.0 / frame_count)).astype(int) % frame_count).tolist()
+        spinning = self.spinning[:n].tolist()
+        if view is not None:
+            view_left, view_top, view_right, view_bottom = view.left, view.top, view.right, view.bottom
+
+        pairs = []
+        missing = []
+        atlases = {}
+        images = self.images
+        for index in range(n):
+            image = images[index]
+            if image is None:
+                missing.append(EntityProxy(self, index))
+                continue
+            if spinning[index]:
+                atlas = atlases.get(image)
+                if atlas is None:
+                    atlas = atlases[image] = rotation_cache.get_atlas(image)
+                frame = frames[index]
+                image = atlas.frames[frame] or atlas.render_frame(image, frame)
+            width, height = image.get_size()
+            left = center_x[index] - width // 2
+            top = center_y[index] - height // 2
+            if view is not None and (left >= view_right or top >= view_bottom or
+                                     left + width <= view_left or top + height <= view_top):
+                continue
+            pairs.append((image, (left, top)))
+        return pairs, missing
@@ -1,7 +1,19 @@
 import pygame
 import random
 import math
-from game_objects import Ship, Bullet, Asteroid, Explosion
+from functools import partial
+from game_objects import Ship, Bullet, Asteroid, Explosion, placeholder_rng
+from collisions import SpatialHash, circles_overlap, first_swept_hit
+from assets import asset_cache, get_rotation_cache
+from text_cache import text_cache
+from background import ScrollingBackground
+from entity_store import EntityStore
+from pools import ObjectPool
+from lifecycle import SpawnScheduler
+from particles import ParticleSystem
+from input_queue import TickInput
+import entity_store
+import particles
 from config import *
 
 
@@ -13,18 +25,41 @@ class GameLogic:
 
     def reset_game(self):
         """Сброс состояния игры к начальному"""
-        self.ship = Ship(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
-        self.bullets = []
-        self.asteroids = []
-        self.explosions = []
-        self.score = INITIAL_SCORE
-        self.lives = INITIAL_LIVES
+        self.ship = Ship(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, self.config)
+        # Все корабли игры; первый - корабль локального игрока (self.ship)
+        self.ships = [self.ship]
+        self.use_entity_store = self.config.ENTITY_STORE and entity_store.available()
+        for pool in self.pools.values():
+            pool.release_all()
+        if self.use_entity_store:
+            # Ракеты и астероиды хранятся в массивах NumPy
+            self.bullets = EntityStore(self.config.ENTITY_STORE_CAPACITY, self.rotation_cache)
+            self.asteroids = EntityStore(self.config.ENTITY_STORE_CAPACITY, self.rotation_cache)
+        else:
+            # Списки живых объектов принадлежат пулам
+            self.bullets = self.pools["bullets"].active
+            self.asteroids = self.pools["asteroids"].active
+        self.use_particle_system = self.config.PARTICLE_SYSTEM and particles.available()
+        if self.use_particle_system:
+            # Взрывы хранятся в общих массивах системы частиц
+            self.explosions = ParticleSystem(self.config.PARTICLE_CAPACITY, self.config)
+        else:
+            self.explosions = self.pools["explosions"].active
+        self.score = self.config.INITIAL_SCORE
+        self.lives = self.config.INITIAL_LIVES
         self.game_state = "start"
         self.asteroid_timer = 0
         self.background_offset = 0
+        # Наибольшая скорость астероида в этой игре: осколки разлетаются быстрее исходных астероидов
+        self.asteroid_speed_limit = self.config.ASTEROID_MAX_SPEED
 
     def handle_events(self, events):
         """Обработка событий игры"""
+        # Время читается один раз за кадр, чтобы его можно было записать для повтора
+        now = self.clock()
+        if self.recorder is not None:
+            self.recorder.record(self, events, now)
+
         for event in events:
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if self.game_state == "start":
@@ -38,175 +73,432 @@ class GameLogic:
                     self.game_state = "playing"
 
         if self.game_state == "playing":
-            keys = pygame.key.get_pressed()
-
-            # Вращение корабля
-            if keys[pygame.K_LEFT]:
-                self.ship.rotate(-1)
-            if keys[pygame.K_RIGHT]:
-                self.ship.rotate(1)
-
-            # Ускорение корабля
-            if keys[pygame.K_UP]:
-                self.ship.thrust()
-            else:
-                self.ship.stop_thrust()
-
-            # Выстрел
-            if keys[pygame.K_SPACE]:
-                if not hasattr(self, 'last_shot') or pygame.time.get_ticks() - self.last_shot > 300:
-                    nose_x, nose_y = self.ship.get_nose_position()
-                    self.bullets.append(Bullet(nose_x, nose_y, self.ship.angle))
-                    self.last_shot = pygame.time.get_ticks()
+            self.last_shot = self.steer_ship(self.ship, self.input_source(), now, self.last_shot)
+
+    def steer_ship(self, ship, keys, now, last_shot):
+        """Управление кораблем по состоянию клавиш; возвращает время последнего выстрела (или None)
+
+        keys - pygame.key.get_pressed() или совместимый объект; ввод с командами
+        за тик (TickInput) обрабатывает steer_ship_timed.
+        """
+        if isinstance(keys, TickInput):
+            return self.steer_ship_timed(ship, keys, now, last_shot)
+
+        # Вращение корабля
+        if keys[pygame.K_LEFT]:
+            ship.rotate(-1)
+        if keys[pygame.K_RIGHT]:
+            ship.rotate(1)
+
+        # Ускорение корабля
+        if keys[pygame.K_UP]:
+            ship.thrust()
+        else:
+            ship.stop_thrust()
+
+        # Выстрел
+        if keys[pygame.K_SPACE]:
+            if last_shot is None or now - last_shot > self.config.SHOT_COOLDOWN_MS:
+                nose_x, nose_y = ship.get_nose_position()
+                self.spawn_bullet(nose_x, nose_y, ship.angle)
+                return now
+        return last_shot
+
+    def steer_ship_timed(self, ship, keys, now, last_shot):
+        """Управление кораблем по командам тика, который заканчивается в момент now
+
+        Вращение и ускорение пропорциональны доле тика, когда клавиша была нажата;
+        выстрел происходит в момент нажатия (или окончания перезарядки) внутри тика.
+        """
+        turn = keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]
+        if turn:
+            ship.rotate(turn)
+
+        thrust = keys[pygame.K_UP]
+        if thrust:
+            ship.thrust(thrust)
+        else:
+            ship.stop_thrust()
+
+        shots = keys.shot_times(pygame.K_SPACE, now, last_shot, self.config.SHOT_COOLDOWN_MS,
+                                 1000 / self.config.FPS)
+        for shot_time, delay in shots:
+            nose_x, nose_y = ship.get_nose_position()
+            self.spawn_bullet(nose_x, nose_y, ship.angle, delay)
+            last_shot = shot_time
+        return last_shot
 
     def update(self):
         """Обновление состояния игры"""
         if self.game_state != "playing":
             return
 
-        # Обновление фона
-        self.background_offset = (self.background_offset - 1) % SCREEN_WIDTH
+        self.update_objects()
+        if self.profiler is not None:
+            self.profiler.mark("update")
 
-        # Обновление корабля
-        self.ship.update()
+        self.check_collisions()
+        if self.profiler is not None:
+            self.profiler.mark("collisions")
+
+    def update_objects(self):
+        """Движение объектов, появление астероидов и анимация взрывов (без столкновений)"""
+        # Обновление фона: смещение не сворачивается по ширине экрана, иначе дальний слой
+        # параллакса прыгал бы при каждом сворачивании ближнего (слои сворачивают его сами)
+        self.background_offset -= self.config.BACKGROUND_SCROLL_SPEED
+
+        # Обновление кораблей
+        for ship in self.ships:
+            ship.update()
 
         # Обновление ракет
-        for bullet in self.bullets[:]:
-            bullet.update()
-            if not bullet.active:
-                self.bullets.remove(bullet)
+        if self.use_entity_store:
+            self.bullets.update()
+            self.bullets.compact()
+        else:
+            for bullet in self.bullets:
+                bullet.update()
+            self.pools["bullets"].release_inactive()
 
         # Генерация астероидов
         self.asteroid_timer += 1
-        if self.asteroid_timer >= ASTEROID_SPAWN_RATE:
-            self.asteroids.append(Asteroid())
+        if self.spawner.ready(self.asteroid_timer):
+            if self.spawner.allowed(len(self.asteroids)):
+                self.spawn_asteroid()
             self.asteroid_timer = 0
 
-        # Обновление астероидов
-        for asteroid in self.asteroids[:]:
-            asteroid.update()
+        # Обновление астероидов (отслужившие улетают с экрана и удаляются)
+        if self.use_entity_store:
+            self.asteroids.update()
+            self.asteroids.compact()
+        else:
+            for asteroid in self.asteroids:
+                asteroid.update()
+            self.pools["asteroids"].release_inactive()
 
         # Обновление взрывов
-        for explosion in self.explosions[:]:
-            explosion.update()
-            if not explosion.active:
-                self.explosions.remove(explosion)
+        if self.use_particle_system:
+            self.explosions.update()
+        else:
+            for explosion in self.explosions:
+                explosion.update()
+            self.pools["explosions"].release_inactive()
+
+    def check_collisions(self):
+        """Проверка столкновений выбранным способом"""
+        if self.use_entity_store:
+            self.check_collisions_store()
+        elif self.config.COLLISION_BROAD_PHASE == "grid":
+            self.check_collisions_grid()
+        else:
+            self.check_collisions_brute()
 
+    def check_collisions_brute(self):
+        """Проверка столкновений полным перебором пар"""
         # Проверка столкновений ракет с астероидами
-        for bullet in self.bullets[:]:
-            for asteroid in self.asteroids[:]:
-                if (bullet.get_rect().colliderect(asteroid.get_rect()) and
-                        self.distance(bullet.x, bullet.y, asteroid.x, asteroid.y) < asteroid.size):
-                    self.explosions.append(Explosion(asteroid.x, asteroid.y))
-                    self.asteroids.remove(asteroid)
-                    if bullet in self.bullets:
-                        self.bullets.remove(bullet)
-                    self.score += 1
+        for bullet in self.bullets:
+            asteroid = first_swept_hit(bullet, self.asteroids)
+            if asteroid is not None:
+                asteroid.active = False
+                bullet.active = False
+                self.asteroid_destroyed(asteroid.x, asteroid.y, asteroid.vx, asteroid.vy,
+                                        asteroid.size, asteroid.image_index)
+
+        # Проверка столкновений кораблей с астероидами
+        for ship in tuple(self.ships):
+            for asteroid in self.asteroids:
+                if not asteroid.active:
+                    continue
+                if circles_overlap(ship.x, ship.y, ship.size, asteroid.x, asteroid.y, asteroid.size):
+                    asteroid.active = False
+                    self.ship_hit(asteroid, ship)
                     break
 
-        # Проверка столкновений корабля с астероидами
-        for asteroid in self.asteroids[:]:
-            if (self.ship.get_rect().colliderect(asteroid.get_rect()) and
-                    self.distance(self.ship.x, self.ship.y, asteroid.x, asteroid.y) <
-                    (self.ship.size + asteroid.size)):
-                self.explosions.append(Explosion(asteroid.x, asteroid.y))
-                self.asteroids.remove(asteroid)
-                self.lives -= 1
-
-                if self.lives <= 0:
-                    self.game_state = "game_over"
-                else:
-                    # Возрождение корабля
-                    self.ship = Ship(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
-                break
+        # Возврат уничтоженных объектов в пулы
+        self.pools["asteroids"].release_inactive()
+        self.pools["bullets"].release_inactive()
+        self.spawn_fragments()
+
+    def check_collisions_grid(self):
+        """Проверка столкновений через пространственную сетку"""
+        grid = self.collision_grid
+        asteroids = self.asteroids
+        grid.rebuild(asteroids)
+        max_size = self.config.ASTEROID_MAX_SIZE
+        max_speed = self.asteroid_speed_limit
+
+        # Проверка столкновений ракет с астероидами (в порядке списка, как при переборе)
+        for bullet in self.bullets:
+            vx, vy = bullet.vx, bullet.vy
+            # Поиск вокруг середины пройденного отрезка: астероид не больше ASTEROID_MAX_SIZE
+            # и за тик смещается не больше чем на наибольшую скорость астероида в игре
+            reach = max_size + bullet.size + max_speed + (abs(vx) + abs(vy)) / 2
+            candidates = sorted(grid.query(bullet.x - vx / 2, bullet.y - vy / 2, reach))
+            asteroid = first_swept_hit(bullet, map(asteroids.__getitem__, candidates))
+            if asteroid is not None:
+                asteroid.active = False
+                bullet.active = False
+                self.asteroid_destroyed(asteroid.x, asteroid.y, asteroid.vx, asteroid.vy,
+                                        asteroid.size, asteroid.image_index)
+
+        # Проверка столкновений кораблей с астероидами
+        for ship in tuple(self.ships):
+            for index in sorted(grid.query(ship.x, ship.y, ship.size + max_size)):
+                asteroid = self.asteroids[index]
+                if not asteroid.active:
+                    continue
+                if circles_overlap(ship.x, ship.y, ship.size, asteroid.x, asteroid.y, asteroid.size):
+                    asteroid.active = False
+                    self.ship_hit(asteroid, ship)
+                    break
+
+        # Возврат уничтоженных объектов в пулы
+        self.pools["asteroids"].release_inactive()
+        self.pools["bullets"].release_inactive()
+        self.spawn_fragments()
+
+    def check_collisions_store(self):
+        """Проверка столкновений векторно по массивам хранилища"""
+        asteroids = self.asteroids
+        pairs = asteroids.collide(self.bullets)
+        for bullet_index, index in pairs:
+            self.asteroid_destroyed(asteroids.x[index], asteroids.y[index], asteroids.vx[index],
+                                    asteroids.vy[index], int(asteroids.size[index]),
+                                    int(asteroids.image_index[index]))
+        asteroids.remove_indices([index for bullet_index, index in pairs])
+        self.bullets.remove_indices([bullet_index for bullet_index, index in pairs])
+
+        # Проверка столкновений кораблей с астероидами
+        for ship in tuple(self.ships):
+            index = asteroids.first_hit(ship.x, ship.y, ship.size)
+            if index is not None:
+                self.ship_hit(asteroids[index], ship)
+                asteroids.remove_indices([index])
+        self.spawn_fragments()
+
+    def asteroid_destroyed(self, x, y, vx, vy, size, image_index):
+        """Уничтожение астероида ракетой: взрыв, очки и осколки (создаются после проверки)"""
+        self.spawn_explosion(x, y)
+        self.score += 1
+        config = self.config
+        if config.ASTEROID_SPLIT and int(size * config.ASTEROID_FRAGMENT_SCALE) >= config.ASTEROID_MIN_SIZE:
+            self.fragment_queue.append((x, y, vx, vy, size, image_index))
+
+    def spawn_fragments(self):
+        """Создание осколков уничтоженных за кадр астероидов в пределах бюджета"""
+        config = self.config
+        budget = config.ASTEROID_FRAGMENT_BUDGET
+        for x, y, vx, vy, size, image_index in self.fragment_queue:
+            fragment_size = int(size * config.ASTEROID_FRAGMENT_SCALE)
+            # Осколки разлетаются в равные стороны от случайного направления
+            base_angle = self.rng.uniform(0, 2 * math.pi)
+            for i in range(config.ASTEROID_FRAGMENTS):
+                if budget <= 0 or not self.spawner.allowed(len(self.asteroids)):
+                    break
+                angle = base_angle + 2 * math.pi * i / config.ASTEROID_FRAGMENTS
+                dx = math.cos(angle)
+                dy = math.sin(angle)
+                self.spawn_fragment(x + dx * fragment_size / 2, y + dy * fragment_size / 2,
+                                    vx + dx * config.ASTEROID_FRAGMENT_SPEED,
+                                    vy + dy * config.ASTEROID_FRAGMENT_SPEED,
+                                    fragment_size, image_index)
+                budget -= 1
+        self.fragment_queue.clear()
+
+    def ship_hit(self, asteroid, ship=None):
+        """Обработка столкновения корабля (по умолчанию - локального) с астероидом"""
+        self.spawn_explosion(asteroid.x, asteroid.y)
+        self.lives -= 1
+
+        if self.lives <= 0:
+            self.game_state = "game_over"
+        else:
+            # Возрождение корабля
+            index = self.ships.index(ship or self.ship)
+            self.ships[index] = Ship(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, self.config)
+            self.ship = self.ships[0]
+
+    def add_ship(self):
+        """Добавление корабля еще одного игрока (сетевая игра); возвращает корабль"""
+        x = (SCREEN_WIDTH // 2 + 60 * len(self.ships)) % SCREEN_WIDTH
+        ship = Ship(x, SCREEN_HEIGHT // 2, self.config)
+        self.ships.append(ship)
+        return ship
+
+    def remove_ship(self, index):
+        """Удаление корабля ушедшего игрока"""
+        del self.ships[index]
+        if self.ships:
+            self.ship = self.ships[0]
+
+    def spawn_bullet(self, x, y, angle, delay=0.0):
+        """Создание ракеты (из пула или в хранилище)
+
+        delay - доля тика от его начала до выстрела: ракета сдвигается назад
+        и за обновление пролетает только остаток тика.
+        """
+        if delay:
+            angle_rad = math.radians(angle)
+            x -= math.sin(angle_rad) * self.config.BULLET_SPEED * delay
+            y += math.cos(angle_rad) * self.config.BULLET_SPEED * delay
+        if self.use_entity_store:
+            self.bullets.append(Bullet(x, y, angle, self.config))
+        else:
+            self.pools["bullets"].acquire(x, y, angle)
+
+    def spawn_asteroid(self):
+        """Создание астероида (из пула или в хранилище)"""
+        if self.use_entity_store:
+            self.asteroids.append(Asteroid(rng=self.rng, config=self.config))
+        else:
+            self.pools["asteroids"].acquire(rng=self.rng)
+
+    def spawn_fragment(self, x, y, vx, vy, size, image_index):
+        """Создание осколка астероида (из пула или в хранилище)"""
+        speed = math.hypot(vx, vy)
+        if speed > self.asteroid_speed_limit:
+            self.asteroid_speed_limit = speed
+        if self.use_entity_store:
+            fragment = Asteroid(x, y, rng=placeholder_rng, config=self.config)
+            fragment.reset_fragment(x, y, vx, vy, size, image_index, self.rng)
+            self.asteroids.append(fragment)
+        else:
+            fragment = self.pools["asteroids"].take(x, y, rng=placeholder_rng)
+            fragment.reset_fragment(x, y, vx, vy, size, image_index, self.rng)
+
+    def spawn_explosion(self, x, y):
+        """Создание взрыва в системе частиц или из пула"""
+        if self.use_particle_system:
+            self.explosions.spawn(x, y)
+        else:
+            self.pools["explosions"].acquire(x, y)
+
+    def report_frame_time(self, frame_ms):
+        """Передача измеренного времени кадра планировщику появления астероидов"""
+        # Время кадра не воспроизводится при повторе, поэтому при записи не учитывается
+        if self.recorder is None:
+            self.spawner.report_frame_time(frame_ms)
+
+    def get_pool_stats(self):
+        """Статистика пулов объектов (для подбора емкостей в config.py)"""
+        return {name: pool.get_stats() for name, pool in self.pools.items()}
 
     def distance(self, x1, y1, x2, y2):
         """Вычисление расстояния между двумя точками"""
         return math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
 
-    def __init__(self):
+    def __init__(self, headless=False, seed=None, config=None):
+        self.headless = headless
+        # Параметры этой игры (по умолчанию - значения из config.py)
+        self.config = config if config is not None else GameConfig()
+        # Кэш поворотов для хранилищ сущностей (объекты берут его из тех же параметров)
+        self.rotation_cache = get_rotation_cache(self.config)
+        # Собственный генератор случайных чисел делает игру воспроизводимой
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.background_rng = random.Random(self.seed)
+        # Запись ввода для повтора (см. replay.py)
+        self.recorder = None
+        # Замер времени фаз обновления (см. profiler.py)
+        self.profiler = None
+        # Появление астероидов
+        self.spawner = SpawnScheduler(self.config)
+        # Уничтоженные за кадр астероиды, которые раскалываются на осколки
+        self.fragment_queue = []
+        # Пулы объектов переживают перезапуск игры
+        self.pools = {
+            "bullets": ObjectPool(partial(Bullet, config=self.config), self.config.BULLET_POOL_CAPACITY),
+            "asteroids": ObjectPool(partial(Asteroid, config=self.config), self.config.ASTEROID_POOL_CAPACITY),
+            "explosions": ObjectPool(partial(Explosion, config=self.config),
+                                     self.config.EXPLOSION_POOL_CAPACITY),
+        }
+        # Источники ввода и времени можно подменить (например, в симуляции без экрана)
+        self.input_source = pygame.key.get_pressed
+        # Время последнего выстрела локального игрока (None - выстрелов еще не было)
+        self.last_shot = None
+        self.clock = pygame.time.get_ticks
+        if headless:
+            asset_cache.convert = False
         self.reset_game()
-        self.load_images()
+        if headless:
+            # Без видеорежима фон не нужен и не может быть преобразован
+            self.background = None
+        else:
+            self.load_images()
+        self.collision_grid = SpatialHash(self.config.COLLISION_CELL_SIZE)
+        # Иконка жизни создается один раз, а не каждый кадр
+        self.life_icon = None
+        # Заранее отрисованный текст меню
+        self.menu_layers = {}
 
     def load_images(self):
         """Загрузка изображений для игры"""
-        try:
-            # Загрузка фонового изображения
-            self.background_image = pygame.image.load(BACKGROUND_IMAGE_PATH).convert()
-            # Масштабирование изображения под размер экрана
-            self.background_image = pygame.transform.scale(self.background_image, (SCREEN_WIDTH, SCREEN_HEIGHT))
-            # Установка прозрачности
-            self.background_image.set_alpha(128)
-        except pygame.error as e:
-            print(f"Не удалось загрузить фоновое изображение: {e}")
+        # Загрузка фонового изображения (из общего кэша, заполненного пакетом ресурсов)
+        image = asset_cache.get(BACKGROUND_IMAGE_PATH)
+        if image is None:
+            print("Не удалось загрузить фоновое изображение")
             print("Будет использован стандартный фон")
-            self.background_image = None
+        else:
+            image = image.convert()
+        # Фон подготавливается один раз в формате экрана
+        self.background = ScrollingBackground(image, self.config.BACKGROUND_MODE, self.background_rng,
+                                              self.config.BACKGROUND_PARALLAX_FACTOR, self.config.BACKGROUND_TILE_SIZE)
 
     def draw_background(self, screen):
-        """Отрисовка фона с изображением"""
-        # Заливка черным цветом как базовый фон
-        screen.fill(BLACK)
-
-        if self.background_image is not None:
-            # Создаем поверхность для фона с движением
-            bg_width = self.background_image.get_width()
-
-            # Рисуем два изображения для бесшовной прокрутки
-            screen.blit(self.background_image, (self.background_offset, 0))
-            screen.blit(self.background_image, (self.background_offset - bg_width, 0))
+        """Отрисовка фона из заранее подготовленных слоев"""
+        if self.background is None:
+            screen.fill(BLACK)
         else:
-            # Стандартный фон
-            bg_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-
-            # Рисуем фоновые астероиды
-            for i in range(5):
-                x = (self.background_offset + i * 200) % SCREEN_WIDTH
-                for j in range(4):
-                    y = j * 150
-                    size = 15 + i * 2
+            self.background.draw(screen, self.background_offset)
 
-                    # Простой астероид для фона
-                    points = []
-                    num_points = 6
-                    for k in range(num_points):
-                        angle = 2 * math.pi * k / num_points
-                        distance = size * random.uniform(0.8, 1.0)
-                        points.append((x + math.cos(angle) * distance,
-                                       y + math.sin(angle) * distance))
-
-                    pygame.draw.polygon(bg_surface, (100, 100, 100, 100), points, 1)
-
-            screen.blit(bg_surface, (0, 0))
+    def render_layers(self):
+        """Слои игровых объектов для очереди отрисовки, снизу вверх: (имя, объекты)"""
+        return (
+            ("asteroids", self.asteroids),
+            ("bullets", self.bullets),
+            ("explosions", self.explosions),
+            ("ship", self.ships),
+        )
 
     def draw_ui(self, screen, font):
-        """Отрисовка интерфейса пользователя"""
+        """Отрисовка интерфейса пользователя; возвращает список измененных областей"""
+        dirty = []
+
         # Отображение счета
-        score_text = font.render(f"{SCORE_TEXT}{self.score}", True, WHITE)
-        screen.blit(score_text, (10, 10))
+        score_text = text_cache.render(font, f"{SCORE_TEXT}{self.score}", WHITE)
+        dirty.append(screen.blit(score_text, (10, 10)))
 
         # Отображение жизней
-        lives_text = font.render(f"{LIVES_TEXT}{self.lives}", True, WHITE)
-        screen.blit(lives_text, (10, 40))
+        lives_text = text_cache.render(font, f"{LIVES_TEXT}{self.lives}", WHITE)
+        dirty.append(screen.blit(lives_text, (10, 40)))
 
         # Отображение жизней в виде кораблей
+        if self.life_icon is None:
+            self.life_icon = Ship(0, 0).ship_image_normal
         for i in range(self.lives):
-            life_ship = Ship(SCREEN_WIDTH - 50 - i * 40, 30)
-            life_ship.size = 15
-            life_ship.draw(screen)
-
-    def draw_start_screen(self, screen, font, big_font):
-        """Отрисовка начального экрана"""
-        self.draw_background(screen)
+            icon_rect = self.life_icon.get_rect(center=(SCREEN_WIDTH - 50 - i * 40, 30))
+            dirty.append(screen.blit(self.life_icon, icon_rect))
+        return dirty
+
+    def get_menu_layer(self, name, key, build):
+        """Готовый слой статичного текста меню (перестраивается при смене ключа)"""
+        cached = self.menu_layers.get(name)
+        if cached is None or cached[0] != key:
+            cached = (key, build())
+            self.menu_layers[name] = cached
+        return cached[1]
+
+    def build_start_layer(self, font, big_font):
+        """Отрисовка текста начального экрана в список (изображение, позиция)"""
+        layer = []
 
         # Заголовок игры
         title_text = big_font.render(GAME_TITLE, True, WHITE)
-        title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
-        screen.blit(title_text, title_rect)
+        layer.append((title_text, title_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))))
 
         # Инструкция
         start_text = font.render(START_TEXT, True, GREEN)
-        start_rect = start_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50))
-        screen.blit(start_text, start_rect)
+        layer.append((start_text, start_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50))))
 
         # Управление
         controls = [
@@ -218,25 +510,39 @@ class GameLogic:
 
         for i, text in enumerate(controls):
             control_text = font.render(text, True, BLUE)
-            screen.blit(control_text, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 100 + i * 30))
+            layer.append((control_text, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 100 + i * 30)))
+        return layer
 
-    def draw_game_over(self, screen, font, big_font):
-        """Отрисовка экрана окончания игры"""
-        self.draw_background(screen)
+    def build_game_over_layer(self, font, big_font):
+        """Отрисовка текста экрана окончания игры в список (изображение, позиция)"""
+        layer = []
 
         # Сообщение о конце игры
         game_over_text = big_font.render(GAME_OVER_TEXT, True, RED)
-        game_over_rect = game_over_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
-        screen.blit(game_over_text, game_over_rect)
+        layer.append((game_over_text,
+                      game_over_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))))
 
         # Финальный счет
         final_score = font.render(f"Финальный счет: {self.score}", True, WHITE)
-        score_rect = final_score.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20))
-        screen.blit(final_score, score_rect)
+        layer.append((final_score, final_score.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20))))
 
         # Инструкция для перезапуска
         restart_text = font.render("Щелкните для новой игры", True, GREEN)
-        restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 70))
-        screen.blit(restart_text, restart_rect)
+        layer.append((restart_text, restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 70))))
+        return layer
+
+    def draw_start_screen(self, screen, font, big_font):
+        """Отрисовка начального экрана"""
+        self.draw_background(screen)
+        layer = self.get_menu_layer("start", (font, big_font),
+                                    lambda: self.build_start_layer(font, big_font))
+        screen.blits(layer, doreturn=False)
+
+    def draw_game_over(self, screen, font, big_font):
+        """Отрисовка экрана окончания игры"""
+        self.draw_background(screen)
+        layer = self.get_menu_layer("game_over", (font, big_font, self.score),
+                                    lambda: self.build_game_over_layer(font, big_font))
+        screen.blits(layer, doreturn=False)
 
 BACKGROUND_IMAGE_PATH = "pictures/background.png"
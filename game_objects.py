@@ -1,14 +1,20 @@
 import pygame
 import math
 import random
-import os
 from config import *
+from assets import asset_cache, get_rotation_cache
+from pools import serials
 
 
 class GameObject:
     """Базовый класс для всех игровых объектов с поддержкой изображений"""
 
-    def __init__(self, x, y, vx=0, vy=0):
+    def __init__(self, x, y, vx=0, vy=0, config=default_config):
+        self.config = config
+        # Кэш поворотов с числом кадров из параметров игры
+        self.rotation_cache = get_rotation_cache(config)
+        # Порядковый номер; пул выдает повторно используемому объекту новый
+        self.serial = next(serials)
         self.x = x
         self.y = y
         self.vx = vx
@@ -20,28 +26,19 @@ class GameObject:
         self.rect = None
 
     def load_image(self, image_path, scale=1.0):
-        """Загрузка и масштабирование изображения"""
-        try:
-            if os.path.exists(image_path):
-                self.original_image = pygame.image.load(image_path).convert_alpha()
-                if scale != 1.0:
-                    new_width = int(self.original_image.get_width() * scale)
-                    new_height = int(self.original_image.get_height() * scale)
-                    self.original_image = pygame.transform.scale(self.original_image, (new_width, new_height))
-                self.image = self.original_image
-                self.rect = self.image.get_rect(center=(self.x, self.y))
-                return True
-            else:
-                print(f"Файл {image_path} не найден")
-                return False
-        except pygame.error as e:
-            print(f"Ошибка загрузки изображения {image_path}: {e}")
+        """Получение изображения из общего кэша"""
+        image = asset_cache.get(image_path, scale)
+        if image is None:
             return False
+        self.original_image = image
+        self.image = self.original_image
+        self.rect = self.image.get_rect(center=(self.x, self.y))
+        return True
 
     def update_image_rotation(self):
         """Обновление поворота изображения"""
         if self.original_image:
-            self.image = pygame.transform.rotate(self.original_image, -self.angle)
+            self.image = self.rotation_cache.get_frame(self.original_image, -self.angle)
             old_center = self.rect.center if self.rect else (self.x, self.y)
             self.rect = self.image.get_rect(center=old_center)
 
@@ -65,12 +62,12 @@ class GameObject:
             self.rect.center = (self.x, self.y)
 
     def draw(self, screen):
-        """Отрисовка объекта с изображением"""
+        """Отрисовка объекта с изображением; возвращает измененную область экрана"""
         if self.image and self.rect:
-            screen.blit(self.image, self.rect)
+            return screen.blit(self.image, self.rect)
         else:
             # Резервная отрисовка (красный прямоугольник)
-            pygame.draw.rect(screen, RED, (self.x - 10, self.y - 10, 20, 20), 2)
+            return pygame.draw.rect(screen, RED, (self.x - 10, self.y - 10, 20, 20), 2)
 
     def get_rect(self):
         """Возвращает прямоугольник для проверки столкновений"""
@@ -83,11 +80,11 @@ class GameObject:
 class Ship(GameObject):
     """Класс корабля игрока с поддержкой изображений"""
 
-    def __init__(self, x, y):
-        super().__init__(x, y)
+    def __init__(self, x, y, config=default_config):
+        super().__init__(x, y, config=config)
         self.acceleration = 0
         self.thrusting = False
-        self.size = SHIP_SIZE
+        self.size = config.SHIP_SIZE
 
         # Загрузка изображений корабля
         self.ship_image_normal = None
@@ -105,11 +102,8 @@ class Ship(GameObject):
         self.ship_image_normal = self.original_image
 
         # Загружаем изображение с работающими двигателями
-        if os.path.exists("ship_thrust.png"):
-            thrust_image = pygame.image.load("ship_thrust.png").convert_alpha()
-            thrust_image = pygame.transform.scale(thrust_image,
-                                                  (self.ship_image_normal.get_width(),
-                                                   self.ship_image_normal.get_height()))
+        thrust_image = asset_cache.get("ship_thrust.png", size=self.ship_image_normal.get_size())
+        if thrust_image is not None:
             self.ship_image_thrust = thrust_image
         else:
             # Создаем изображение с двигателями
@@ -163,15 +157,15 @@ class Ship(GameObject):
 
     def rotate(self, direction):
         """Вращение корабля"""
-        self.angle += direction * SHIP_ROTATION_SPEED
+        self.angle += direction * self.config.SHIP_ROTATION_SPEED
         self.update_image_rotation()
 
-    def thrust(self):
-        """Включение двигателей"""
+    def thrust(self, amount=1):
+        """Включение двигателей; amount - доля тика, в течение которой они работают"""
         self.thrusting = True
         # Ускорение в направлении носа корабля
         angle_rad = math.radians(self.angle)
-        self.acceleration = SHIP_ACCELERATION
+        self.acceleration = self.config.SHIP_ACCELERATION * amount
         self.vx += math.sin(angle_rad) * self.acceleration
         self.vy += -math.cos(angle_rad) * self.acceleration
 
@@ -194,8 +188,8 @@ class Ship(GameObject):
         """Обновление состояния корабля"""
         # Применение трения при выключенных двигателях
         if not self.thrusting:
-            self.vx *= SHIP_FRICTION
-            self.vy *= SHIP_FRICTION
+            self.vx *= self.config.SHIP_FRICTION
+            self.vy *= self.config.SHIP_FRICTION
 
         super().update()
 
@@ -219,20 +213,34 @@ class Ship(GameObject):
 class Bullet(GameObject):
     """Класс ракеты с графическим изображением"""
 
-    def __init__(self, x, y, angle):
-        # Начальная скорость в направлении выстрела
-        angle_rad = math.radians(angle)
-        vx = math.sin(angle_rad) * BULLET_SPEED
-        vy = -math.cos(angle_rad) * BULLET_SPEED
-
-        super().__init__(x, y, vx, vy)
-        self.angle = angle
-        self.lifetime = BULLET_LIFETIME
+    def __init__(self, x, y, angle, config=default_config):
+        super().__init__(x, y, config=config)
+        self.size = config.BULLET_SIZE
+        self.procedural_image = False
+        self.reset(x, y, angle)
 
         # Загрузка изображения ракеты
         if not self.load_image("pictures/rocket.png", 0.3):
             self.create_rocket_image()
 
+    def reset(self, x, y, angle):
+        """Повторная инициализация ракеты (при выдаче из пула)"""
+        # Начальная скорость в направлении выстрела
+        angle_rad = math.radians(angle)
+        self.x = x
+        self.y = y
+        self.vx = math.sin(angle_rad) * self.config.BULLET_SPEED
+        self.vy = -math.cos(angle_rad) * self.config.BULLET_SPEED
+        self.angle = angle
+        self.lifetime = self.config.BULLET_LIFETIME
+        self.active = True
+
+        if self.procedural_image and self.config.ROTATE_SPRITES:
+            # Нарисованная ракета повернута в направлении полета
+            self.update_image_rotation()
+        if self.rect:
+            self.rect.center = (x, y)
+
     def create_rocket_image(self):
         """Создание изображения ракеты программно"""
         surface = pygame.Surface((20, 40), pygame.SRCALPHA)
@@ -262,6 +270,7 @@ class Bullet(GameObject):
         ])
 
         self.original_image = surface
+        self.procedural_image = True
         self.update_image_rotation()
 
     def update(self):
@@ -275,42 +284,88 @@ class Bullet(GameObject):
 class Asteroid(GameObject):
     """Класс астероида с графическим изображением"""
 
-    def __init__(self, x=None, y=None):
+    def __init__(self, x=None, y=None, rng=random, config=default_config):
+        super().__init__(0, 0, config=config)
+        self.reset(x, y, rng)
+
+    def reset(self, x=None, y=None, rng=random):
+        """Повторная инициализация астероида (при выдаче из пула)"""
+        # Генератор случайных чисел (по умолчанию - общий модуль random)
+        self.rng = rng
+
         # Случайная позиция, если не задана
         if x is None or y is None:
-            side = random.randint(0, 3)
+            side = rng.randint(0, 3)
             if side == 0:  # верх
-                x = random.randint(0, SCREEN_WIDTH)
+                x = rng.randint(0, SCREEN_WIDTH)
                 y = -50
             elif side == 1:  # право
                 x = SCREEN_WIDTH + 50
-                y = random.randint(0, SCREEN_HEIGHT)
+                y = rng.randint(0, SCREEN_HEIGHT)
             elif side == 2:  # низ
-                x = random.randint(0, SCREEN_WIDTH)
+                x = rng.randint(0, SCREEN_WIDTH)
                 y = SCREEN_HEIGHT + 50
             else:  # лево
                 x = -50
-                y = random.randint(0, SCREEN_HEIGHT)
+                y = rng.randint(0, SCREEN_HEIGHT)
 
         # Случайная скорость и вращение
-        angle = random.uniform(0, 2 * math.pi)
-        speed = random.uniform(ASTEROID_MIN_SPEED, ASTEROID_MAX_SPEED)
+        angle = rng.uniform(0, 2 * math.pi)
+        config = self.config
+        speed = rng.uniform(config.ASTEROID_MIN_SPEED, config.ASTEROID_MAX_SPEED)
         vx = math.cos(angle) * speed
         vy = math.sin(angle) * speed
 
-        super().__init__(x, y, vx, vy)
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.angle = 0
+        self.active = True
+
+        # Время жизни: после него астероид улетает за край экрана вместо переноса
+        self.age = 0
+        self.max_age = min(config.ASTEROID_MAX_AGE, config.ASTEROID_MAX_DISTANCE / speed)
 
-        self.rotation_speed = random.uniform(ASTEROID_MIN_ROTATION, ASTEROID_MAX_ROTATION)
-        self.size = random.randint(ASTEROID_MIN_SIZE, ASTEROID_MAX_SIZE)
+        self.rotation_speed = rng.uniform(config.ASTEROID_MIN_ROTATION, config.ASTEROID_MAX_ROTATION)
+        self.size = rng.randint(config.ASTEROID_MIN_SIZE, config.ASTEROID_MAX_SIZE)
 
         # Загрузка изображения астероида
         asteroid_images = ["asteroid1.png", "asteroid2.png", "asteroid3.png"]
-        selected_image = random.choice(asteroid_images)
+        selected_image = rng.choice(asteroid_images)
+        # Номер изображения нужен, чтобы восстановить астероид из снимка (-1 - нарисован программно)
+        self.image_index = asteroid_images.index(selected_image)
 
         # Масштабирование в зависимости от размера
         scale = self.size / 40.0  # 40 - базовый размер
 
         if not self.load_image(selected_image, scale):
+            self.image_index = -1
+            self.create_asteroid_image()
+
+    def reset_fragment(self, x, y, vx, vy, size, image_index, rng):
+        """Повторная инициализация астероида как осколка с заданными параметрами"""
+        self.rng = rng
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.angle = 0
+        self.active = True
+        self.age = 0
+        config = self.config
+        speed = math.hypot(vx, vy)
+        self.max_age = config.ASTEROID_MAX_AGE
+        if speed > 0:
+            self.max_age = min(self.max_age, config.ASTEROID_MAX_DISTANCE / speed)
+        self.rotation_speed = rng.uniform(config.ASTEROID_MIN_ROTATION, config.ASTEROID_MAX_ROTATION)
+        self.size = size
+
+        # Изображение того же астероида меньшего размера (из общего кэша)
+        self.image_index = image_index
+        self.rect = None
+        if image_index < 0 or not self.load_image(ASTEROID_IMAGES[image_index], size / 40.0):
+            self.image_index = -1
             self.create_asteroid_image()
 
     def create_asteroid_image(self):
@@ -320,10 +375,10 @@ class Asteroid(GameObject):
 
         # Создаем неправильную форму астероида
         points = []
-        num_points = random.randint(8, 12)
+        num_points = self.rng.randint(8, 12)
         for i in range(num_points):
             angle = 2 * math.pi * i / num_points
-            distance = size * random.uniform(0.7, 1.0)
+            distance = size * self.rng.uniform(0.7, 1.0)
             x = size + math.cos(angle) * distance
             y = size + math.sin(angle) * distance
             points.append((x, y))
@@ -333,10 +388,10 @@ class Asteroid(GameObject):
         pygame.draw.polygon(surface, (100, 100, 100), points, 2)  # контур
 
         # Добавляем кратеры
-        for _ in range(random.randint(2, 5)):
-            crater_x = random.randint(size // 4, size * 3 // 2)
-            crater_y = random.randint(size // 4, size * 3 // 2)
-            crater_size = random.randint(size // 8, size // 4)
+        for _ in range(self.rng.randint(2, 5)):
+            crater_x = self.rng.randint(size // 4, size * 3 // 2)
+            crater_y = self.rng.randint(size // 4, size * 3 // 2)
+            crater_size = self.rng.randint(size // 8, size // 4)
             pygame.draw.circle(surface, (120, 120, 120), (crater_x, crater_y), crater_size)
 
         self.original_image = surface
@@ -345,37 +400,53 @@ class Asteroid(GameObject):
     def update(self):
         """Обновление состояния астероида"""
         self.angle += self.rotation_speed
-        self.update_image_rotation()
+        if self.config.ROTATE_SPRITES:
+            self.update_image_rotation()
+
+        self.age += 1
+        if self.age >= self.max_age and self.leaving_screen():
+            self.active = False
+            return
         super().update()
 
+    def leaving_screen(self):
+        """Покинет ли астероид экран на следующем шаге"""
+        x = self.x + self.vx
+        y = self.y + self.vy
+        return x < 0 or x > SCREEN_WIDTH or y < 0 or y > SCREEN_HEIGHT
+
+
+# Генератор для астероидов, поля которых сразу задаются извне (осколки, восстановление снимка)
+placeholder_rng = random.Random(0)
+
 
 class Explosion:
     """Класс анимации взрыва"""
 
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.timer = EXPLOSION_DURATION
+    def __init__(self, x, y, config=default_config):
+        self.config = config
         self.max_radius = 30
-        self.active = True
+        self.reset(x, y)
 
         # Попытка загрузить изображение взрыва
         self.explosion_images = []
         self.load_explosion_images()
+
+    def reset(self, x, y):
+        """Повторная инициализация взрыва (при выдаче из пула)"""
+        self.x = x
+        self.y = y
+        self.timer = self.config.EXPLOSION_DURATION
+        self.active = True
         self.current_frame = 0
 
     def load_explosion_images(self):
         """Загрузка изображений для анимации взрыва"""
-        try:
-            # Попробуем загрузить последовательность кадров взрыва
-            for i in range(1, 6):  # explosion1.png, explosion2.png, ...
-                img_path = f"explosion{i}.png"
-                if os.path.exists(img_path):
-                    img = pygame.image.load(img_path).convert_alpha()
-                    img = pygame.transform.scale(img, (60, 60))
-                    self.explosion_images.append(img)
-        except:
-            self.explosion_images = []  # Будем использовать графику
+        # Последовательность кадров взрыва из общего кэша
+        for i in range(1, 6):  # explosion1.png, explosion2.png, ...
+            img = asset_cache.get(f"explosion{i}.png", size=(60, 60))
+            if img is not None:
+                self.explosion_images.append(img)
 
     def update(self):
         """Обновление состояния взрыва"""
@@ -385,23 +456,23 @@ class Explosion:
         else:
             # Обновление кадра анимации
             if self.explosion_images:
-                progress = 1 - (self.timer / EXPLOSION_DURATION)
+                progress = 1 - (self.timer / self.config.EXPLOSION_DURATION)
                 self.current_frame = int(progress * (len(self.explosion_images) - 1))
 
     def draw(self, screen):
-        """Отрисовка взрыва"""
+        """Отрисовка взрыва; возвращает измененную область экрана (или None)"""
         if self.explosion_images and 0 <= self.current_frame < len(self.explosion_images):
             # Рисуем кадр анимации
             img_rect = self.explosion_images[self.current_frame].get_rect(center=(self.x, self.y))
-            screen.blit(self.explosion_images[self.current_frame], img_rect)
+            return screen.blit(self.explosion_images[self.current_frame], img_rect)
         else:
             # Графическое представление взрыва
-            progress = 1 - (self.timer / EXPLOSION_DURATION)
+            progress = 1 - (self.timer / self.config.EXPLOSION_DURATION)
             radius = int(self.max_radius * (1 - progress))
 
             if radius > 0:
                 # Основной круг взрыва
-                pygame.draw.circle(screen, YELLOW, (int(self.x), int(self.y)), radius)
+                dirty = pygame.draw.circle(screen, YELLOW, (int(self.x), int(self.y)), radius)
 
                 # Внешние частицы
                 for i in range(8):
@@ -410,7 +481,9 @@ class Explosion:
                     particle_x = self.x + math.cos(angle) * particle_distance
                     particle_y = self.y + math.sin(angle) * particle_distance
                     particle_size = max(1, int(radius * 0.3))
-                    pygame.draw.circle(screen, RED, (int(particle_x), int(particle_y)), particle_size)
+                    dirty.union_ip(pygame.draw.circle(screen, RED, (int(particle_x), int(particle_y)),
+                                                      particle_size))
+                return dirty
 
 # Пути к изображениям
 BACKGROUND_IMAGE_PATH = "pictures/background.png"
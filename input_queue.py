@@ -0,0 +1,186 @@
+import math
+import time
+from collections import deque, namedtuple
+import pygame
+from config import *
+from netcode import KEY_BITS
+from profiler import percentile
+
+# Смещение команды внутри тика в 1/TICK_STEPS тика (помещается в байт записи повтора)
+TICK_STEPS = 256
+KEY_BIT = dict(KEY_BITS)
+
+# Нажатие или отпускание клавиши игры; time - метка time.perf_counter() в секундах
+InputCommand = namedtuple("InputCommand", "time key pressed")
+
+
+class TickInput:
+    """Ввод одного тика: клавиши, нажатые в начале тика, и команды внутри тика
+
+    commands - (смещение, бит клавиши, нажата) по порядку прихода. Совместим
+    с pygame.key.get_pressed(), но вместо True/False возвращает долю тика,
+    в течение которой клавиша была нажата.
+    """
+
+    __slots__ = ("mask", "commands")
+
+    def __init__(self, mask=0, commands=()):
+        self.mask = mask
+        self.commands = commands
+
+    def intervals(self, key):
+        """Отрезки тика (в 1/TICK_STEPS), когда клавиша была нажата; короткое нажатие дает отрезок нулевой длины"""
+        bit = KEY_BIT.get(key)
+        if bit is None:
+            return []
+        result = []
+        begin = 0 if self.mask & bit else None
+        for offset, command_bit, pressed in self.commands:
+            if command_bit != bit:
+                continue
+            if pressed and begin is None:
+                begin = offset
+            elif not pressed and begin is not None:
+                result.append((begin, offset))
+                begin = None
+        if begin is not None:
+            result.append((begin, TICK_STEPS))
+        return result
+
+    def __getitem__(self, key):
+        return sum(end - begin for begin, end in self.intervals(key)) / TICK_STEPS
+
+    def shot_times(self, key, now, last_shot, cooldown_ms, tick_ms):
+        """Выстрелы при удержании key: (время в мс, доля тика) с перезарядкой cooldown_ms
+
+        Тик заканчивается в момент now; выстрел происходит в момент нажатия
+        или сразу после окончания перезарядки, а не в конце тика.
+        """
+        shots = []
+        step_ms = tick_ms / TICK_STEPS
+        for begin, end in self.intervals(key):
+            step = begin
+            while step <= end:
+                at = now - round((TICK_STEPS - step) * step_ms)
+                if last_shot is None or at - last_shot > cooldown_ms:
+                    shots.append((at, step / TICK_STEPS))
+                    last_shot = at
+                # Следующий момент, когда перезарядка может закончиться
+                ready = TICK_STEPS - (now - last_shot - cooldown_ms - 1) / step_ms
+                step = max(step + 1, math.ceil(ready))
+        return shots
+
+
+class InputQueue:
+    """Ввод командами с метками времени вместо опроса клавиш раз в кадр
+
+    Главный поток принимает события (get_events в начале кадра и wait, пока кадр
+    ждет своей очереди); каждый тик игры (next_tick) забирает команды, пришедшие
+    до его конца, с их положением внутри тика. Так короткие нажатия не теряются,
+    а выстрел не ждет конца кадра.
+    """
+
+    def __init__(self, tick_ms=1000 / FPS, enabled=INPUT_COMMANDS):
+        self.tick_ms = tick_ms
+        # Без команд (например, в сетевой игре) очередь только собирает события кадра
+        self.enabled = enabled
+        self.commands = deque()
+        # События, принятые во время ожидания, для следующего get_events
+        self.events = []
+        # Клавиши, нажатые к концу последнего тика, и ввод этого тика
+        self.mask = 0
+        self.current = TickInput()
+        self.last_end = None
+
+        # Статистика: метки примененных, но еще не показанных команд; задержка до экрана (мс)
+        self.applied = deque()
+        self.latency = deque(maxlen=INPUT_STATS_WINDOW)
+        self.received = 0
+        self.taps = 0
+
+    def push(self, event, stamp):
+        """Событие с меткой времени time.perf_counter(); клавиши игры становятся командами"""
+        if not self.enabled:
+            return
+        if event.type in (pygame.KEYDOWN, pygame.KEYUP) and event.key in KEY_BIT:
+            self.commands.append(InputCommand(stamp, event.key, event.type == pygame.KEYDOWN))
+            self.received += 1
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            # Отпускание клавиш вне окна не придет: нажатые клавиши отпускаются сейчас
+            for key in KEY_BIT:
+                self.commands.append(InputCommand(stamp, key, False))
+
+    def get_events(self):
+        """События с прошлого вызова (замена pygame.event.get())"""
+        events = self.events
+        self.events = []
+        stamp = time.perf_counter()
+        for event in pygame.event.get():
+            self.push(event, stamp)
+            events.append(event)
+        return events
+
+    def wait(self, until):
+        """Ожидание до момента until (time.perf_counter()) с приемом событий по мере прихода"""
+        while True:
+            remaining = until - time.perf_counter()
+            if remaining < 0.001:
+                # Остаток меньше шага таймера SDL
+                if remaining > 0:
+                    time.sleep(remaining)
+                return
+            event = pygame.event.wait(int(remaining * 1000))
+            if event.type != pygame.NOEVENT:
+                self.push(event, time.perf_counter())
+                self.events.append(event)
+
+    def next_tick(self, end=None):
+        """Ввод тика, который заканчивается в момент end (по умолчанию - сейчас)"""
+        if end is None:
+            end = time.perf_counter()
+        start = self.last_end if self.last_end is not None else end - self.tick_ms / 1000
+        self.last_end = end
+        duration = end - start
+
+        start_mask = self.mask
+        pressed_now = 0
+        commands = []
+        queue = self.commands
+        while queue and queue[0].time <= end:
+            command = queue.popleft()
+            bit = KEY_BIT[command.key]
+            if bool(self.mask & bit) == command.pressed:
+                # Повтор уже учтенного состояния
+                continue
+            offset = int((command.time - start) / duration * TICK_STEPS) if duration > 0 else 0
+            commands.append((max(0, min(TICK_STEPS - 1, offset)), bit, command.pressed))
+            self.mask ^= bit
+            self.applied.append(command.time)
+            if command.pressed:
+                pressed_now |= bit
+            elif pressed_now & bit:
+                # Нажатие короче тика: при опросе клавиш раз в кадр оно было бы потеряно
+                self.taps += 1
+        self.current = TickInput(start_mask, commands)
+        return self.current
+
+    def get_input(self):
+        """Ввод текущего тика (источник ввода для GameLogic.input_source)"""
+        return self.current
+
+    def presented(self):
+        """Кадр выведен на экран: задержка от ввода до изображения для примененных команд"""
+        now = time.perf_counter()
+        while self.applied:
+            self.latency.append((now - self.applied.popleft()) * 1000)
+
+    def get_stats(self):
+        """Число команд и коротких нажатий, задержка от ввода до изображения (мс)"""
+        latency = sorted(self.latency)
+        return {
+            "commands": self.received,
+            "taps": self.taps,
+            "latency_p50": percentile(latency, 0.5),
+            "latency_p95": percentile(latency, 0.95),
+            "latency_max": latency[-1] if latency else 0,
+        }
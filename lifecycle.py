@@ -0,0 +1,45 @@
+from config import *
+
+
+class SpawnScheduler:
+    """Планировщик появления астероидов: лимит численности и подстройка под бюджет кадра"""
+
+    def __init__(self, config=default_config):
+        self.base_interval = config.ASTEROID_SPAWN_RATE
+        self.interval = float(self.base_interval)
+        self.max_population = config.ASTEROID_MAX_POPULATION
+        self.frame_budget_ms = config.FRAME_BUDGET_MS
+        self.adaptive = config.ADAPTIVE_SPAWN
+        self.max_slowdown = config.ASTEROID_SPAWN_MAX_SLOWDOWN
+        self.average_ms = None
+
+    def ready(self, timer):
+        """Пора ли создавать новый астероид"""
+        return timer >= self.interval
+
+    def allowed(self, population):
+        """Не превышен ли лимит численности"""
+        return population < self.max_population
+
+    def report_frame_time(self, frame_ms):
+        """Учет измеренного времени кадра: при перегрузке астероиды появляются реже"""
+        if not self.adaptive:
+            return
+        if self.average_ms is None:
+            self.average_ms = frame_ms
+        else:
+            # Экспоненциальное сглаживание, чтобы одиночные задержки не влияли на частоту
+            self.average_ms += 0.1 * (frame_ms - self.average_ms)
+
+        if self.average_ms > self.frame_budget_ms:
+            self.interval = min(self.interval * 1.05, self.base_interval * self.max_slowdown)
+        elif self.average_ms < 0.75 * self.frame_budget_ms:
+            self.interval = max(float(self.base_interval), self.interval / 1.05)
+
+    def get_stats(self):
+        """Текущий интервал появления и сглаженное время кадра"""
+        return {
+            "interval": self.interval,
+            "average_ms": self.average_ms,
+            "max_population": self.max_population,
+        }
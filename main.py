@@ -1,70 +1,263 @@
+import time
+
+# Отсчет времени запуска до импорта pygame и остальных модулей
+started = time.perf_counter()
+
 import pygame
+import argparse
+import contextlib
+import os
 import sys
 from game_logic import GameLogic
+from profiler import FrameProfiler
+from text_cache import get_font
+from renderer import DirtyRectRenderer
+from render_queue import RenderQueue
+from render_target import RenderTarget
+from input_queue import InputQueue
+from asset_bundle import is_stale, build_bundle, load_bundle
+from startup import StartupTimer, CacheWarmer, warm_up_tasks, get_ticks
 from config import *
 
 
 def main():
     """Основная функция игры"""
-    # Инициализация Pygame
-    pygame.init()
+    parser = argparse.ArgumentParser(description="Игра Астероиды")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="играть на сервере (server.py)")
+    parser.add_argument("--session", default="default", help="имя сессии на сервере")
+    parser.add_argument("--udp", action="store_true", help="UDP вместо TCP")
+    parser.add_argument("--window", metavar="WxH", default=f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}",
+                        help="размер окна, например 1600x1200")
+    args = parser.parse_args()
+    window_size = tuple(int(value) for value in args.window.lower().split("x"))
+
+    timer = StartupTimer(started)
+    timer.mark("импорт")
+
+    # Инициализация только нужных модулей Pygame (без звука и джойстиков)
+    pygame.display.init()
+    pygame.font.init()
 
     # Создание окна
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    screen = pygame.display.set_mode(window_size, pygame.RESIZABLE)
     pygame.display.set_caption("Астероиды")
+    timer.mark("окно")
+
+    # Пакет ресурсов: изображения и шрифты одним файлом, уже декодированные
+    if ASSET_BUNDLE_AUTOBUILD and is_stale():
+        build_bundle()
+    if os.path.exists(ASSET_BUNDLE_PATH):
+        load_bundle()
+    timer.mark("ресурсы")
+
+    # Подключение к серверу: игра идет там, здесь только ввод и отрисовка
+    client = None
+    network = None
+    if args.connect:
+        from client import NetworkClient, apply_state
+        host, _, port = args.connect.rpartition(":")
+        client = network = NetworkClient(host or SERVER_HOST, int(port or SERVER_PORT), args.session, args.udp)
+        asteroid_images = {}
 
     # Создание игровой логики
-    game = GameLogic()
+    overrides = {}
+    if client is not None:
+        overrides["ENTITY_STORE"] = False
+    if DIRTY_RECTS and BACKGROUND_SCROLL_SPEED:
+        # Частичное обновление экрана возможно только с неподвижным фоном
+        print("DIRTY_RECTS: прокрутка фона отключена (BACKGROUND_SCROLL_SPEED = 0)")
+        overrides["BACKGROUND_SCROLL_SPEED"] = 0
+    game = GameLogic(config=GameConfig(**overrides))
+    game.clock = get_ticks
+    if REPLAY_RECORDING:
+        from replay import InputLog
+        game.recorder = InputLog(game.seed)
 
     # Шрифты
-    font = pygame.font.SysFont('Arial', 24)
-    big_font = pygame.font.SysFont('Arial', 48, bold=True)
+    font = get_font(24)
+    big_font = get_font(48, bold=True)
+    timer.mark("игра")
+
+    # Прогрев кэшей небольшими порциями за кадр
+    warmer = CacheWarmer(warm_up_tasks(game, font))
+
+    # Замер времени фаз кадра (F3 - показать/скрыть)
+    profiler = FrameProfiler()
+
+    # Ввод командами с метками времени (в сетевой игре ввод обрабатывает сервер)
+    commands = InputQueue(enabled=INPUT_COMMANDS and client is None)
+
+    # Игра на отдельном потоке с фиксированным тиком или в главном цикле
+    simulation = None
+    if SIMULATION_THREAD and client is None:
+        from simulation_thread import SimulationThread
+        simulation = SimulationThread(game, commands=commands if commands.enabled else None)
+        simulation.start()
+        # Сохранение и загрузка не должны пересекаться с тиком
+        lock = simulation.lock
+    else:
+        game.profiler = profiler
+        lock = contextlib.nullcontext()
+        if commands.enabled:
+            game.input_source = commands.get_input
 
-    # Часы для контроля FPS
-    clock = pygame.time.Clock()
+    # Вывод кадра на экран (полностью или только измененные области)
+    renderer = DirtyRectRenderer(scroll_speed=game.config.BACKGROUND_SCROLL_SPEED)
+    queue = RenderQueue()
+
+    # Мир рисуется во внутреннюю поверхность, разрешение которой подстраивается под бюджет кадра
+    target = RenderTarget(screen)
+
+    # Быстрое сохранение в памяти (F5 - сохранить, F9 - загрузить)
+    quick_save = None
 
     # Главный игровой цикл
+    frame_start = time.perf_counter()
     running = True
     while running:
+        profiler.begin_frame()
+
         # Обработка событий
-        events = pygame.event.get()
+        # Позиции мыши переводятся из координат окна в координаты игрового поля
+        events = [target.map_event(event) for event in commands.get_events()]
         for event in events:
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.VIDEORESIZE:
+                # Поле вписывается в новое окно; прошлые измененные области и
+                # неизменный начальный экран в старых координатах недействительны
+                target.resize(pygame.display.get_surface())
+                renderer.invalidate()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle_overlay()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                # Модуль снимков импортируется при первом сохранении (F9 работает только после F5)
+                from snapshot import save_snapshot, restore_snapshot
+                with lock:
+                    quick_save = save_snapshot(game)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F9 and quick_save is not None:
+                with lock:
+                    restore_snapshot(game, quick_save)
 
-        # Обработка игровых событий
-        game.handle_events(events)
+        if client is not None:
+            # Ввод уходит на сервер, состояние игры приходит в снимках
+            client.send_input(pygame.key.get_pressed())
+            state = client.poll()
+            if state is not None:
+                apply_state(game, state, asteroid_images)
+            if client.closed:
+                # Сервер закрыл соединение: возврат на начальный экран, дальше игра идет локально
+                print("Соединение с сервером закрыто")
+                game.game_state = "start"
+                client = None
+            profiler.mark("events")
+        elif simulation is not None:
+            # Ввод передается потоку симуляции, он обновляет игру сам
+            simulation.push_input(events, pygame.key.get_pressed())
+            profiler.mark("events")
+        else:
+            # Обработка игровых событий: команды ввода, пришедшие до этого момента
+            if commands.enabled:
+                commands.next_tick()
+            game.handle_events(events)
+            profiler.mark("events")
 
-        # Обновление игры
-        game.update()
+            # Обновление игры
+            game.update()
+            profiler.mark("update")
 
-        # Отрисовка
-        if game.game_state == "start":
-            game.draw_start_screen(screen, font, big_font)
-        elif game.game_state == "playing":
-            game.draw_background(screen)
+        # Прогрев кэшей, пока игрок на начальном экране
+        if game.game_state == "start" and not warmer.done:
+            warmer.run(WARMUP_BUDGET_MS)
+            profiler.mark("warmup")
 
-            # Отрисовка игровых объектов
-            for asteroid in game.asteroids:
-                asteroid.draw(screen)
+        # Отрисовка: мир - на холст текущего разрешения, интерфейс - в разрешении окна
+        renderer.set_enabled(DIRTY_RECTS and target.direct)
+        canvas = target.canvas
+        hud = target.hud
+        if renderer.begin_frame(game, force=profiler.overlay):
+            if game.game_state == "start":
+                game.draw_start_screen(canvas, font, big_font)
+                profiler.mark("background")
+                target.resolve()
+                profiler.mark("upscale")
+            elif game.game_state == "playing":
+                renderer.draw_background(canvas, game)
+                profiler.mark("background")
 
-            for bullet in game.bullets:
-                bullet.draw(screen)
+                # Отрисовка игровых объектов: каждый слой - один вызов blits
+                if simulation is not None:
+                    layers = simulation.render_layers()
+                else:
+                    layers = game.render_layers()
+                for layer, objects in layers:
+                    queue.add_objects(layer, objects)
+                    renderer.add_all(queue.submit(canvas, layer, doreturn=renderer.enabled))
+                    profiler.mark(layer)
+                target.resolve()
+                profiler.mark("upscale")
+                renderer.add_all(game.draw_ui(hud, font))
+                profiler.mark("ui")
+            elif game.game_state == "game_over":
+                game.draw_game_over(canvas, font, big_font)
+                profiler.mark("background")
+                target.resolve()
+                profiler.mark("upscale")
+                renderer.add_all(game.draw_ui(hud, font))
+                profiler.mark("ui")
 
-            for explosion in game.explosions:
-                explosion.draw(screen)
-
-            game.ship.draw(screen)
-            game.draw_ui(screen, font)
-        elif game.game_state == "game_over":
-            game.draw_game_over(screen, font, big_font)
-            game.draw_ui(screen, font)
+            renderer.add_all(profiler.draw(hud))
+            profiler.mark("overlay")
 
         # Обновление экрана
-        pygame.display.flip()
+        if target.direct:
+            renderer.present()
+        else:
+            target.present()
+        profiler.mark("flip")
+        commands.presented()
+        if not timer.reported:
+            timer.report()
+        profiler.end_frame(game)
+
+        # Контроль FPS: до начала следующего кадра события принимаются по мере прихода
+        frame_ms = (time.perf_counter() - frame_start) * 1000
+        commands.wait(frame_start + 1 / FPS)
+        frame_start = time.perf_counter()
+        if simulation is None and client is None:
+            game.report_frame_time(frame_ms)
+        target.report_frame_time(frame_ms)
+
+    profiler.close()
+
+    if commands.enabled:
+        stats = commands.get_stats()
+        print(f"Ввод: {stats['commands']} команд, коротких нажатий {stats['taps']}, задержка до экрана "
+              f"p50 {stats['latency_p50']:.1f} мс, p95 {stats['latency_p95']:.1f} мс, "
+              f"max {stats['latency_max']:.1f} мс")
+
+    stats = target.get_stats()
+    if stats["changes"]:
+        frames = ", ".join(f"{scale:.0%}: {count}" for scale, count in stats["frames"].items())
+        print(f"Разрешение отрисовки: {stats['changes']} переключений, кадров по уровням - {frames}")
+
+    if network is not None:
+        network.close()
+        stats = network.get_stats()
+        print(f"Сеть: {stats['states']} снимков, задержка p50 {stats['rtt_p50']:.1f} мс, "
+              f"p95 {stats['rtt_p95']:.1f} мс, {stats['received_per_second'] / 1024:.2f} КБ/с")
+
+    if simulation is not None:
+        simulation.stop()
+        stats = simulation.get_stats()
+        print(f"Симуляция: {stats['ticks']} тиков ({stats['ticks_per_second']:.1f}/с), "
+              f"пропущено {stats['skipped']}, опоздание тика p50 {stats['jitter_p50']:.2f} мс, "
+              f"p95 {stats['jitter_p95']:.2f} мс, max {stats['jitter_max']:.2f} мс")
 
-        # Контроль FPS
-        clock.tick(60)
+    # Сохранение записи сессии
+    if game.recorder is not None:
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        game.recorder.save(os.path.join(REPLAY_DIR, time.strftime("session-%Y%m%d-%H%M%S.replay")))
 
     # Завершение Pygame
     pygame.quit()
@@ -0,0 +1,248 @@
+import struct
+from collections import namedtuple
+import pygame
+from config import *
+
+# Типы сообщений: от клиента к серверу
+JOIN = 1  # подключение к сессии (далее - имя сессии в UTF-8)
+INPUT = 2  # состояние клавиш и подтверждение последнего полученного снимка
+LEAVE = 3
+# от сервера к клиенту
+STATE = 10  # снимок состояния (полный или разностный)
+
+MESSAGE_TYPE = struct.Struct("<B")
+# тип, номер ввода, клавиши, подтвержденный тик, метка времени клиента (мс)
+INPUT_MESSAGE = struct.Struct("<BIBII")
+# тип, тик, базовый тик, эхо метки времени клиента, состояние игры, счет, жизни, номер своего корабля
+STATE_HEADER = struct.Struct("<BIIIBiBB")
+# длина сообщения в потоке TCP
+FRAME_LENGTH = struct.Struct("<I")
+MAX_CLIENT_MESSAGE = 256  # предел длины сообщения клиента
+
+# Базовый тик полного снимка (разность не от чего считать)
+FULL = 0xFFFFFFFF
+
+GAME_STATES = ("start", "playing", "game_over")
+
+# Клавиши во входном пакете (битовая маска)
+KEY_BITS = ((pygame.K_LEFT, 1), (pygame.K_RIGHT, 2), (pygame.K_UP, 4), (pygame.K_SPACE, 8))
+
+# Виды сущностей и форматы их квантованных полей. Первые два поля - координаты
+# в 1/POSITION_SCALE пикселя; их небольшие изменения передаются одним байтом.
+KINDS = (
+    ("ships", "hhBB"),  # x, y, угол, двигатели
+    ("bullets", "hhB"),  # x, y, угол
+    ("asteroids", "hhBBb"),  # x, y, угол, размер, номер изображения
+    ("explosions", "hhH"),  # x, y, тик появления (младшие 16 бит)
+)
+POSITION_SCALE = 4
+SMALL_FIELDS = 2
+SECTION_COUNTS = struct.Struct("<HH")  # число удаленных и измененных сущностей вида
+
+# Расшифрованный снимок; entities - словари {номер сущности: поля} по видам KINDS
+NetState = namedtuple("NetState", "tick game_state score lives ship_index echo entities")
+
+
+class KeyState:
+    """Состояние клавиш из входного пакета, совместимое с pygame.key.get_pressed()"""
+
+    __slots__ = ("mask",)
+
+    def __init__(self, mask=0):
+        self.mask = mask
+
+    def __getitem__(self, key):
+        for bit_key, bit in KEY_BITS:
+            if bit_key == key:
+                return bool(self.mask & bit)
+        return False
+
+
+def key_mask(keys):
+    """Битовая маска клавиш по состоянию pygame.key.get_pressed()"""
+    mask = 0
+    for key, bit in KEY_BITS:
+        if keys[key]:
+            mask |= bit
+    return mask
+
+
+def quantize_position(value):
+    """Координата в 1/POSITION_SCALE пикселя (int16)"""
+    return max(-32768, min(32767, int(round(value * POSITION_SCALE))))
+
+
+def quantize_angle(angle):
+    """Угол в 1/256 оборота"""
+    return int(round(angle % 360 * 256 / 360)) % 256
+
+
+def dequantize_angle(value):
+    """Угол в градусах по значению quantize_angle"""
+    return value * 360 / 256
+
+
+class EntityIds:
+    """Короткие номера сущностей для снимков; номера исчезнувших сущностей используются повторно
+
+    Повторное использование безопасно: разность считается по значениям полей,
+    поэтому новая сущность со старым номером передается как изменение.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.free = []
+        self.next_id = 0
+
+    def assign(self, keys):
+        """Номера для ключей текущего тика (в том же порядке)"""
+        old = self.ids
+        new = {}
+        result = []
+        for key in keys:
+            eid = old.get(key)
+            if eid is None:
+                eid = self.free.pop() if self.free else self.allocate()
+            new[key] = eid
+            result.append(eid)
+        for key, eid in old.items():
+            if key not in new:
+                self.free.append(eid)
+        self.ids = new
+        return result
+
+    def allocate(self):
+        """Новый номер"""
+        eid = self.next_id
+        self.next_id += 1
+        return eid
+
+
+class StateCapture:
+    """Квантованные снимки игры для рассылки (номера сущностей стабильны между тиками)"""
+
+    def __init__(self):
+        self.ids = {"bullets": EntityIds(), "asteroids": EntityIds(), "explosions": EntityIds()}
+
+    def capture(self, game, tick):
+        """Словари {номер: поля} по видам KINDS"""
+        ships = {index: (quantize_position(ship.x), quantize_position(ship.y), quantize_angle(ship.angle),
+                         int(ship.thrusting))
+                 for index, ship in enumerate(game.ships)}
+        bullets = [(quantize_position(bullet.x), quantize_position(bullet.y), quantize_angle(bullet.angle))
+                   for bullet in game.bullets]
+        asteroids = [(quantize_position(asteroid.x), quantize_position(asteroid.y), quantize_angle(asteroid.angle),
+                      int(asteroid.size), int(asteroid.image_index))
+                     for asteroid in game.asteroids]
+        # Взрыв не двигается: он передается один раз с тиком появления, клиент сам ведет таймер
+        duration = game.config.EXPLOSION_DURATION
+        if game.use_particle_system:
+            system = game.explosions
+            n = system.count
+            explosions = list(zip(system.x[:n].tolist(), system.y[:n].tolist(), system.timer[:n].tolist()))
+        else:
+            explosions = [(explosion.x, explosion.y, explosion.timer) for explosion in game.explosions]
+        explosions = [(quantize_position(x), quantize_position(y), (tick - duration + int(timer)) & 0xFFFF)
+                      for x, y, timer in explosions]
+
+        # Ключ ракеты и астероида - сам объект (из пула); хранилище EntityStore не поддерживается
+        bullet_keys = [id(bullet) for bullet in game.bullets]
+        asteroid_keys = [id(asteroid) for asteroid in game.asteroids]
+        return (
+            ships,
+            dict(zip(self.ids["bullets"].assign(bullet_keys), bullets)),
+            dict(zip(self.ids["asteroids"].assign(asteroid_keys), asteroids)),
+            dict(zip(self.ids["explosions"].assign(explosions), explosions)),
+        )
+
+
+def encode_entities(base, state):
+    """Разность снимка state относительно base (None - полный снимок)"""
+    parts = []
+    for index, (_, fields) in enumerate(KINDS):
+        old = base[index] if base is not None else {}
+        new = state[index]
+        removed = [eid for eid in old if eid not in new]
+
+        fmt = ["<"]
+        values = []
+        changed = 0
+        for eid, row in new.items():
+            previous = old.get(eid)
+            if previous == row:
+                continue
+            mask = 0
+            small = 0
+            row_fmt = []
+            row_values = []
+            for field, value in enumerate(row):
+                if previous is not None and previous[field] == value:
+                    continue
+                mask |= 1 << field
+                if previous is not None and field < SMALL_FIELDS and -128 <= value - previous[field] <= 127:
+                    small |= 1 << field
+                    row_fmt.append("b")
+                    row_values.append(value - previous[field])
+                else:
+                    row_fmt.append(fields[field])
+                    row_values.append(value)
+            fmt.append("HBB")
+            fmt.extend(row_fmt)
+            values.extend((eid, mask, small))
+            values.extend(row_values)
+            changed += 1
+
+        parts.append(SECTION_COUNTS.pack(len(removed), changed))
+        parts.append(struct.pack(f"<{len(removed)}H", *removed))
+        parts.append(struct.pack("".join(fmt), *values))
+    return b"".join(parts)
+
+
+def decode_entities(data, offset, base):
+    """Снимок по разности encode_entities относительно base; возвращает снимок и смещение"""
+    state = []
+    for index, (_, fields) in enumerate(KINDS):
+        entities = dict(base[index]) if base is not None else {}
+        removed_count, changed = SECTION_COUNTS.unpack_from(data, offset)
+        offset += SECTION_COUNTS.size
+        for eid in struct.unpack_from(f"<{removed_count}H", data, offset):
+            del entities[eid]
+        offset += removed_count * 2
+
+        for _ in range(changed):
+            eid, mask, small = struct.unpack_from("<HBB", data, offset)
+            offset += 4
+            row = list(entities.get(eid, (0,) * len(fields)))
+            for field, field_format in enumerate(fields):
+                if not mask & (1 << field):
+                    continue
+                if small & (1 << field):
+                    (delta,) = struct.unpack_from("<b", data, offset)
+                    row[field] += delta
+                    offset += 1
+                else:
+                    (row[field],) = struct.unpack_from("<" + field_format, data, offset)
+                    offset += struct.calcsize(field_format)
+            entities[eid] = tuple(row)
+        state.append(entities)
+    return tuple(state), offset
+
+
+def encode_state_header(tick, base_tick, echo, game, ship_index):
+    """Заголовок сообщения STATE"""
+    return STATE_HEADER.pack(STATE, tick, base_tick, echo, GAME_STATES.index(game.game_state),
+                             game.score, max(0, min(255, game.lives)), ship_index)
+
+
+def decode_state(data, history):
+    """Расшифровка сообщения STATE; history - снимки клиента по тикам. None, если базы нет"""
+    _, tick, base_tick, echo, state, score, lives, ship_index = STATE_HEADER.unpack_from(data)
+    if base_tick == FULL:
+        base = None
+    else:
+        base = history.get(base_tick)
+        if base is None:
+            return None
+        base = base.entities
+    entities, _ = decode_entities(data, STATE_HEADER.size, base)
+    return NetState(tick, GAME_STATES[state], score, lives, ship_index, echo, entities)
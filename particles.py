@@ -0,0 +1,153 @@
+import math
+import pygame
+from config import *
+from assets import asset_cache
+from game_objects import EXPLOSION_IMAGES
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def available():
+    """Доступна ли система частиц (нужен NumPy)"""
+    return np is not None
+
+
+class ParticleSystem:
+    """Все взрывы в общих массивах NumPy: обновление за один шаг, отрисовка одним Surface.blits
+
+    Каждый взрыв - частица с позицией и таймером. Его вид зависит только от таймера,
+    поэтому кадры (из файлов или нарисованные, как в Explosion.draw) готовятся один раз.
+    """
+
+    FIELDS = ("x", "y", "timer", "current_frame")
+
+    def __init__(self, capacity=PARTICLE_CAPACITY, config=default_config):
+        self.config = config
+        self.capacity = capacity
+        self.count = 0
+        # Взрывы сверх предела не создаются
+        self.rejected = 0
+        for name in self.FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float64))
+
+        # Кадры анимации из файлов загружаются один раз на всю систему
+        self.images = [image for image in (asset_cache.get(name, size=(60, 60)) for name in EXPLOSION_IMAGES)
+                       if image is not None]
+        # Нарисованные кадры по значению таймера (создаются при первой отрисовке)
+        self.procedural_frames = None
+        self.max_radius = 30
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, x, y):
+        """Новый взрыв в точке (x, y); возвращает False, если достигнут предел"""
+        if self.count == self.capacity:
+            self.rejected += 1
+            return False
+        index = self.count
+        self.x[index] = x
+        self.y[index] = y
+        self.timer[index] = self.config.EXPLOSION_DURATION
+        self.current_frame[index] = 0
+        self.count += 1
+        return True
+
+    def clear(self):
+        """Удаление всех взрывов"""
+        self.count = 0
+
+    def update(self):
+        """Векторное обновление таймеров и кадров с удалением завершенных взрывов"""
+        n = self.count
+        if n == 0:
+            return
+        timer = self.timer[:n]
+        timer -= 1
+        if self.images:
+            progress = 1 - timer / self.config.EXPLOSION_DURATION
+            self.current_frame[:n] = np.trunc(progress * (len(self.images) - 1))
+
+        keep = timer > 0
+        kept = int(keep.sum())
+        if kept == n:
+            return
+        for name in self.FIELDS:
+            array = getattr(self, name)
+            array[:kept] = array[:n][keep]
+        self.count = kept
+
+    def create_procedural_frames(self):
+        """Кадры нарисованного взрыва по значению таймера: (изображение, смещение центра) или None
+
+        Кадры с прозрачным цветом и RLE: при выводе копируются только видимые пиксели.
+        """
+        duration = self.config.EXPLOSION_DURATION
+        frames = [None]
+        for timer in range(1, duration + 1):
+            progress = 1 - (timer / duration)
+            radius = int(self.max_radius * (1 - progress))
+            if radius <= 0:
+                frames.append(None)
+                continue
+            particle_distance = radius * 1.5
+            particle_size = max(1, int(radius * 0.3))
+            # Центр кадра с запасом на частицы по краям
+            half = int(particle_distance) + particle_size + 1
+            frame = pygame.Surface((half * 2 + 1, half * 2 + 1))
+            frame.fill(BLACK)
+            pygame.draw.circle(frame, YELLOW, (half, half), radius)
+            for i in range(8):
+                angle = 2 * math.pi * i / 8
+                particle_x = half + math.cos(angle) * particle_distance
+                particle_y = half + math.sin(angle) * particle_distance
+                pygame.draw.circle(frame, RED, (int(particle_x), int(particle_y)), particle_size)
+            frame.set_colorkey(BLACK, pygame.RLEACCEL)
+            frames.append((frame, half))
+        self.procedural_frames = frames
+        return frames
+
+    def sprites(self, view=None):
+        """Пары (изображение, позиция) для Surface.blits; view - область отсечения (Rect) или None
+
+        Возвращает пары и пустой список объектов без изображения (как EntityStore.sprites).
+        """
+        n = self.count
+        if n == 0:
+            return [], []
+        if self.images:
+            images = self.images
+            frames = self.current_frame[:n].astype(int)
+            width, height = images[0].get_size()
+            # Центр округляется так же, как в Rect.center (половина - от нуля)
+            x = self.x[:n]
+            y = self.y[:n]
+            left = np.trunc(x + np.copysign(0.5, x)).astype(int) - width // 2
+            top = np.trunc(y + np.copysign(0.5, y)).astype(int) - height // 2
+            visible = np.ones(n, dtype=bool)
+        else:
+            procedural = self.procedural_frames or self.create_procedural_frames()
+            images = [frame[0] if frame else None for frame in procedural]
+            frames = self.timer[:n].astype(int)
+            half = np.array([frame[1] if frame else 0 for frame in procedural])[frames]
+            left = np.trunc(self.x[:n]).astype(int) - half
+            top = np.trunc(self.y[:n]).astype(int) - half
+            width = height = 2 * half + 1
+            visible = half > 0
+
+        if view is not None:
+            visible &= ((left < view.right) & (top < view.bottom) &
+                        (left + width > view.left) & (top + height > view.top))
+        indices = np.flatnonzero(visible)
+        frames = frames[indices].tolist()
+        left = left[indices].tolist()
+        top = top[indices].tolist()
+        return [(images[frame], (left[i], top[i])) for i, frame in enumerate(frames)], []
+
+    def draw(self, screen):
+        """Отрисовка всех взрывов одним вызовом blits; возвращает список измененных областей"""
+        pairs, _ = self.sprites()
+        return screen.blits(pairs)
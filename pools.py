@@ -0,0 +1,114 @@
+class SerialCounter:
+    """Источник порядковых номеров: next() - один номер, reserve(count) - блок номеров подряд"""
+
+    def __init__(self):
+        self.last = 0
+
+    def __next__(self):
+        self.last += 1
+        return self.last
+
+    def reserve(self, count):
+        """Первый номер блока из count новых номеров"""
+        first = self.last + 1
+        self.last += count
+        return first
+
+
+# Порядковые номера выдачи объектов, общие для всех пулов и хранилищ: объект, повторно
+# выданный пулом, получает новый номер (по нему simulation_thread сопоставляет снимки)
+serials = SerialCounter()
+
+
+class ObjectPool:
+    """Пул объектов фиксированной емкости с повторным использованием"""
+
+    def __init__(self, factory, capacity):
+        self.factory = factory
+        self.capacity = capacity
+        # Живые объекты (этот список GameLogic использует напрямую) и свободные
+        self.active = []
+        self.free = []
+        self.high_water = 0
+        self.created = 0
+        self.rejected = 0
+
+    def acquire(self, *args, **kwargs):
+        """Выдача объекта: повторная инициализация свободного или создание нового
+
+        Возвращает None, если пул исчерпан.
+        """
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args, **kwargs)
+        elif len(self.active) < self.capacity:
+            obj = self.factory(*args, **kwargs)
+            self.created += 1
+        else:
+            self.rejected += 1
+            return None
+
+        obj.serial = next(serials)
+        self.active.append(obj)
+        if len(self.active) > self.high_water:
+            self.high_water = len(self.active)
+        return obj
+
+    def take(self, *args, **kwargs):
+        """Выдача объекта без повторной инициализации свободного и без учета емкости
+
+        Используется при восстановлении снимка: поля объекта задаются извне.
+        """
+        if self.free:
+            obj = self.free.pop()
+        else:
+            obj = self.factory(*args, **kwargs)
+            self.created += 1
+        obj.serial = next(serials)
+        self.active.append(obj)
+        if len(self.active) > self.high_water:
+            self.high_water = len(self.active)
+        return obj
+
+    def take_many(self, count, *args, **kwargs):
+        """Выдача count объектов сразу (как take); новые объекты создаются с одинаковыми аргументами"""
+        free = self.free
+        reused = min(count, len(free))
+        objects = free[len(free) - reused:]
+        del free[len(free) - reused:]
+        objects.extend(self.factory(*args, **kwargs) for _ in range(count - reused))
+        self.created += count - reused
+        for serial, obj in enumerate(objects, serials.reserve(count)):
+            obj.serial = serial
+        self.active.extend(objects)
+        if len(self.active) > self.high_water:
+            self.high_water = len(self.active)
+        return objects
+
+    def release_inactive(self):
+        """Возврат неактивных объектов в пул
+
+        Порядок живых объектов сохраняется (как при уплотнении EntityStore):
+        от него зависит, какую из пересекающихся целей ракета поразит первой.
+        """
+        active = self.active
+        if all(obj.active for obj in active):
+            return
+        self.free.extend(obj for obj in active if not obj.active)
+        active[:] = [obj for obj in active if obj.active]
+
+    def release_all(self):
+        """Возврат всех объектов в пул"""
+        self.free.extend(self.active)
+        self.active.clear()
+
+    def get_stats(self):
+        """Заполненность пула и максимальное число одновременно живых объектов"""
+        return {
+            "active": len(self.active),
+            "free": len(self.free),
+            "capacity": self.capacity,
+            "high_water": self.high_water,
+            "created": self.created,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,146 @@
+import time
+from collections import deque
+import pygame
+from config import *
+from text_cache import text_cache
+
+# Фазы кадра в порядке их выполнения в main.py
+PHASES = ("events", "update", "collisions", "warmup", "background", "asteroids", "bullets",
+          "explosions", "ship", "upscale", "ui", "overlay", "flip")
+
+
+def percentile(sorted_values, fraction):
+    """Перцентиль по заранее отсортированному списку"""
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class FrameProfiler:
+    """Замер времени фаз главного цикла и отображение статистики поверх игры"""
+
+    def __init__(self, enabled=PROFILER_ENABLED, window=PROFILER_WINDOW, output_path=PROFILER_OUTPUT):
+        self.enabled = enabled
+        self.overlay = False
+        self.frame = 0
+        self.frame_start = 0
+        self.last_mark = 0
+        self.current = {}
+        self.counts = {}
+        # Скользящее окно длительностей по каждой фазе (в наносекундах)
+        self.history = {name: deque(maxlen=window) for name in PHASES + ("frame",)}
+
+        # Шрифт создается только при первом показе статистики
+        self.font = None
+
+        self.output = None
+        self.writer = None
+        self.encode = None
+        if output_path:
+            self.open_output(output_path)
+
+    def open_output(self, path):
+        """Открытие файла для покадровой записи (CSV или JSONL по расширению)"""
+        # csv и json нужны только при записи в файл и не импортируются при запуске игры
+        self.output = open(path, "w", newline="")
+        if path.endswith(".csv"):
+            import csv
+            self.writer = csv.writer(self.output)
+            self.writer.writerow(("frame", "frame_ns") + tuple(f"{name}_ns" for name in PHASES) +
+                                 ("asteroids", "bullets", "explosions"))
+        else:
+            import json
+            self.encode = json.dumps
+
+    def close(self):
+        """Закрытие файла записи"""
+        if self.output is not None:
+            self.output.close()
+            self.output = None
+            self.writer = None
+
+    def begin_frame(self):
+        """Начало нового кадра"""
+        if not self.enabled:
+            return
+        self.frame_start = self.last_mark = time.perf_counter_ns()
+        self.current = {}
+
+    def mark(self, name):
+        """Завершение фазы: время с предыдущей отметки относится к фазе name"""
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self.current[name] = self.current.get(name, 0) + now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self, game):
+        """Завершение кадра: сохранение замеров и числа объектов"""
+        if not self.enabled:
+            return
+        total = time.perf_counter_ns() - self.frame_start
+        self.frame += 1
+        self.history["frame"].append(total)
+        for name, duration in self.current.items():
+            if name in self.history:
+                self.history[name].append(duration)
+        self.counts = {
+            "asteroids": len(game.asteroids),
+            "bullets": len(game.bullets),
+            "explosions": len(game.explosions),
+        }
+        if self.output is not None:
+            self.write_record(total)
+
+    def write_record(self, total):
+        """Запись одного кадра в файл"""
+        if self.writer is not None:
+            self.writer.writerow((self.frame, total) +
+                                 tuple(self.current.get(name, 0) for name in PHASES) +
+                                 tuple(self.counts.values()))
+        else:
+            record = {"frame": self.frame, "frame_ns": total, "phases": self.current}
+            record.update(self.counts)
+            self.output.write(self.encode(record) + "\n")
+
+    def get_stats(self):
+        """Перцентили p50/p95/p99 по каждой фазе (в миллисекундах)"""
+        stats = {}
+        for name, values in self.history.items():
+            if not values:
+                continue
+            ordered = sorted(values)
+            stats[name] = {
+                "p50": percentile(ordered, 0.50) / 1e6,
+                "p95": percentile(ordered, 0.95) / 1e6,
+                "p99": percentile(ordered, 0.99) / 1e6,
+            }
+        return stats
+
+    def toggle_overlay(self):
+        """Включение/выключение отображения статистики (включает и замеры)"""
+        self.overlay = not self.overlay
+        if self.overlay and not self.enabled:
+            # Замеры начинаются с середины кадра
+            self.enabled = True
+            self.begin_frame()
+
+    def draw(self, screen):
+        """Отрисовка статистики поверх игры; возвращает список измененных областей"""
+        if not self.overlay:
+            return []
+        if self.font is None:
+            self.font = pygame.font.SysFont('Courier New', 14)
+        lines = ["мс           p50    p95    p99"]
+        for name, values in self.get_stats().items():
+            lines.append(f"{name:<11} {values['p50']:6.2f} {values['p95']:6.2f} {values['p99']:6.2f}")
+        lines.append("  ".join(f"{name}: {count}" for name, count in self.counts.items()))
+
+        dirty = []
+        y = 80
+        for line in lines:
+            text = text_cache.render(self.font, line, YELLOW)
+            dirty.append(screen.blit(text, (10, y)))
+            y += text.get_height()
+        return dirty
@@ -0,0 +1,67 @@
+import pygame
+from config import *
+
+
+class RenderQueue:
+    """Очередь отрисовки: пары (изображение, позиция) собираются по слоям
+    и выводятся одним вызовом Surface.blits на слой"""
+
+    def __init__(self, cull=RENDER_CULL):
+        self.layers = {}
+        # Объекты без готового изображения рисуются своим методом draw после слоя
+        self.custom = {}
+        # Отсечение по видимой области экрана
+        self.cull = cull
+        self.view = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        # Число отсеченных объектов по слоям (за последний кадр)
+        self.culled = {}
+
+    def add_objects(self, layer, objects):
+        """Постановка объектов в слой
+
+        objects - хранилище с методом sprites (EntityStore, ParticleSystem)
+        или список игровых объектов с полями image и rect.
+        """
+        queue = self.layers.setdefault(layer, [])
+        custom = self.custom.setdefault(layer, [])
+        view = self.view if self.cull else None
+
+        sprites = getattr(objects, "sprites", None)
+        if sprites is not None:
+            pairs, missing = sprites(view)
+            queue.extend(pairs)
+            custom.extend(missing)
+            self.culled[layer] = len(objects) - len(pairs) - len(missing)
+            return
+
+        culled = 0
+        colliderect = self.view.colliderect
+        for obj in objects:
+            image = getattr(obj, "image", None)
+            rect = getattr(obj, "rect", None)
+            if not (image and rect):
+                custom.append(obj)
+            elif view is not None and not colliderect(rect):
+                culled += 1
+            else:
+                queue.append((image, rect))
+        self.culled[layer] = culled
+
+    def submit(self, screen, layer, doreturn=False):
+        """Вывод слоя на экран; при doreturn возвращает список измененных областей"""
+        queue = self.layers.get(layer, [])
+        custom = self.custom.get(layer, [])
+        dirty = []
+        if queue:
+            rects = screen.blits(queue, doreturn=doreturn)
+            if doreturn:
+                dirty = rects
+        # Масштабированный холст (ScaledCanvas) рисует такие объекты через свою поверхность
+        draw_object = getattr(screen, "draw_object", None)
+        for obj in custom:
+            rect = draw_object(obj) if draw_object is not None else obj.draw(screen)
+            if doreturn and rect is not None:
+                dirty.append(rect)
+        queue.clear()
+        custom.clear()
+        return dirty
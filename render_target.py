@@ -0,0 +1,201 @@
+import pygame
+from collections import deque
+from config import *
+from assets import scale_cache
+
+
+class ScaledCanvas:
+    """Поверхность в координатах игрового поля (SCREEN_WIDTH x SCREEN_HEIGHT) поверх Surface другого размера
+
+    Повторяет часть интерфейса Surface, которой пользуется отрисовка игры (blit, blits,
+    fill, set_clip, get_size): координаты умножаются на scale, изображения берутся
+    из scale_cache. Возвращаемые области - в координатах самой поверхности.
+    """
+
+    def __init__(self, surface, scale):
+        self.surface = surface
+        self.scale = scale
+        # Поверхность для объектов, которые рисуют себя сами (pygame.draw)
+        self.scratch = None
+
+    def get_size(self):
+        """Логический размер (как у экрана без масштабирования)"""
+        return SCREEN_WIDTH, SCREEN_HEIGHT
+
+    def get_width(self):
+        return SCREEN_WIDTH
+
+    def get_height(self):
+        return SCREEN_HEIGHT
+
+    def to_surface(self, rect):
+        """Прямоугольник в координатах поверхности"""
+        scale = self.scale
+        left = round(rect[0] * scale)
+        top = round(rect[1] * scale)
+        return pygame.Rect(left, top, round((rect[0] + rect[2]) * scale) - left,
+                           round((rect[1] + rect[3]) * scale) - top)
+
+    def blit(self, image, dest, area=None, special_flags=0):
+        """Вывод изображения в масштабе поверхности"""
+        scale = self.scale
+        if area is not None:
+            area = self.to_surface(area)
+        return self.surface.blit(scale_cache.get(image, scale), (round(dest[0] * scale), round(dest[1] * scale)),
+                                 area, special_flags)
+
+    def blits(self, blit_sequence, doreturn=True):
+        """Вывод пар (изображение, позиция) одним вызовом Surface.blits"""
+        scale = self.scale
+        get = scale_cache.get
+        return self.surface.blits([(get(image, scale), (round(dest[0] * scale), round(dest[1] * scale)))
+                                   for image, dest in blit_sequence], doreturn)
+
+    def fill(self, color, rect=None, special_flags=0):
+        """Заливка всей поверхности или области"""
+        if rect is not None:
+            rect = self.to_surface(rect)
+        return self.surface.fill(color, rect, special_flags)
+
+    def set_clip(self, rect=None):
+        """Ограничение области отрисовки"""
+        self.surface.set_clip(None if rect is None else self.to_surface(rect))
+
+    def draw_object(self, obj):
+        """Отрисовка объекта своим методом draw (например, резервных фигур pygame.draw)
+
+        Объект рисуется на прозрачной по черному цвету поверхности в логических
+        координатах, затем его область масштабируется и выводится.
+        """
+        if self.scratch is None:
+            self.scratch = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), 0, self.surface)
+            self.scratch.fill(BLACK)
+            self.scratch.set_colorkey(BLACK)
+        scratch = self.scratch
+        rect = obj.draw(scratch)
+        if rect is None:
+            return None
+        rect = pygame.Rect(rect).clip(scratch.get_rect())
+        if not rect:
+            return None
+        target = self.to_surface(rect)
+        if target.width <= 0 or target.height <= 0:
+            scratch.fill(BLACK, rect)
+            return None
+        image = pygame.transform.scale(scratch.subsurface(rect), target.size)
+        image.set_colorkey(BLACK)
+        scratch.fill(BLACK, rect)
+        return self.surface.blit(image, target)
+
+
+class RenderTarget:
+    """Цель отрисовки: игровое поле во внутренней поверхности, масштабируемой в окно
+
+    Окно может быть любого размера: поле вписывается в него с сохранением
+    пропорций (viewport). При DYNAMIC_RESOLUTION разрешение внутренней поверхности
+    выбирается из RENDER_SCALE_LEVELS по среднему времени кадра. Мир рисуется на
+    canvas, затем resolve() растягивает его в окно, а интерфейс рисуется на hud
+    уже в разрешении окна.
+    """
+
+    def __init__(self, window, levels=RENDER_SCALE_LEVELS, dynamic=DYNAMIC_RESOLUTION, budget_ms=FRAME_BUDGET_MS):
+        self.levels = levels
+        self.dynamic = dynamic and len(levels) > 1
+        self.budget_ms = budget_ms
+        self.level = 0
+        self.frame_times = deque(maxlen=RENDER_SCALE_WINDOW)
+        # Статистика: число кадров на каждом уровне и число переключений
+        self.frames = [0] * len(levels)
+        self.changes = 0
+        self.resize(window)
+
+    def resize(self, window):
+        """Новое окно (например, после pygame.display.set_mode)"""
+        self.window = window
+        width, height = window.get_size()
+        self.factor = min(width / SCREEN_WIDTH, height / SCREEN_HEIGHT)
+        self.viewport = pygame.Rect(0, 0, round(SCREEN_WIDTH * self.factor), round(SCREEN_HEIGHT * self.factor))
+        self.viewport.center = (width // 2, height // 2)
+        if self.viewport.size == (width, height):
+            self.view = window
+        else:
+            # Поля по краям окна закрашиваются один раз: игра в них не рисует
+            window.fill(BLACK)
+            self.view = window.subsurface(self.viewport)
+        self.hud = self.view if self.factor == 1 else ScaledCanvas(self.view, self.factor)
+        self.surfaces = {}
+        scale_cache.clear()
+        self.set_level(self.level)
+
+    def set_level(self, level):
+        """Переключение разрешения отрисовки на уровень RENDER_SCALE_LEVELS[level]"""
+        self.level = level
+        ratio = self.levels[level]
+        self.scale = self.factor * ratio
+        if ratio == 1:
+            # Полное разрешение: мир рисуется прямо в окно
+            self.internal = None
+            self.canvas = self.hud
+            return
+        internal = self.surfaces.get(level)
+        if internal is None:
+            size = (max(1, round(SCREEN_WIDTH * self.scale)), max(1, round(SCREEN_HEIGHT * self.scale)))
+            internal = self.surfaces[level] = pygame.Surface(size, 0, self.window)
+        self.internal = internal
+        self.canvas = ScaledCanvas(internal, self.scale)
+
+    @property
+    def direct(self):
+        """Рисование идет прямо в окно в его координатах (можно обновлять только измененные области)"""
+        return self.canvas is self.window
+
+    def resolve(self):
+        """Растягивание внутренней поверхности в окно (после мира, до интерфейса)"""
+        if self.internal is not None:
+            pygame.transform.scale(self.internal, self.viewport.size, self.view)
+
+    def present(self):
+        """Вывод кадра на экран"""
+        pygame.display.flip()
+
+    def report_frame_time(self, frame_ms):
+        """Учет времени работы кадра (time.perf_counter() до ожидания commands.wait) и выбор разрешения"""
+        self.frames[self.level] += 1
+        if not self.dynamic:
+            return
+        times = self.frame_times
+        times.append(frame_ms)
+        if len(times) < times.maxlen:
+            return
+
+        average = sum(times) / len(times)
+        if average > RENDER_SCALE_DOWN * self.budget_ms and self.level < len(self.levels) - 1:
+            self.set_level(self.level + 1)
+        elif average < RENDER_SCALE_UP * self.budget_ms and self.level > 0:
+            self.set_level(self.level - 1)
+        else:
+            return
+        # Новое окно замеров: следующее решение - только по кадрам нового уровня
+        self.changes += 1
+        times.clear()
+
+    def to_logical(self, pos):
+        """Координаты окна в координатах игрового поля"""
+        return (int((pos[0] - self.viewport.x) / self.factor),
+                int((pos[1] - self.viewport.y) / self.factor))
+
+    def map_event(self, event):
+        """Событие мыши с позицией в координатах игрового поля (остальные события без изменений)"""
+        if "pos" not in event.dict or (self.factor == 1 and self.viewport.topleft == (0, 0)):
+            return event
+        attributes = dict(event.dict)
+        attributes["pos"] = self.to_logical(event.pos)
+        return pygame.event.Event(event.type, attributes)
+
+    def get_stats(self):
+        """Число кадров на каждом уровне разрешения и число переключений"""
+        return {
+            "scale": self.scale,
+            "frames": dict(zip(self.levels, self.frames)),
+            "changes": self.changes,
+        }
@@ -0,0 +1,107 @@
+import pygame
+from config import *
+
+
+class DirtyRectRenderer:
+    """Вывод на экран только измененных областей вместо полного flip()
+
+    Работает только с неподвижным фоном: при прокрутке меняется каждый пиксель
+    экрана, и частичное обновление всегда превращалось бы в полное.
+    """
+
+    def __init__(self, enabled=DIRTY_RECTS, threshold=DIRTY_RECTS_THRESHOLD, scroll_speed=BACKGROUND_SCROLL_SPEED):
+        self.supported = scroll_speed == 0
+        if enabled and not self.supported:
+            print("DIRTY_RECTS не действует при BACKGROUND_SCROLL_SPEED != 0: экран обновляется целиком")
+        self.enabled = enabled and self.supported
+        self.threshold = threshold
+        self.screen_area = SCREEN_WIDTH * SCREEN_HEIGHT
+        # Области, измененные в прошлом и текущем кадрах
+        self.previous_rects = []
+        self.rects = []
+        self.full = True
+        self.last_key = None
+        self.full_frames = 0
+        self.partial_frames = 0
+        self.skipped_frames = 0
+
+    def begin_frame(self, game, force=False):
+        """Начало кадра; возвращает False, если экран не изменился и рисовать не нужно"""
+        key = (game.game_state, game.background_offset)
+        changed = key != self.last_key
+        self.last_key = key
+        self.rects = []
+        if not self.enabled:
+            self.full = True
+            return True
+
+        # Статичные экраны (заставка, конец игры) не перерисовываются
+        if not changed and not force and game.game_state != "playing":
+            self.full = False
+            return False
+
+        # Сдвиг фона или смена экрана требуют полной перерисовки
+        self.full = changed
+        return True
+
+    def set_enabled(self, enabled):
+        """Включение/выключение (например, при смене разрешения отрисовки); следующий кадр выводится целиком"""
+        enabled = enabled and self.supported
+        if enabled != self.enabled:
+            self.enabled = enabled
+            self.invalidate()
+
+    def invalidate(self):
+        """Следующий кадр рисуется и выводится целиком (например, после изменения размера окна)"""
+        self.last_key = None
+        self.previous_rects = []
+
+    def draw_background(self, screen, game):
+        """Фон: целиком или только под прошлыми положениями объектов"""
+        if self.full:
+            game.draw_background(screen)
+            return
+        for rect in self.previous_rects:
+            screen.set_clip(rect)
+            game.draw_background(screen)
+        screen.set_clip(None)
+
+    def add(self, rect):
+        """Добавление измененной области"""
+        if self.enabled and rect is not None:
+            self.rects.append(rect)
+
+    def add_all(self, rects):
+        """Добавление нескольких измененных областей"""
+        if self.enabled:
+            self.rects.extend(rects)
+
+    def present(self):
+        """Вывод кадра на экран"""
+        if not self.enabled or self.full:
+            pygame.display.flip()
+            self.previous_rects = self.rects
+            self.full_frames += 1
+            return
+
+        dirty = self.previous_rects + self.rects
+        self.previous_rects = self.rects
+        if not dirty:
+            self.skipped_frames += 1
+            return
+
+        area = sum(rect.width * rect.height for rect in dirty)
+        if area > self.threshold * self.screen_area:
+            pygame.display.flip()
+            self.full_frames += 1
+        else:
+            pygame.display.update(dirty)
+            self.partial_frames += 1
+
+    def get_stats(self):
+        """Число кадров с полным, частичным и пропущенным обновлением"""
+        return {
+            "full": self.full_frames,
+            "partial": self.partial_frames,
+            "skipped": self.skipped_frames,
+        }
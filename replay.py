@@ -0,0 +1,245 @@
+import argparse
+import array
+import struct
+import sys
+import time
+import zlib
+import pygame
+from config import *
+from game_logic import GameLogic
+from input_queue import TickInput
+
+# Формат файла повтора: заголовок MAGIC + версия, далее сжатые zlib данные
+MAGIC = b"ASTR"
+VERSION = 2
+HEADER = struct.Struct("<4sB")
+# зерно, тики, начальное время, щелчки, контрольные суммы, интервал, ввод командами, число команд
+BODY_HEADER = struct.Struct("<QIIIIH?I")
+CLICK = struct.Struct("<IHH")  # тик, x, y
+CHECKSUM = struct.Struct("<II")  # тик, crc32
+COMMAND = struct.Struct("<IBB")  # тик, смещение в тике, бит клавиши (+PRESSED при нажатии)
+PRESSED = 0x80
+
+# Биты маски нажатых клавиш
+KEY_BITS = (
+    (pygame.K_LEFT, 1),
+    (pygame.K_RIGHT, 2),
+    (pygame.K_UP, 4),
+    (pygame.K_SPACE, 8),
+)
+
+
+def keys_to_mask(keys):
+    """Упаковка состояния клавиш в битовую маску"""
+    mask = 0
+    for key, bit in KEY_BITS:
+        if keys[key]:
+            mask |= bit
+    return mask
+
+
+class MaskInput:
+    """Источник ввода, восстанавливающий клавиши из битовой маски"""
+
+    def __init__(self):
+        self.mask = 0
+
+    def __call__(self):
+        return self
+
+    def __getitem__(self, key):
+        for known_key, bit in KEY_BITS:
+            if key == known_key:
+                return bool(self.mask & bit)
+        return False
+
+
+def state_checksum(game):
+    """Контрольная сумма состояния симуляции"""
+    data = struct.pack("<iiiid", game.score, game.lives, len(game.asteroids), len(game.bullets),
+                       game.background_offset)
+    checksum = zlib.crc32(data)
+    checksum = zlib.crc32(game.game_state.encode(), checksum)
+    ship = game.ship
+    checksum = zlib.crc32(struct.pack("<5d", ship.x, ship.y, ship.vx, ship.vy, ship.angle), checksum)
+    for asteroid in game.asteroids:
+        checksum = zlib.crc32(struct.pack("<3d", asteroid.x, asteroid.y, asteroid.angle), checksum)
+    for bullet in game.bullets:
+        checksum = zlib.crc32(struct.pack("<2d", bullet.x, bullet.y), checksum)
+    return checksum
+
+
+class ReplayMismatch(Exception):
+    """Состояние при повторе разошлось с записанным"""
+
+
+class InputLog:
+    """Компактная запись ввода одной сессии: маска клавиш и время на тик, щелчки мыши
+
+    При вводе командами (TickInput) маска - клавиши в начале тика, а команды
+    внутри тика записываются отдельно со своим смещением.
+    """
+
+    def __init__(self, seed, checksum_interval=REPLAY_CHECKSUM_INTERVAL):
+        self.seed = seed
+        self.checksum_interval = checksum_interval
+        self.masks = bytearray()
+        self.clock_deltas = array.array("I")
+        self.start_clock = None
+        self.last_clock = 0
+        self.clicks = []
+        self.checksums = []
+        self.timed = False
+        self.commands = []
+
+    def __len__(self):
+        return len(self.masks)
+
+    def record(self, game, events, now):
+        """Запись одного тика (вызывается из GameLogic.handle_events)"""
+        tick = len(self.masks)
+        if tick % self.checksum_interval == 0:
+            self.checksums.append((tick, state_checksum(game)))
+
+        if self.start_clock is None:
+            self.start_clock = now
+            self.last_clock = now
+        self.clock_deltas.append(now - self.last_clock)
+        self.last_clock = now
+
+        keys = game.input_source()
+        if isinstance(keys, TickInput):
+            self.timed = True
+            self.masks.append(keys.mask)
+            for offset, bit, pressed in keys.commands:
+                self.commands.append((tick, offset, bit | (PRESSED if pressed else 0)))
+        else:
+            self.masks.append(keys_to_mask(keys))
+        for event in events:
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                self.clicks.append((tick, event.pos[0], event.pos[1]))
+
+    def save(self, path):
+        """Сохранение записи в файл"""
+        body = bytearray(BODY_HEADER.pack(self.seed, len(self.masks), self.start_clock or 0,
+                                          len(self.clicks), len(self.checksums),
+                                          self.checksum_interval, self.timed, len(self.commands)))
+        body += self.masks
+        body += self.clock_deltas.tobytes()
+        for click in self.clicks:
+            body += CLICK.pack(*click)
+        for checksum in self.checksums:
+            body += CHECKSUM.pack(*checksum)
+        for command in self.commands:
+            body += COMMAND.pack(*command)
+
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION))
+            file.write(zlib.compress(bytes(body), 9))
+
+    @classmethod
+    def load(cls, path):
+        """Загрузка записи из файла"""
+        with open(path, "rb") as file:
+            magic, version = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Неподдерживаемый файл повтора: {path}")
+            body = zlib.decompress(file.read())
+
+        (seed, ticks, start_clock, click_count, checksum_count, interval,
+         timed, command_count) = BODY_HEADER.unpack_from(body)
+        log = cls(seed, interval)
+        log.start_clock = start_clock
+        log.timed = timed
+        offset = BODY_HEADER.size
+
+        log.masks = bytearray(body[offset:offset + ticks])
+        offset += ticks
+        log.clock_deltas.frombytes(body[offset:offset + ticks * log.clock_deltas.itemsize])
+        offset += ticks * log.clock_deltas.itemsize
+
+        for _ in range(click_count):
+            log.clicks.append(CLICK.unpack_from(body, offset))
+            offset += CLICK.size
+        for _ in range(checksum_count):
+            log.checksums.append(CHECKSUM.unpack_from(body, offset))
+            offset += CHECKSUM.size
+        for _ in range(command_count):
+            log.commands.append(COMMAND.unpack_from(body, offset))
+            offset += COMMAND.size
+        return log
+
+
+class ReplayRunner:
+    """Повтор записанной сессии без экрана с проверкой контрольных сумм"""
+
+    def __init__(self, log):
+        self.log = log
+        self.input = MaskInput()
+        self.tick_input = TickInput()
+        self.time = log.start_clock
+        self.game = GameLogic(headless=True, seed=log.seed)
+        self.game.input_source = self.get_input if log.timed else self.input
+        self.game.clock = self.get_ticks
+
+    def get_ticks(self):
+        """Записанное время текущего тика"""
+        return self.time
+
+    def get_input(self):
+        """Записанный ввод командами текущего тика"""
+        return self.tick_input
+
+    def run(self):
+        """Повтор всех тиков; возвращает число проверенных контрольных сумм"""
+        log = self.log
+        checksums = dict(log.checksums)
+        clicks = {}
+        for tick, x, y in log.clicks:
+            clicks.setdefault(tick, []).append(
+                pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(x, y), button=1))
+        commands = {}
+        for tick, offset, code in log.commands:
+            commands.setdefault(tick, []).append((offset, code & ~PRESSED, bool(code & PRESSED)))
+
+        verified = 0
+        for tick in range(len(log)):
+            if tick in checksums:
+                actual = state_checksum(self.game)
+                if actual != checksums[tick]:
+                    raise ReplayMismatch(f"Расхождение состояния на тике {tick}")
+                verified += 1
+
+            self.time += log.clock_deltas[tick]
+            self.input.mask = log.masks[tick]
+            self.tick_input = TickInput(log.masks[tick], commands.get(tick, ()))
+            self.game.handle_events(clicks.get(tick, []))
+            self.game.update()
+        return verified
+
+
+def main():
+    """Проверка файлов повтора из командной строки"""
+    parser = argparse.ArgumentParser(description="Повтор записанных игр Астероиды")
+    parser.add_argument("paths", nargs="+", help="файлы повтора")
+    args = parser.parse_args()
+
+    failed = False
+    for path in args.paths:
+        log = InputLog.load(path)
+        started = time.perf_counter()
+        try:
+            verified = ReplayRunner(log).run()
+        except ReplayMismatch as e:
+            print(f"{path}: {e}")
+            failed = True
+            continue
+        elapsed = time.perf_counter() - started
+        speedup = len(log) / FPS / elapsed if elapsed > 0 else float("inf")
+        print(f"{path}: {len(log)} тиков, проверено сумм: {verified}, "
+              f"в {speedup:.1f} раз быстрее реального времени")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+import argparse
+import asyncio
+import socket
+import struct
+import time
+from collections import deque
+from config import *
+from game_logic import GameLogic
+from netcode import (JOIN, INPUT, LEAVE, MESSAGE_TYPE, INPUT_MESSAGE, FRAME_LENGTH, MAX_CLIENT_MESSAGE, FULL,
+                     KeyState, StateCapture, encode_entities, encode_state_header)
+from profiler import percentile
+
+
+class Player:
+    """Игрок сессии: последний ввод, подтвержденный снимок и способ отправки"""
+
+    def __init__(self, send):
+        # send(message) отправляет сообщение и возвращает False, если оно пропущено
+        self.send = send
+        self.keys = KeyState()
+        self.last_shot = None
+        # Последний полученный номер ввода (пакеты UDP могут прийти не по порядку)
+        self.input_seq = -1
+        # Последний снимок, полученный клиентом, - база для разности
+        self.ack = FULL
+        # Метка времени клиента для измерения задержки на его стороне
+        self.echo = 0
+        self.bytes_sent = 0
+        self.last_seen = time.monotonic()
+
+    def receive_input(self, seq, mask, ack, stamp):
+        """Ввод клиента (устаревшие пакеты отбрасываются)"""
+        if seq <= self.input_seq:
+            return
+        self.input_seq = seq
+        self.keys.mask = mask
+        self.ack = ack
+        self.echo = stamp
+
+
+class GameSession:
+    """Авторитетная игра на сервере: по кораблю на игрока, общие счет и жизни
+
+    Игрок с номером i управляет кораблем game.ships[i].
+    """
+
+    def __init__(self, name, seed=None, tick_ms=1000 / FPS):
+        self.name = name
+        self.tick_ms = tick_ms
+        self.tick = 0
+        # Пулы объектов дают ракетам и астероидам постоянные ключи для номеров в снимках;
+        # изображения на сервере не рисуются и не поворачиваются
+        self.game = GameLogic(headless=True, seed=seed, config=GameConfig(ENTITY_STORE=False, ROTATE_SPRITES=False))
+        self.game.game_state = "playing"
+        self.players = []
+        self.capture = StateCapture()
+        # Снимки последних тиков рассылки по номеру тика
+        self.history = {}
+        self.restart_timer = self.game.config.SERVER_RESTART_DELAY
+
+    def join(self, send):
+        """Новый игрок; первому достается корабль, созданный при сбросе игры"""
+        player = Player(send)
+        if self.players:
+            self.game.add_ship()
+        self.players.append(player)
+        return player
+
+    def leave(self, player):
+        """Уход игрока вместе с его кораблем"""
+        index = self.players.index(player)
+        del self.players[index]
+        if self.players:
+            self.game.remove_ship(index)
+
+    def step(self):
+        """Один тик игры и рассылка снимка (раз в SERVER_SEND_INTERVAL тиков); возвращает число отправленных байт"""
+        game = self.game
+        if game.game_state == "playing":
+            now = int(self.tick * self.tick_ms)
+            for player, ship in zip(self.players, game.ships):
+                player.last_shot = game.steer_ship(ship, player.keys, now, player.last_shot)
+        elif game.game_state == "game_over":
+            self.restart_timer -= 1
+            if self.restart_timer <= 0:
+                self.restart()
+        game.update()
+        self.tick += 1
+        if self.tick % SERVER_SEND_INTERVAL == 0:
+            return self.broadcast()
+        return 0
+
+    def restart(self):
+        """Новая игра с теми же игроками"""
+        self.game.reset_game()
+        self.game.game_state = "playing"
+        for _ in self.players[1:]:
+            self.game.add_ship()
+        for player in self.players:
+            player.last_shot = None
+        self.restart_timer = self.game.config.SERVER_RESTART_DELAY
+
+    def broadcast(self):
+        """Рассылка снимка: каждому игроку - разность относительно подтвержденного им тика; возвращает число байт"""
+        state = self.capture.capture(self.game, self.tick)
+        history = self.history
+        history[self.tick] = state
+        history.pop(self.tick - SERVER_HISTORY * SERVER_SEND_INTERVAL, None)
+
+        # Игроки с одной базой получают одно и то же тело сообщения
+        bodies = {}
+        sent = 0
+        for index, player in enumerate(self.players):
+            base_tick = player.ack if player.ack in history else FULL
+            body = bodies.get(base_tick)
+            if body is None:
+                body = bodies[base_tick] = encode_entities(history.get(base_tick), state)
+            message = encode_state_header(self.tick, base_tick, player.echo, self.game, index) + body
+            if player.send(message):
+                player.bytes_sent += len(message)
+                sent += len(message)
+        return sent
+
+
+class DatagramProtocol(asyncio.DatagramProtocol):
+    """Прием пакетов UDP для сервера"""
+
+    def __init__(self, server):
+        self.server = server
+
+    def connection_made(self, transport):
+        self.server.udp_transport = transport
+
+    def datagram_received(self, data, address):
+        self.server.receive_datagram(data, address)
+
+
+class GameServer:
+    """Сервер сессий на asyncio: общий цикл тиков, клиенты по TCP и UDP"""
+
+    def __init__(self, tick_ms=1000 / FPS):
+        self.tick_ms = tick_ms
+        self.tick_seconds = tick_ms / 1000
+        self.sessions = {}
+        # Игроки UDP по адресу клиента
+        self.udp_players = {}
+        self.udp_transport = None
+        self.ticks = 0
+        self.skipped = 0
+        # Время тика всех сессий и опоздание его начала (мс)
+        self.tick_times = deque(maxlen=SIMULATION_STATS_WINDOW)
+        self.lateness = deque(maxlen=SIMULATION_STATS_WINDOW)
+        self.bytes_sent = 0
+
+    def join(self, name, send):
+        """Подключение к сессии (создается при первом игроке); возвращает (сессия, игрок)"""
+        session = self.sessions.get(name)
+        if session is None:
+            session = self.sessions[name] = GameSession(name, tick_ms=self.tick_ms)
+        return session, session.join(send)
+
+    def leave(self, session, player):
+        """Отключение игрока; сессия без игроков закрывается"""
+        session.leave(player)
+        if not session.players:
+            self.sessions.pop(session.name, None)
+
+    def handle_message(self, data, joined, send):
+        """Обработка сообщения клиента; joined - (сессия, игрок) или None. Возвращает новое значение joined"""
+        try:
+            (kind,) = MESSAGE_TYPE.unpack_from(data)
+            if kind == JOIN:
+                if joined is None:
+                    joined = self.join(bytes(data[1:]).decode("utf-8"), send)
+            elif joined is None:
+                return None
+            elif kind == INPUT:
+                _, seq, mask, ack, stamp = INPUT_MESSAGE.unpack_from(data)
+                joined[1].receive_input(seq, mask, ack, stamp)
+            elif kind == LEAVE:
+                self.leave(*joined)
+                return None
+        except (struct.error, UnicodeDecodeError):
+            # Поврежденное сообщение пропускается
+            return joined
+        if joined is not None:
+            joined[1].last_seen = time.monotonic()
+        return joined
+
+    async def handle_connection(self, reader, writer):
+        """Клиент TCP: сообщения с длиной впереди"""
+        writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        transport = writer.transport
+
+        def send(message):
+            # Медленный клиент пропускает снимки, а не копит их в памяти сервера
+            if transport.is_closing() or transport.get_write_buffer_size() > SERVER_SEND_BUFFER:
+                return False
+            writer.write(FRAME_LENGTH.pack(len(message)) + message)
+            return True
+
+        joined = None
+        try:
+            while True:
+                (length,) = FRAME_LENGTH.unpack(await reader.readexactly(FRAME_LENGTH.size))
+                if length > MAX_CLIENT_MESSAGE:
+                    break
+                joined = self.handle_message(await reader.readexactly(length), joined, send)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if joined is not None:
+                self.leave(*joined)
+            writer.close()
+
+    def receive_datagram(self, data, address):
+        """Клиент UDP: одно сообщение в пакете, игрок определяется по адресу"""
+        if len(data) > MAX_CLIENT_MESSAGE:
+            return
+        transport = self.udp_transport
+
+        def send(message):
+            transport.sendto(message, address)
+            return True
+
+        joined = self.handle_message(data, self.udp_players.get(address), send)
+        if joined is None:
+            self.udp_players.pop(address, None)
+        else:
+            self.udp_players[address] = joined
+
+    def drop_silent_players(self):
+        """Отключение игроков UDP, от которых давно нет пакетов"""
+        now = time.monotonic()
+        for address, (session, player) in list(self.udp_players.items()):
+            if now - player.last_seen > SERVER_CLIENT_TIMEOUT:
+                del self.udp_players[address]
+                self.leave(session, player)
+
+    def step(self):
+        """Тик всех сессий"""
+        for session in list(self.sessions.values()):
+            self.bytes_sent += session.step()
+        self.ticks += 1
+        if self.ticks % FPS == 0:
+            self.drop_silent_players()
+
+    async def run(self):
+        """Цикл с фиксированным тиком (как SimulationThread.run, но без потока)"""
+        next_time = time.perf_counter()
+        while True:
+            now = time.perf_counter()
+            if now < next_time:
+                await asyncio.sleep(next_time - now)
+                continue
+            self.lateness.append((now - next_time) * 1000)
+            self.step()
+            self.tick_times.append((time.perf_counter() - now) * 1000)
+            next_time += self.tick_seconds
+
+            behind = time.perf_counter() - next_time
+            if behind > SIMULATION_MAX_CATCHUP * self.tick_seconds:
+                skipped = int(behind / self.tick_seconds)
+                self.skipped += skipped
+                next_time += skipped * self.tick_seconds
+
+    async def report(self, interval):
+        """Периодический вывод статистики"""
+        sent = 0
+        while True:
+            await asyncio.sleep(interval)
+            stats = self.get_stats()
+            players = stats["players"]
+            rate = (self.bytes_sent - sent) / interval
+            sent = self.bytes_sent
+            print(f"Сессий {stats['sessions']}, игроков {players}: тик p50 {stats['tick_p50']:.2f} мс, "
+                  f"p95 {stats['tick_p95']:.2f} мс, опоздание p95 {stats['lateness_p95']:.2f} мс, "
+                  f"пропущено {stats['skipped']}; отправлено {rate / 1024:.1f} КБ/с"
+                  f" ({rate / max(1, players) / 1024:.2f} КБ/с на игрока)")
+
+    def get_stats(self):
+        """Статистика тиков сервера (мс)"""
+        tick_times = sorted(self.tick_times)
+        lateness = sorted(self.lateness)
+        return {
+            "sessions": len(self.sessions),
+            "players": sum(len(session.players) for session in self.sessions.values()),
+            "ticks": self.ticks,
+            "skipped": self.skipped,
+            "tick_p50": percentile(tick_times, 0.5),
+            "tick_p95": percentile(tick_times, 0.95),
+            "lateness_p95": percentile(lateness, 0.95),
+        }
+
+    async def serve(self, host, port, stats_interval=SERVER_STATS_INTERVAL):
+        """Запуск приема клиентов TCP и UDP на одном порту и цикла тиков"""
+        loop = asyncio.get_running_loop()
+        tcp = await asyncio.start_server(self.handle_connection, host, port)
+        await loop.create_datagram_endpoint(lambda: DatagramProtocol(self), local_addr=(host, port))
+        print(f"Сервер слушает {host}:{port} (TCP и UDP)")
+        tasks = [asyncio.create_task(self.run())]
+        if stats_interval:
+            tasks.append(asyncio.create_task(self.report(stats_interval)))
+        async with tcp:
+            await asyncio.gather(*tasks)
+
+
+def main():
+    """Запуск сервера"""
+    parser = argparse.ArgumentParser(description="Сервер сетевой игры Астероиды")
+    parser.add_argument("--host", default=SERVER_HOST, help="адрес")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="порт TCP и UDP")
+    parser.add_argument("--stats", type=float, default=SERVER_STATS_INTERVAL,
+                        help="секунд между выводом статистики (0 - не выводить)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(GameServer().serve(args.host, args.port, args.stats))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import argparse
+import random
+import sys
+import time
+import pygame
+from config import *
+from game_logic import GameLogic
+
+
+class ScriptedInput:
+    """Источник ввода, совместимый с pygame.key.get_pressed()"""
+
+    def __init__(self):
+        self.pressed = set()
+
+    def __call__(self):
+        return self
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+def idle_policy(game, tick):
+    """Стратегия без действий"""
+    return ()
+
+
+def make_random_policy(seed=None):
+    """Случайная стратегия: каждый тик с некоторой вероятностью нажимает клавиши"""
+    rng = random.Random(seed)
+    keys = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_SPACE)
+
+    def policy(game, tick):
+        return [key for key in keys if rng.random() < 0.3]
+
+    return policy
+
+
+class HeadlessSimulation:
+    """Пошаговая симуляция игры без экрана с фиксированным шагом времени"""
+
+    def __init__(self, policy=None, tick_ms=1000 / FPS, seed=None, config=None):
+        self.policy = policy or idle_policy
+        self.tick_ms = tick_ms
+        self.tick = 0
+        self.input = ScriptedInput()
+
+        self.game = GameLogic(headless=True, seed=seed, config=config)
+        self.game.input_source = self.input
+        self.game.clock = self.get_ticks
+        self.game.game_state = "playing"
+
+    def get_ticks(self):
+        """Время симуляции в миллисекундах (замена pygame.time.get_ticks)"""
+        return int(self.tick * self.tick_ms)
+
+    def step(self, events=()):
+        """Один тик: ввод от стратегии, обработка событий и обновление"""
+        self.input.pressed = set(self.policy(self.game, self.tick))
+        self.game.handle_events(list(events))
+        self.game.update()
+        self.tick += 1
+
+    def run(self, max_ticks):
+        """Симуляция до конца игры или до max_ticks тиков"""
+        while self.tick < max_ticks and self.game.game_state == "playing":
+            self.step()
+        return {
+            "score": self.game.score,
+            "lives": self.game.lives,
+            "ticks": self.tick,
+            "game_over": self.game.game_state == "game_over",
+        }
+
+
+def check_broad_phase(seed, ticks, **overrides):
+    """Сравнение сетки с полным перебором: одинаковый ввод должен давать одинаковое состояние каждый тик
+
+    Возвращает номер первого тика, на котором состояния разошлись, или None.
+    """
+    from replay import state_checksum
+
+    simulations = [HeadlessSimulation(make_random_policy(seed), seed=seed,
+                                      config=GameConfig(COLLISION_BROAD_PHASE=phase, **overrides))
+                   for phase in ("grid", "brute")]
+    for tick in range(ticks):
+        for simulation in simulations:
+            simulation.step()
+        grid, brute = (simulation.game for simulation in simulations)
+        if state_checksum(grid) != state_checksum(brute):
+            return tick
+        if grid.game_state != "playing":
+            break
+    return None
+
+
+# Параметры проверки сетки: обычная игра и быстрые осколки одного размера с астероидами,
+# которые раскалываются снова и разгоняются с каждым поколением
+BROAD_PHASE_CHECKS = (
+    {},
+    {"ASTEROID_MIN_SIZE": 30, "ASTEROID_MAX_SIZE": 30, "ASTEROID_FRAGMENT_SCALE": 1.0, "ASTEROID_FRAGMENT_SPEED": 15,
+     "COLLISION_CELL_SIZE": 5, "ASTEROID_MAX_POPULATION": 300, "INITIAL_LIVES": 100},
+)
+
+
+def main():
+    """Запуск серии симуляций из командной строки"""
+    parser = argparse.ArgumentParser(description="Симуляция игры Астероиды без экрана")
+    parser.add_argument("--games", type=int, default=10, help="число игр")
+    parser.add_argument("--ticks", type=int, default=60 * FPS, help="максимум тиков в игре")
+    parser.add_argument("--seed", type=int, default=0, help="начальное зерно")
+    parser.add_argument("--policy", choices=("idle", "random"), default="random", help="стратегия ввода")
+    parser.add_argument("--check-collisions", action="store_true",
+                        help="сравнить столкновения через сетку с полным перебором")
+    args = parser.parse_args()
+
+    if args.check_collisions:
+        failures = 0
+        for overrides in BROAD_PHASE_CHECKS:
+            for seed in range(args.seed, args.seed + args.games):
+                tick = check_broad_phase(seed, args.ticks, **overrides)
+                if tick is not None:
+                    failures += 1
+                    print(f"Зерно {seed} {overrides}: сетка разошлась с перебором на тике {tick}")
+        print(f"Проверка столкновений: расхождений {failures}")
+        sys.exit(1 if failures else 0)
+
+    started = time.perf_counter()
+    total_ticks = 0
+    for game_index in range(args.games):
+        seed = args.seed + game_index
+        policy = make_random_policy(seed) if args.policy == "random" else idle_policy
+        result = HeadlessSimulation(policy, seed=seed).run(args.ticks)
+        total_ticks += result["ticks"]
+        print(f"Игра {game_index + 1}: очки {result['score']}, жизни {result['lives']}, "
+              f"тиков {result['ticks']}")
+
+    elapsed = time.perf_counter() - started
+    print(f"Всего: {args.games} игр за {elapsed:.2f} с "
+          f"({args.games / elapsed * 60:.0f} игр/мин, {total_ticks / elapsed:.0f} тиков/с)")
+
+
+if __name__ == "__main__":
+    main()
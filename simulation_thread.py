@@ -0,0 +1,253 @@
+import copy
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+import pygame
+from config import *
+from profiler import percentile
+from simulation import ScriptedInput
+
+try:
+    import numpy as np
+    from entity_store import round_center
+except ImportError:
+    np = None
+
+# Неизменяемый снимок после тика: номер тика, время публикации, состояние игры и слои
+RenderSnapshot = namedtuple("RenderSnapshot", "tick time game_state layers")
+
+
+class Placeholder(namedtuple("Placeholder", "x y")):
+    """Сущность без изображения в снимке (резервный прямоугольник, как в GameObject.draw)"""
+
+    __slots__ = ()
+
+    def draw(self, screen):
+        return pygame.draw.rect(screen, RED, (self.x - 10, self.y - 10, 20, 20), 2)
+
+
+class SnapshotLayer:
+    """Слой снимка для RenderQueue
+
+    moving - движущиеся объекты (ключ, изображение, x, y), которые интерполируются;
+    fixed - готовые пары (изображение, позиция) из хранилищ; positions - номера и
+    координаты сущностей хранилища (EntityStore.positions) в порядке пар fixed
+    или None, если пары не интерполируются; missing - объекты без изображения,
+    которые рисуются своим draw. Ключ - порядковый номер объекта (pools.serials),
+    а не id: объект, повторно выданный пулом между снимками, получает новый номер.
+    """
+
+    def __init__(self, moving=(), fixed=(), missing=(), positions=None):
+        self.moving = tuple(moving)
+        self.fixed = tuple(fixed)
+        self.missing = tuple(missing)
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.moving) + len(self.fixed) + len(self.missing)
+
+    def blend(self, previous, alpha):
+        """Слой с позициями между предыдущим снимком (alpha = 0) и этим (alpha = 1)"""
+        if previous is None or alpha >= 1:
+            return self
+        moving = self.blend_moving(previous, alpha) if self.moving else self.moving
+        fixed = self.fixed
+        if self.positions is not None and previous.positions is not None and len(previous.positions[0]):
+            fixed = self.blend_fixed(previous, alpha)
+        return SnapshotLayer(moving, fixed, self.missing, self.positions)
+
+    def blend_moving(self, previous, alpha):
+        """Промежуточные положения объектов из списков"""
+        before = {key: (x, y) for key, _, x, y in previous.moving}
+        moving = []
+        for key, image, x, y in self.moving:
+            old = before.get(key)
+            if old is not None:
+                dx = x - old[0]
+                dy = y - old[1]
+                # Перенос через край не интерполируется
+                if abs(dx) <= SIMULATION_MAX_JUMP and abs(dy) <= SIMULATION_MAX_JUMP:
+                    x = old[0] + dx * alpha
+                    y = old[1] + dy * alpha
+            moving.append((key, image, x, y))
+        return moving
+
+    def blend_fixed(self, previous, alpha):
+        """Промежуточные положения сущностей хранилища по массивам x, y двух снимков"""
+        keys, x, y = self.positions
+        old_keys, old_x, old_y = previous.positions
+        # Сущность ищется в предыдущем снимке по номеру (уплотнение хранилища сдвигает индексы)
+        order = np.argsort(old_keys)
+        found = order[np.searchsorted(old_keys, keys, sorter=order).clip(max=len(old_keys) - 1)]
+        dx = x - old_x[found]
+        dy = y - old_y[found]
+        blended = ((old_keys[found] == keys) & (np.abs(dx) <= SIMULATION_MAX_JUMP) &
+                   (np.abs(dy) <= SIMULATION_MAX_JUMP))
+        # Пары сдвигаются на разницу округленных центров, как если бы sprites считал их заново
+        shift_x = round_center(np.where(blended, x - dx * (1 - alpha), x)) - round_center(x)
+        shift_y = round_center(np.where(blended, y - dy * (1 - alpha), y)) - round_center(y)
+        return [(image, (left + sx, top + sy))
+                for (image, (left, top)), sx, sy in zip(self.fixed, shift_x.tolist(), shift_y.tolist())]
+
+    def sprites(self, view=None):
+        """Пары (изображение, позиция) для Surface.blits и объекты без изображения"""
+        pairs = []
+        for _, image, x, y in self.moving:
+            rect = image.get_rect(center=(x, y))
+            if view is None or view.colliderect(rect):
+                pairs.append((image, rect))
+        if view is None:
+            pairs.extend(self.fixed)
+        else:
+            for image, (left, top) in self.fixed:
+                if view.colliderect((left, top, image.get_width(), image.get_height())):
+                    pairs.append((image, (left, top)))
+        return pairs, list(self.missing)
+
+
+def capture_layer(objects):
+    """Копия слоя игры (список объектов или хранилище с методом sprites) для снимка"""
+    sprites = getattr(objects, "sprites", None)
+    if sprites is not None:
+        pairs, missing = sprites(None)
+        # Взрывы системы частиц не движутся: положения нужны только сущностям EntityStore
+        positions = getattr(objects, "positions", None)
+        return SnapshotLayer(fixed=pairs, missing=[Placeholder(entity.x, entity.y) for entity in missing],
+                             positions=positions() if positions is not None else None)
+
+    moving = []
+    missing = []
+    for obj in objects:
+        image = getattr(obj, "image", None)
+        if image and getattr(obj, "rect", None):
+            moving.append((obj.serial, image, obj.x, obj.y))
+        else:
+            # Объект рисует себя сам: в снимок попадает его копия
+            missing.append(copy.copy(obj))
+    return SnapshotLayer(moving, (), missing)
+
+
+class SimulationThread:
+    """Игра на отдельном потоке с фиксированным тиком
+
+    После каждого тика публикуется неизменяемый снимок; поток отрисовки берет
+    два последних (previous, current) и рисует промежуточное положение объектов.
+    """
+
+    def __init__(self, game, tick_ms=1000 / FPS, max_catchup=SIMULATION_MAX_CATCHUP, commands=None):
+        self.game = game
+        self.tick_ms = tick_ms
+        self.tick_seconds = tick_ms / 1000
+        self.max_catchup = max_catchup
+        self.tick = 0
+
+        # Ввод из главного потока: последнее состояние клавиш и очередь событий;
+        # с очередью команд (InputQueue) каждый тик забирает команды, пришедшие до его начала
+        self.keys = ScriptedInput()
+        self.events = deque()
+        self.commands = commands
+        game.input_source = commands.get_input if commands is not None else self.get_keys
+        game.clock = self.get_ticks
+
+        # Тик выполняется под блокировкой; главный поток берет ее для сохранения и загрузки
+        self.lock = threading.Lock()
+        snapshot = self.capture()
+        self.snapshots = (snapshot, snapshot)
+
+        # Опоздание начала тика относительно расписания (мс) и пропущенные тики
+        self.lateness = deque(maxlen=SIMULATION_STATS_WINDOW)
+        self.skipped = 0
+        self.started = None
+        self.running = False
+        self.thread = None
+
+    def get_ticks(self):
+        """Время симуляции в миллисекундах (по номеру тика)"""
+        return int(self.tick * self.tick_ms)
+
+    def get_keys(self):
+        """Состояние клавиш, переданное главным потоком"""
+        return self.keys
+
+    def push_input(self, events, keys):
+        """Передача событий и состояния клавиш из главного потока"""
+        self.events.extend(events)
+        self.keys = keys
+
+    def start(self):
+        """Запуск потока симуляции"""
+        # Поток, проснувшийся к началу тика, не должен ждать GIL стандартные 5 мс
+        sys.setswitchinterval(SIMULATION_SWITCH_INTERVAL_MS / 1000)
+        self.running = True
+        self.started = time.perf_counter()
+        self.thread = threading.Thread(target=self.run, name="simulation", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Остановка потока симуляции"""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        """Цикл с фиксированным тиком"""
+        next_time = time.perf_counter()
+        while self.running:
+            now = time.perf_counter()
+            if now < next_time:
+                time.sleep(next_time - now)
+                continue
+            self.lateness.append((now - next_time) * 1000)
+            self.step(next_time)
+            next_time += self.tick_seconds
+
+            # После долгой задержки догоняется не больше max_catchup тиков, остальное время пропускается
+            behind = time.perf_counter() - next_time
+            if behind > self.max_catchup * self.tick_seconds:
+                skipped = int(behind / self.tick_seconds)
+                self.skipped += skipped
+                next_time += skipped * self.tick_seconds
+
+    def step(self, scheduled=None):
+        """Один тик игры и публикация снимка; scheduled - время начала тика по расписанию (time.perf_counter())"""
+        events = []
+        while self.events:
+            events.append(self.events.popleft())
+        if self.commands is not None:
+            self.commands.next_tick(scheduled)
+        with self.lock:
+            started = time.perf_counter()
+            self.game.handle_events(events)
+            self.game.update()
+            self.tick += 1
+            # Адаптивное появление астероидов учитывает время тика, а не кадра отрисовки
+            self.game.report_frame_time((time.perf_counter() - started) * 1000)
+            snapshot = self.capture()
+        self.snapshots = (self.snapshots[1], snapshot)
+
+    def capture(self):
+        """Неизменяемый снимок текущего состояния для отрисовки"""
+        layers = tuple((name, capture_layer(objects)) for name, objects in self.game.render_layers())
+        return RenderSnapshot(self.tick, time.perf_counter(), self.game.game_state, layers)
+
+    def render_layers(self):
+        """Слои для отрисовки (как GameLogic.render_layers) между двумя последними снимками"""
+        previous, current = self.snapshots
+        alpha = min(1.0, (time.perf_counter() - current.time) / self.tick_seconds)
+        return [(name, layer.blend(old, alpha))
+                for (name, layer), (_, old) in zip(current.layers, previous.layers)]
+
+    def get_stats(self):
+        """Статистика тиков: частота, пропуски и опоздание начала тика (мс)"""
+        elapsed = time.perf_counter() - self.started if self.started is not None else 0
+        lateness = sorted(self.lateness)
+        return {
+            "ticks": self.tick,
+            "ticks_per_second": self.tick / elapsed if elapsed > 0 else 0,
+            "skipped": self.skipped,
+            "jitter_p50": percentile(lateness, 0.5),
+            "jitter_p95": percentile(lateness, 0.95),
+            "jitter_max": lateness[-1] if lateness else 0,
+        }
@@ -0,0 +1,334 @@
+import itertools
+import math
+import operator
+import random
+import struct
+from config import *
+from assets import asset_cache
+from game_objects import Asteroid, ASTEROID_IMAGES, placeholder_rng
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Формат снимка: заголовок MAGIC + версия, далее состояние без сжатия (ради скорости)
+MAGIC = b"ASNP"
+VERSION = 2
+HEADER = struct.Struct("<4sB")
+# зерно, счет, жизни, состояние, таймер астероидов, смещение фона, интервал появления,
+# был ли выстрел, время выстрела, число кораблей, ракет, астероидов и взрывов
+STATE = struct.Struct("<QiiBidd?qIIII")
+SHIP = struct.Struct("<6d?")  # x, y, vx, vy, angle, acceleration, thrusting (для каждого корабля)
+RNG = struct.Struct("<625I?d")  # состояние Mersenne Twister и gauss_next
+
+GAME_STATES = ("start", "playing", "game_over")
+
+# Поля сущностей; каждая сущность записывается подряд как набор double
+BULLET_FIELDS = ("x", "y", "vx", "vy", "angle", "lifetime")
+ASTEROID_FIELDS = ("x", "y", "vx", "vy", "angle", "rotation_speed", "size", "age", "max_age", "image_index")
+EXPLOSION_FIELDS = ("x", "y", "timer", "current_frame")
+
+
+def pack_objects(objects, fields):
+    """Запись полей списка объектов подряд"""
+    values = list(itertools.chain.from_iterable(map(operator.attrgetter(*fields), objects)))
+    return struct.pack(f"<{len(values)}d", *values)
+
+
+def pack_store(store, fields):
+    """Запись полей хранилища EntityStore подряд (построчно, как у списков)"""
+    n = store.count
+    return np.column_stack([getattr(store, name)[:n] for name in fields]).astype("<f8").tobytes()
+
+
+def unpack_rows(data, offset, count, fields):
+    """Чтение count записей; возвращает список кортежей и новое смещение"""
+    width = len(fields)
+    values = struct.unpack_from(f"<{count * width}d", data, offset)
+    rows = [values[index:index + width] for index in range(0, len(values), width)]
+    return rows, offset + count * width * 8
+
+
+def unpack_columns(data, offset, count, fields):
+    """Чтение count записей по столбцам (без кортежа на каждую запись); возвращает столбцы и новое смещение"""
+    width = len(fields)
+    values = struct.unpack_from(f"<{count * width}d", data, offset)
+    return [values[column::width] for column in range(width)], offset + count * width * 8
+
+
+# Программно нарисованные астероиды по размеру: форма не сохраняется в снимке
+# и рисуется один раз на размер для всех восстановлений
+procedural_images = {}
+
+
+def asteroid_image(index, size, config, images):
+    """Исходное изображение астероида по номеру из снимка (images - кэш на время восстановления)"""
+    key = (index, size)
+    image = images.get(key)
+    if image is None:
+        image = images[key] = load_asteroid_image(index, size, config)
+    return image
+
+
+def load_asteroid_image(index, size, config):
+    """Загрузка или программная отрисовка изображения астероида"""
+    if index >= 0:
+        image = asset_cache.get(ASTEROID_IMAGES[int(index)], size / 40.0)
+        if image is not None:
+            return image
+    size = int(size)
+    image = procedural_images.get(size)
+    if image is None:
+        asteroid = Asteroid(0, 0, rng=random.Random(size), config=config)
+        asteroid.size = size
+        asteroid.create_asteroid_image()
+        image = procedural_images[size] = asteroid.original_image
+    return image
+
+
+def save_snapshot(game):
+    """Снимок состояния симуляции в виде bytes (без Surface и Rect)"""
+    last_shot = game.last_shot
+    version, mt_state, gauss_next = game.rng.getstate()
+
+    parts = [
+        HEADER.pack(MAGIC, VERSION),
+        STATE.pack(game.seed, game.score, game.lives, GAME_STATES.index(game.game_state),
+                   game.asteroid_timer, game.background_offset, game.spawner.interval,
+                   last_shot is not None, last_shot or 0,
+                   len(game.ships), len(game.bullets), len(game.asteroids), len(game.explosions)),
+        RNG.pack(*mt_state, gauss_next is not None, gauss_next or 0.0),
+    ]
+    for ship in game.ships:
+        parts.append(SHIP.pack(ship.x, ship.y, ship.vx, ship.vy, ship.angle, ship.acceleration, ship.thrusting))
+
+    if game.use_entity_store:
+        parts.append(pack_store(game.bullets, BULLET_FIELDS))
+        parts.append(pack_store(game.asteroids, ASTEROID_FIELDS))
+    else:
+        parts.append(pack_objects(game.bullets, BULLET_FIELDS))
+        parts.append(pack_objects(game.asteroids, ASTEROID_FIELDS))
+    if game.use_particle_system:
+        parts.append(pack_store(game.explosions, EXPLOSION_FIELDS))
+    else:
+        parts.append(pack_objects(game.explosions, EXPLOSION_FIELDS))
+    return b"".join(parts)
+
+
+def restore_snapshot(game, data):
+    """Восстановление состояния симуляции из снимка save_snapshot"""
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Неподдерживаемый формат снимка")
+    offset = HEADER.size
+
+    (game.seed, game.score, game.lives, state, game.asteroid_timer, game.background_offset,
+     game.spawner.interval, has_shot, last_shot,
+     ship_count, bullet_count, asteroid_count, explosion_count) = STATE.unpack_from(data, offset)
+    offset += STATE.size
+    game.game_state = GAME_STATES[state]
+    game.last_shot = last_shot if has_shot else None
+
+    values = RNG.unpack_from(data, offset)
+    offset += RNG.size
+    game.rng.setstate((3, values[:625], values[626] if values[625] else None))
+
+    # Корабли всех игроков по порядку (как в client.apply_state)
+    while len(game.ships) < ship_count:
+        game.add_ship()
+    while len(game.ships) > max(1, ship_count):
+        game.remove_ship(len(game.ships) - 1)
+    for ship in game.ships[:ship_count]:
+        restore_ship(ship, *SHIP.unpack_from(data, offset))
+        offset += SHIP.size
+
+    # Наибольшая скорость астероида не сохраняется: хватает скоростей восстановленных астероидов
+    speed_limit = game.config.ASTEROID_MAX_SPEED
+    if game.use_entity_store:
+        offset = restore_store_bullets(game, data, offset, bullet_count)
+        offset = restore_store_asteroids(game, data, offset, asteroid_count)
+        if asteroid_count:
+            store = game.asteroids
+            speed_limit = max(speed_limit, float(np.hypot(store.vx[:asteroid_count], store.vy[:asteroid_count]).max()))
+    else:
+        bullets, offset = unpack_rows(data, offset, bullet_count, BULLET_FIELDS)
+        restore_bullets(game, bullets)
+        asteroids, offset = unpack_columns(data, offset, asteroid_count, ASTEROID_FIELDS)
+        restore_asteroid_columns(game, asteroids)
+        if asteroid_count:
+            speed_limit = max(speed_limit, max(map(math.hypot, asteroids[2], asteroids[3])))
+    game.asteroid_speed_limit = speed_limit
+    if game.use_particle_system:
+        restore_particles(game, data, offset, explosion_count)
+    else:
+        explosions, offset = unpack_rows(data, offset, explosion_count, EXPLOSION_FIELDS)
+        restore_explosions(game, explosions)
+
+
+def restore_ship(ship, x, y, vx, vy, angle, acceleration, thrusting):
+    """Восстановление корабля (изображение выбирается по состоянию двигателей)"""
+    ship.x, ship.y, ship.vx, ship.vy, ship.angle = x, y, vx, vy, angle
+    ship.acceleration = acceleration
+    ship.thrusting = thrusting
+    image = ship.ship_image_thrust if thrusting else ship.ship_image_normal
+    if image:
+        ship.original_image = image
+    ship.rect = None
+    ship.update_image_rotation()
+
+
+def restore_bullets(game, rows):
+    """Восстановление ракет в пуле"""
+    pool = game.pools["bullets"]
+    pool.release_all()
+    if not rows:
+        return
+    # Новым объектам нужны аргументы конструктора; поля все равно задаются ниже
+    x, y, _, _, angle, _ = rows[0]
+    bullets = pool.take_many(len(rows), x, y, angle)
+    for bullet, (x, y, vx, vy, angle, lifetime) in zip(bullets, rows):
+        bullet.x, bullet.y, bullet.vx, bullet.vy, bullet.angle = x, y, vx, vy, angle
+        bullet.lifetime = lifetime
+        bullet.active = True
+        if bullet.procedural_image:
+            bullet.update_image_rotation()
+        if bullet.rect:
+            bullet.rect.center = (x, y)
+
+
+def restore_asteroids(game, rows, images=None):
+    """Восстановление астероидов в пуле по списку записей (images - кэш исходных изображений между вызовами)"""
+    restore_asteroid_columns(game, list(zip(*rows)) if rows else [()] * len(ASTEROID_FIELDS), images)
+
+
+def restore_asteroid_columns(game, columns, images=None):
+    """Восстановление астероидов в пуле по столбцам полей ASTEROID_FIELDS
+
+    Объекты выдаются пулом сразу; изображение и атлас поворота ищутся один раз
+    на пару (номер изображения, размер), а не для каждого астероида.
+    Каждому объекту все равно задаются поля, поэтому тысячи астероидов
+    восстанавливаются за миллисекунды; за доли миллисекунды - только с ENTITY_STORE.
+    """
+    pool = game.pools["asteroids"]
+    pool.release_all()
+    xs, ys, vxs, vys, angles, rotation_speeds, sizes, ages, max_ages, image_indices = columns
+    if not xs:
+        return
+    if images is None:
+        images = {}
+    sizes = list(map(int, sizes))
+    ages = list(map(int, ages))
+    image_indices = list(map(int, image_indices))
+
+    # Атлас поворота на каждую пару (номер изображения, размер)
+    config = game.config
+    rotation_cache = game.rotation_cache
+    atlases = {}
+    for key in set(zip(image_indices, sizes)):
+        original = asteroid_image(*key, config, images)
+        atlases[key] = (original, rotation_cache.get_atlas(original))
+
+    rng = game.rng
+    asteroids = pool.take_many(len(xs), xs[0], ys[0], rng=placeholder_rng)
+    for asteroid, x, y, vx, vy, angle, rotation_speed, size, age, max_age, image_index in zip(
+            asteroids, xs, ys, vxs, vys, angles, rotation_speeds, sizes, ages, max_ages, image_indices):
+        asteroid.rng = rng
+        asteroid.x = x
+        asteroid.y = y
+        asteroid.vx = vx
+        asteroid.vy = vy
+        asteroid.angle = angle
+        asteroid.rotation_speed = rotation_speed
+        asteroid.size = size
+        asteroid.age = age
+        asteroid.max_age = max_age
+        asteroid.image_index = image_index
+        asteroid.active = True
+        # То же, что update_image_rotation, но без поиска атласа для каждого астероида
+        original, atlas = atlases[image_index, size]
+        asteroid.original_image = original
+        image = asteroid.image = atlas.get_frame(original, -angle)
+        asteroid.rect = image.get_rect(center=(x, y))
+
+
+def restore_store_bullets(game, data, offset, count):
+    """Восстановление ракет в хранилище EntityStore без создания объекта на каждую ракету"""
+    store = game.bullets
+    while store.capacity < count:
+        store.grow()
+    width = len(BULLET_FIELDS)
+    rows = np.frombuffer(data, dtype="<f8", count=count * width, offset=offset).reshape(count, width)
+    for column, name in enumerate(BULLET_FIELDS):
+        getattr(store, name)[:count] = rows[:, column]
+    store.count = count
+    store.assign_serials(count)
+    if not count:
+        return offset
+    # Остальные поля - как у ракеты, перенесенной через EntityStore.append
+    store.rotation_speed[:count] = 0
+    store.age[:count] = 0
+    store.max_age[:count] = np.inf
+    store.image_index[:count] = -1
+    store.active[:count] = True
+    store.spinning[:count] = False
+    # Изображение берется у одного объекта-шаблона; нарисованная ракета повернута по направлению полета
+    template = game.pools["bullets"].factory(*rows[0, [0, 1, 4]].tolist())
+    store.size[:count] = template.size
+    if template.procedural_image:
+        original = template.original_image
+        get_frame = game.rotation_cache.get_frame
+        store.images[:count] = [get_frame(original, -angle) for angle in rows[:, 4].tolist()]
+    else:
+        store.images[:count] = [template.image] * count
+    return offset + count * width * 8
+
+
+def restore_store_asteroids(game, data, offset, count):
+    """Восстановление астероидов в хранилище EntityStore без создания объектов"""
+    store = game.asteroids
+    while store.capacity < count:
+        store.grow()
+    width = len(ASTEROID_FIELDS)
+    rows = np.frombuffer(data, dtype="<f8", count=count * width, offset=offset).reshape(count, width)
+    for column, name in enumerate(ASTEROID_FIELDS):
+        getattr(store, name)[:count] = rows[:, column]
+    store.lifetime[:count] = np.inf
+    store.active[:count] = True
+    store.spinning[:count] = True
+    store.assign_serials(count)
+    # Изображение загружается одно на каждую пару (номер изображения, размер)
+    codes = ((rows[:, ASTEROID_FIELDS.index("image_index")] + 1) * 65536 +
+             rows[:, ASTEROID_FIELDS.index("size")])
+    unique, inverse = np.unique(codes, return_inverse=True)
+    surfaces = [load_asteroid_image(code // 65536 - 1, code % 65536, game.config) for code in unique.tolist()]
+    store.images = [surfaces[index] for index in inverse.tolist()]
+    store.images.extend([None] * (store.capacity - count))
+    store.count = count
+    return offset + count * width * 8
+
+
+def restore_explosions(game, rows):
+    """Восстановление взрывов в пуле"""
+    pool = game.pools["explosions"]
+    pool.release_all()
+    for x, y, timer, current_frame in rows:
+        explosion = pool.take(x, y)
+        explosion.x, explosion.y = x, y
+        explosion.timer = int(timer)
+        explosion.current_frame = int(current_frame)
+        explosion.active = True
+
+
+def restore_particles(game, data, offset, count):
+    """Восстановление взрывов в системе частиц"""
+    system = game.explosions
+    if count > system.capacity:
+        raise ValueError(f"В снимке {count} взрывов, а система частиц вмещает {system.capacity} "
+                         f"(увеличьте PARTICLE_CAPACITY)")
+    width = len(EXPLOSION_FIELDS)
+    rows = np.frombuffer(data, dtype="<f8", count=count * width, offset=offset).reshape(count, width)
+    for column, name in enumerate(EXPLOSION_FIELDS):
+        getattr(system, name)[:count] = rows[:, column]
+    system.count = count
+    return offset + count * width * 8
@@ -0,0 +1,83 @@
+import time
+from config import *
+from assets import asset_cache
+from game_objects import Bullet, Explosion, ASTEROID_IMAGES
+from text_cache import text_cache
+
+# Момент импорта модуля - отсчет для часов игры и замера запуска
+started = time.perf_counter()
+
+
+def get_ticks():
+    """Миллисекунды с запуска (pygame.time.get_ticks работает только после pygame.init)"""
+    return int((time.perf_counter() - started) * 1000)
+
+
+class StartupTimer:
+    """Замер фаз запуска до первого кадра"""
+
+    def __init__(self, start=None):
+        self.start = started if start is None else start
+        self.last = self.start
+        self.phases = []
+        self.reported = False
+
+    def mark(self, name):
+        """Завершение фазы запуска"""
+        now = time.perf_counter()
+        self.phases.append((name, (now - self.last) * 1000))
+        self.last = now
+
+    def report(self):
+        """Однократный вывод времени до первого кадра; возвращает его в мс"""
+        total = (time.perf_counter() - self.start) * 1000
+        if not self.reported:
+            self.reported = True
+            phases = ", ".join(f"{name} {ms:.0f}" for name, ms in self.phases)
+            print(f"Первый кадр через {total:.0f} мс ({phases})")
+        return total
+
+
+class CacheWarmer:
+    """Прогрев кэшей небольшими шагами в пределах бюджета времени на кадр"""
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self.done = False
+
+    def run(self, budget_ms=WARMUP_BUDGET_MS):
+        """Выполнение шагов прогрева, пока не исчерпан бюджет; возвращает True по завершении"""
+        if self.done:
+            return True
+        deadline = time.perf_counter() + budget_ms / 1000
+        for _ in self.tasks:
+            if time.perf_counter() >= deadline:
+                return False
+        self.done = True
+        return True
+
+
+def warm_up_tasks(game, font):
+    """Шаги прогрева кэшей, которые иначе заполнялись бы в первые секунды игры"""
+    config = game.config
+    # Изображения астероидов всех размеров (атласы поворота строятся по мере надобности)
+    for name in ASTEROID_IMAGES:
+        for size in range(config.ASTEROID_MIN_SIZE, config.ASTEROID_MAX_SIZE + 1):
+            yield asset_cache.get(name, size / 40.0)
+
+    # Кадры поворота корабля с двигателями и без
+    for image in (game.ship.ship_image_normal, game.ship.ship_image_thrust):
+        if image is None:
+            continue
+        for index in range(config.ROTATION_FRAMES):
+            yield game.rotation_cache.get_frame(image, index * 360 / config.ROTATION_FRAMES)
+
+    # Ракета и кадры взрыва
+    yield Bullet(0, 0, 0, config)
+    yield Explosion(0, 0, config)
+
+    # Текст интерфейса и значок жизни в начале игры
+    yield text_cache.render(font, f"{SCORE_TEXT}{config.INITIAL_SCORE}", WHITE)
+    yield text_cache.render(font, f"{LIVES_TEXT}{config.INITIAL_LIVES}", WHITE)
+    if game.life_icon is None:
+        game.life_icon = game.ship.ship_image_normal
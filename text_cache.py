@@ -0,0 +1,72 @@
+import io
+import pygame
+from collections import OrderedDict
+from config import *
+
+
+class TextCache:
+    """Кэш отрисованных строк с вытеснением давно не использованных (LRU)"""
+
+    def __init__(self, capacity=TEXT_CACHE_SIZE):
+        self.capacity = capacity
+        # Ключ - (текст, шрифт, цвет, сглаживание), значение - готовый Surface
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        """Отрисованная строка (из кэша или новая)"""
+        key = (text, font, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def get_stats(self):
+        """Счетчики попаданий и промахов кэша"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.surfaces),
+        }
+
+
+# Загруженные шрифты: поиск системного шрифта выполняется один раз
+fonts = {}
+# Содержимое файлов шрифтов из пакета ресурсов (ключ - жирный ли шрифт)
+font_files = {}
+
+
+def get_font(size, bold=False):
+    """Шрифт игры заданного размера
+
+    Если в config.py задан FONT_PATH или загружен пакет ресурсов, шрифт
+    создается без медленного перебора системных шрифтов.
+    """
+    key = (size, bold)
+    font = fonts.get(key)
+    if font is None:
+        if FONT_PATH:
+            font = pygame.font.Font(FONT_PATH, size)
+            font.set_bold(bold)
+        elif bold in font_files:
+            font = pygame.font.Font(io.BytesIO(font_files[bold]), size)
+            # Отдельного жирного начертания нет - как и SysFont, утолщаем обычное
+            if bold and font_files[bold] == font_files.get(False):
+                font.set_bold(True)
+        else:
+            font = pygame.font.SysFont(FONT_NAME, size, bold=bold)
+        fonts[key] = font
+    return font
+
+
+# Единый кэш строк для всего процесса
+text_cache = TextCache()
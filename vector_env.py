@@ -0,0 +1,541 @@
+import argparse
+import math
+import multiprocessing
+import random
+import time
+import pygame
+from config import *
+from assets import asset_cache, get_rotation_cache
+from collisions import overlap_matrix, swept_hit_matrix, wrap_delta
+from entity_store import EntityStore
+from game_objects import Asteroid, Ship, placeholder_rng
+from lifecycle import SpawnScheduler
+from pools import serials
+from simulation import HeadlessSimulation
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def available():
+    """Доступна ли пакетная среда (нужен NumPy)"""
+    return np is not None
+
+
+# Действия: столбцы входного массива (N, len(ACTIONS)), ненулевое значение - клавиша нажата
+ACTIONS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_SPACE)
+# Наблюдение: корабль, затем ближайшие астероиды (по расстоянию до корабля)
+SHIP_OBSERVATION = ("x", "y", "vx", "vy", "sin", "cos")
+ASTEROID_OBSERVATION = ("dx", "dy", "vx", "vy", "size")  # dx, dy - относительно корабля; нет астероида - нули
+
+
+class GameStore(EntityStore):
+    """Сущности всех игр VectorEnv в общих массивах: поля EntityStore и номер игры
+
+    Новые сущности добавляются в конец, а уплотнение сохраняет порядок, поэтому
+    внутри каждой игры сущности идут в порядке появления, как в хранилище
+    отдельной игры. Изображения не хранятся (игры без отрисовки).
+    """
+
+    ARRAYS = EntityStore.ARRAYS + ("game",)
+
+    def __init__(self, capacity=ENTITY_STORE_CAPACITY):
+        super().__init__(capacity)
+        self.game = np.zeros(capacity, dtype=np.int64)
+        self.images = None
+
+    def append(self, obj, game):
+        """Перенос игрового объекта в массивы игры game"""
+        index = super().append(obj)
+        self.game[index] = game
+        return index
+
+    def extend(self, games, **columns):
+        """Добавление по сущности в каждую из игр games; поля, которых нет в columns, - как у append"""
+        count = len(games)
+        while self.count + count > self.capacity:
+            self.grow()
+        start = self.count
+        end = start + count
+        defaults = {"lifetime": np.inf, "max_age": np.inf, "image_index": -1}
+        for name in self.FIELDS:
+            getattr(self, name)[start:end] = columns.get(name, defaults.get(name, 0))
+        self.active[start:end] = True
+        self.game[start:end] = games
+        first = serials.reserve(count)
+        self.serial[start:end] = np.arange(first, first + count)
+        self.count = end
+
+    def counts(self, num_games):
+        """Число сущностей каждой игры"""
+        return np.bincount(self.game[:self.count], minlength=num_games)
+
+    def remove_games(self, games):
+        """Удаление всех сущностей игр, отмеченных в маске games"""
+        self.remove(games[self.game[:self.count]])
+
+
+def trig(angles):
+    """math.sin и math.cos углов в градусах, как у объектов игры (NumPy может округлять иначе)"""
+    radians = list(map(math.radians, angles.tolist()))
+    return np.array(list(map(math.sin, radians))), np.array(list(map(math.cos, radians)))
+
+
+def nose_distances(config):
+    """Расстояние от центра корабля до носа для каждого кадра поворота (как Ship.get_nose_position)"""
+    ship = Ship(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, config)
+    image = ship.ship_image_normal
+    atlas = get_rotation_cache(config).get_atlas(image)
+    # Изображение с двигателями того же размера, поэтому и его кадры той же высоты
+    return np.array([atlas.get_frame(image, index * atlas.step).get_height() // 2 + 5
+                     for index in range(atlas.frame_count)])
+
+
+class VectorEnv:
+    """N независимых игр без экрана, которые шагают вместе
+
+    step() принимает массив действий (N, len(ACTIONS)) и возвращает наблюдения,
+    награды (прирост очков за тик) и признаки конца игры массивами NumPy.
+    Закончившаяся игра сразу начинается заново, а step возвращает уже ее первое
+    наблюдение.
+
+    Состояние всех игр лежит в общих массивах: корабли - по одному на игру,
+    ракеты и астероиды - в GameStore с номером игры. Управление, движение,
+    перенос через край, время жизни, столкновения и наблюдения считаются одним
+    набором операций NumPy сразу для всех игр. В цикле Python остаются только
+    редкие события - появление астероидов и осколков: они создаются теми же
+    Asteroid.reset и reset_fragment с генератором своей игры. Поэтому каждая игра
+    идет так же, как GameLogic с тем же зерном и параметрами (без поворота
+    изображений): те же столкновения, очки и наблюдения.
+    """
+
+    def __init__(self, num_envs, seed=0, max_ticks=None, nearest=ENV_NEAREST_ASTEROIDS, tick_ms=None, **overrides):
+        self.num_envs = num_envs
+        self.config = config = GameConfig(**{"ROTATE_SPRITES": False, **overrides})
+        # Длина эпизода и тика по умолчанию - из параметров игр (с учетом переопределенного FPS)
+        self.max_ticks = max_ticks if max_ticks is not None else config.ENV_MAX_TICKS
+        self.tick_ms = tick_ms if tick_ms is not None else 1000 / config.FPS
+        self.nearest = nearest
+        self.observation_size = len(SHIP_OBSERVATION) + nearest * len(ASTEROID_OBSERVATION)
+        asset_cache.convert = False
+
+        # Генераторы случайных чисел игр - как у GameLogic(seed=seed + index)
+        self.rngs = [random.Random(seed + index) for index in range(num_envs)]
+        self.spawner = SpawnScheduler(config)
+        # Через этот объект создаются астероиды и осколки; его поля переносятся в массивы
+        self.asteroid = Asteroid(rng=placeholder_rng, config=config)
+        self.nose_distances = nose_distances(config)
+        self.rotation_step = 360.0 / len(self.nose_distances)
+
+        # Корабли
+        self.ship_x = np.zeros(num_envs)
+        self.ship_y = np.zeros(num_envs)
+        self.ship_vx = np.zeros(num_envs)
+        self.ship_vy = np.zeros(num_envs)
+        self.ship_angle = np.zeros(num_envs)
+        self.thrusting = np.zeros(num_envs, dtype=bool)
+        self.bullets = GameStore()
+        self.asteroids = GameStore()
+
+        # Состояние игр: очки, жизни, таймер появления астероидов, тики эпизода, время выстрела
+        self.scores = np.zeros(num_envs, dtype=np.int64)
+        self.lives = np.zeros(num_envs, dtype=np.int64)
+        self.timers = np.zeros(num_envs, dtype=np.int64)
+        self.ticks = np.zeros(num_envs, dtype=np.int64)
+        self.last_shots = np.zeros(num_envs)
+        # Итоги закончившихся эпизодов
+        self.episodes = 0
+        self.final_scores = np.zeros(num_envs, dtype=np.int64)
+        self.final_ticks = np.zeros(num_envs, dtype=np.int64)
+        self.reset_games(np.ones(num_envs, dtype=bool))
+
+    def reset(self):
+        """Новая игра во всех средах; возвращает наблюдения"""
+        self.reset_games(np.ones(self.num_envs, dtype=bool))
+        return self.observe()
+
+    def reset_env(self, index):
+        """Новая игра в одной среде"""
+        games = np.zeros(self.num_envs, dtype=bool)
+        games[index] = True
+        self.reset_games(games)
+
+    def reset_games(self, games):
+        """Новая игра в средах, отмеченных в маске games (как GameLogic.reset_game; генераторы продолжаются)"""
+        config = self.config
+        self.bullets.remove_games(games)
+        self.asteroids.remove_games(games)
+        self.reset_ships(games)
+        self.scores[games] = config.INITIAL_SCORE
+        self.lives[games] = config.INITIAL_LIVES
+        self.timers[games] = 0
+        self.ticks[games] = 0
+        # Выстрелов еще не было
+        self.last_shots[games] = -np.inf
+
+    def reset_ships(self, games):
+        """Новый корабль в центре экрана в играх games (маска или индексы)"""
+        self.ship_x[games] = SCREEN_WIDTH // 2
+        self.ship_y[games] = SCREEN_HEIGHT // 2
+        self.ship_vx[games] = 0
+        self.ship_vy[games] = 0
+        self.ship_angle[games] = 0
+        self.thrusting[games] = False
+
+    def step(self, actions):
+        """Один тик всех игр; возвращает (наблюдения, награды, признаки конца)"""
+        left, right, thrust, shoot = (np.asarray(actions) != 0).T
+        scores = self.scores.copy()
+        self.steer(left, right, thrust, shoot)
+        self.update_objects()
+        self.check_collisions()
+        self.ticks += 1
+        rewards = (self.scores - scores).astype(np.float32)
+        dones = (self.lives <= 0) | (self.ticks >= self.max_ticks)
+        if dones.any():
+            self.episodes += int(dones.sum())
+            self.final_scores[dones] = self.scores[dones]
+            self.final_ticks[dones] = self.ticks[dones]
+            self.reset_games(dones)
+        return self.observe(), rewards, dones
+
+    def steer(self, left, right, thrust, shoot):
+        """Управление кораблями всех игр (как GameLogic.steer_ship)"""
+        config = self.config
+        angle = self.ship_angle
+        angle[left] -= config.SHIP_ROTATION_SPEED
+        angle[right] += config.SHIP_ROTATION_SPEED
+
+        self.thrusting[:] = thrust
+        index = np.flatnonzero(thrust)
+        if len(index):
+            sin, cos = trig(angle[index])
+            self.ship_vx[index] += sin * config.SHIP_ACCELERATION
+            self.ship_vy[index] += -cos * config.SHIP_ACCELERATION
+
+        now = (self.ticks * self.tick_ms).astype(np.int64)
+        index = np.flatnonzero(shoot & (now - self.last_shots > config.SHOT_COOLDOWN_MS))
+        if len(index):
+            angles = angle[index]
+            sin, cos = trig(angles)
+            # Высота кадра поворота корабля, как rect после update_image_rotation
+            frames = np.rint(-angles / self.rotation_step).astype(np.int64) % len(self.nose_distances)
+            distance = self.nose_distances[frames]
+            self.bullets.extend(index, x=self.ship_x[index] + sin * distance, y=self.ship_y[index] - cos * distance,
+                                vx=sin * config.BULLET_SPEED, vy=-cos * config.BULLET_SPEED, angle=angles,
+                                size=config.BULLET_SIZE, lifetime=config.BULLET_LIFETIME)
+            self.last_shots[index] = now[index]
+
+    def update_objects(self):
+        """Движение объектов и появление астероидов во всех играх (как GameLogic.update_objects)"""
+        # Корабли: трение при выключенных двигателях, движение и перенос через край
+        coasting = ~self.thrusting
+        self.ship_vx[coasting] *= self.config.SHIP_FRICTION
+        self.ship_vy[coasting] *= self.config.SHIP_FRICTION
+        x = self.ship_x
+        y = self.ship_y
+        x += self.ship_vx
+        y += self.ship_vy
+        left = x < 0
+        right = x > SCREEN_WIDTH
+        x[left] = SCREEN_WIDTH
+        x[right] = 0
+        top = y < 0
+        bottom = y > SCREEN_HEIGHT
+        y[top] = SCREEN_HEIGHT
+        y[bottom] = 0
+
+        self.bullets.update()
+        self.bullets.compact()
+
+        # Появление астероидов: по одному в играх, у которых подошел таймер
+        self.timers += 1
+        ready = np.flatnonzero(self.timers >= self.spawner.interval)
+        if len(ready):
+            counts = self.asteroids.counts(self.num_envs)
+            for index in ready.tolist():
+                if self.spawner.allowed(counts[index]):
+                    self.asteroid.reset(rng=self.rngs[index])
+                    self.asteroids.append(self.asteroid, index)
+            self.timers[ready] = 0
+
+        self.asteroids.update()
+        self.asteroids.compact()
+
+    def bullet_hits(self):
+        """Пары (ракета, астероид) попаданий во всех играх, как EntityStore.collide каждой игры"""
+        bullets = self.bullets
+        asteroids = self.asteroids
+        m = bullets.count
+        n = asteroids.count
+        if m == 0 or n == 0:
+            return []
+        # Астероиды по играм (внутри игры - в порядке хранилища)
+        order = np.argsort(asteroids.game[:n], kind="stable")
+        counts = asteroids.counts(self.num_envs)
+        starts = np.cumsum(counts) - counts
+
+        # Каждая ракета проверяется со всеми астероидами своей игры
+        game = bullets.game[:m]
+        pair_counts = counts[game]
+        total = int(pair_counts.sum())
+        if total == 0:
+            return []
+        bullet = np.repeat(np.arange(m), pair_counts)
+        offsets = np.cumsum(pair_counts) - pair_counts - starts[game]
+        target = order[np.arange(total) - np.repeat(offsets, pair_counts)]
+        hit = swept_hit_matrix(bullets.x[bullet], bullets.y[bullet], bullets.vx[bullet], bullets.vy[bullet],
+                               bullets.size[bullet], asteroids.x[target], asteroids.y[target], asteroids.vx[target],
+                               asteroids.vy[target], asteroids.size[target])
+
+        # Ракета поражает первый еще не пораженный астероид своей игры (попадания идут по ракетам)
+        pairs = []
+        taken = set()
+        last = -1
+        for bullet_index, index in zip(bullet[hit].tolist(), target[hit].tolist()):
+            if bullet_index != last and index not in taken:
+                taken.add(index)
+                last = bullet_index
+                pairs.append((bullet_index, index))
+        return pairs
+
+    def check_collisions(self):
+        """Столкновения во всех играх: очки, жизни и осколки (как GameLogic.check_collisions_store)"""
+        config = self.config
+        asteroids = self.asteroids
+        fragments = []
+        pairs = self.bullet_hits()
+        if pairs:
+            bullet_indices, indices = (list(column) for column in zip(*pairs))
+            games = self.bullets.game[bullet_indices]
+            np.add.at(self.scores, games, 1)
+            if config.ASTEROID_SPLIT:
+                rows = zip(games.tolist(), asteroids.x[indices].tolist(), asteroids.y[indices].tolist(),
+                           asteroids.vx[indices].tolist(), asteroids.vy[indices].tolist(),
+                           asteroids.size[indices].astype(int).tolist(),
+                           asteroids.image_index[indices].astype(int).tolist())
+                fragments = [row for row in rows
+                             if int(row[5] * config.ASTEROID_FRAGMENT_SCALE) >= config.ASTEROID_MIN_SIZE]
+            asteroids.remove_indices(indices)
+            self.bullets.remove_indices(bullet_indices)
+
+        # Корабль сталкивается с первым задетым астероидом своей игры
+        n = asteroids.count
+        if n:
+            game = asteroids.game[:n]
+            index = np.flatnonzero(overlap_matrix(self.ship_x[game], self.ship_y[game], config.SHIP_SIZE,
+                                                  asteroids.x[:n], asteroids.y[:n], asteroids.size[:n]))
+            if len(index):
+                games, first = np.unique(game[index], return_index=True)
+                self.lives[games] -= 1
+                self.reset_ships(games[self.lives[games] > 0])
+                asteroids.remove_indices(index[first].tolist())
+
+        if fragments:
+            self.spawn_fragments(fragments)
+
+    def spawn_fragments(self, fragments):
+        """Осколки уничтоженных за тик астероидов в пределах бюджета каждой игры (как GameLogic.spawn_fragments)"""
+        config = self.config
+        counts = self.asteroids.counts(self.num_envs)
+        budgets = {}
+        for game, x, y, vx, vy, size, image_index in fragments:
+            rng = self.rngs[game]
+            budget = budgets.get(game, config.ASTEROID_FRAGMENT_BUDGET)
+            fragment_size = int(size * config.ASTEROID_FRAGMENT_SCALE)
+            # Осколки разлетаются в равные стороны от случайного направления
+            base_angle = rng.uniform(0, 2 * math.pi)
+            for i in range(config.ASTEROID_FRAGMENTS):
+                if budget <= 0 or not self.spawner.allowed(counts[game]):
+                    break
+                angle = base_angle + 2 * math.pi * i / config.ASTEROID_FRAGMENTS
+                dx = math.cos(angle)
+                dy = math.sin(angle)
+                self.asteroid.reset_fragment(x + dx * fragment_size / 2, y + dy * fragment_size / 2,
+                                             vx + dx * config.ASTEROID_FRAGMENT_SPEED,
+                                             vy + dy * config.ASTEROID_FRAGMENT_SPEED,
+                                             fragment_size, image_index, rng)
+                self.asteroids.append(self.asteroid, game)
+                counts[game] += 1
+                budget -= 1
+            budgets[game] = budget
+
+    def observe(self):
+        """Наблюдения всех игр: массив (N, observation_size)"""
+        n = self.num_envs
+        observations = np.zeros((n, self.observation_size), dtype=np.float32)
+        observations[:, 0] = self.ship_x
+        observations[:, 1] = self.ship_y
+        observations[:, 2] = self.ship_vx
+        observations[:, 3] = self.ship_vy
+        angle = np.radians(self.ship_angle)
+        observations[:, 4] = np.sin(angle)
+        observations[:, 5] = np.cos(angle)
+        asteroids = self.asteroids
+        count = asteroids.count
+        if self.nearest == 0 or count == 0:
+            return observations
+
+        owner = asteroids.game[:count]
+        counts = asteroids.counts(n)
+        # Смещение - кратчайшее на торе, как при проверке столкновений
+        rows = np.column_stack((wrap_delta(asteroids.x[:count] - self.ship_x[owner], SCREEN_WIDTH),
+                                wrap_delta(asteroids.y[:count] - self.ship_y[owner], SCREEN_HEIGHT),
+                                asteroids.vx[:count], asteroids.vy[:count], asteroids.size[:count]))
+
+        # Астероиды всех игр сортируются сразу: по игре, внутри игры - по расстоянию
+        order = np.lexsort((np.hypot(rows[:, 0], rows[:, 1]), owner))
+        rank = np.arange(count) - np.repeat(np.cumsum(counts) - counts, counts)
+        order = order[rank < self.nearest]
+        rank = rank[rank < self.nearest]
+        width = len(ASTEROID_OBSERVATION)
+        columns = len(SHIP_OBSERVATION) + rank[:, None] * width + np.arange(width)
+        observations[owner[order, None], columns] = rows[order]
+        return observations
+
+
+def run_worker(connection, num_envs, seed, kwargs):
+    """Процесс ParallelVectorEnv: своя VectorEnv, команды приходят через канал"""
+    env = VectorEnv(num_envs, seed=seed, **kwargs)
+    while True:
+        command, data = connection.recv()
+        if command == "step":
+            connection.send(env.step(data))
+        elif command == "reset":
+            connection.send(env.reset())
+        elif command == "stats":
+            connection.send((env.episodes, env.final_scores, env.final_ticks))
+        else:
+            break
+    connection.close()
+
+
+class ParallelVectorEnv:
+    """VectorEnv, разделенная между процессами (по части игр на процесс), с тем же интерфейсом
+
+    Игры каждого процесса шагают вместе, процессы - параллельно на разных ядрах.
+    """
+
+    def __init__(self, num_envs, workers=None, seed=0, **kwargs):
+        workers = max(1, min(num_envs, workers or multiprocessing.cpu_count()))
+        self.num_envs = num_envs
+        # Игры делятся на непрерывные части; зерна - как у VectorEnv с тем же числом игр
+        bounds = [num_envs * worker // workers for worker in range(workers + 1)]
+        self.slices = [slice(start, end) for start, end in zip(bounds, bounds[1:])]
+        self.connections = []
+        self.processes = []
+        for part in self.slices:
+            connection, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=run_worker, daemon=True,
+                                              args=(child, part.stop - part.start, seed + part.start, kwargs))
+            process.start()
+            child.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+
+    @property
+    def episodes(self):
+        """Число закончившихся эпизодов во всех процессах"""
+        for connection in self.connections:
+            connection.send(("stats", None))
+        return sum(connection.recv()[0] for connection in self.connections)
+
+    def reset(self):
+        """Новая игра во всех средах; возвращает наблюдения"""
+        for connection in self.connections:
+            connection.send(("reset", None))
+        return np.concatenate([connection.recv() for connection in self.connections])
+
+    def step(self, actions):
+        """Один тик всех игр; возвращает (наблюдения, награды, признаки конца)"""
+        actions = np.asarray(actions)
+        for connection, part in zip(self.connections, self.slices):
+            connection.send(("step", actions[part]))
+        results = [connection.recv() for connection in self.connections]
+        return tuple(np.concatenate(arrays) for arrays in zip(*results))
+
+    def close(self):
+        """Остановка процессов"""
+        for connection in self.connections:
+            connection.send(("close", None))
+            connection.close()
+        for process in self.processes:
+            process.join()
+
+
+def observe_game(game, nearest=ENV_NEAREST_ASTEROIDS):
+    """Наблюдение одной игры без NumPy (как строка VectorEnv.observe); для сравнения"""
+    ship = game.ship
+    angle = math.radians(ship.angle)
+    observation = [ship.x, ship.y, ship.vx, ship.vy, math.sin(angle), math.cos(angle)]
+    asteroids = sorted(((wrap_delta(asteroid.x - ship.x, SCREEN_WIDTH), wrap_delta(asteroid.y - ship.y, SCREEN_HEIGHT),
+                         asteroid.vx, asteroid.vy, asteroid.size)
+                        for asteroid in game.asteroids), key=lambda row: math.hypot(row[0], row[1]))
+    for row in asteroids[:nearest]:
+        observation.extend(row)
+    observation.extend([0] * (len(ASTEROID_OBSERVATION) * (nearest - min(nearest, len(asteroids)))))
+    return observation
+
+
+def run_separate(num_envs, steps, actions, seed, max_ticks, config):
+    """Те же шаги отдельными играми HeadlessSimulation с той же конфигурацией; возвращает число шагов в секунду"""
+    # Стратегия всех игр отдает клавиши, выбранные перед шагом очередной игры
+    pressed = []
+
+    def policy(game, tick):
+        return pressed
+
+    simulations = [HeadlessSimulation(policy, seed=seed + index, config=config) for index in range(num_envs)]
+    rows = actions.tolist()
+    started = time.perf_counter()
+    for step in range(steps):
+        for index, simulation in enumerate(simulations):
+            pressed[:] = [key for key, down in zip(ACTIONS, rows[step][index]) if down]
+            simulation.step()
+            observe_game(simulation.game)
+            if simulation.game.game_state == "game_over" or simulation.tick >= max_ticks:
+                # Новый эпизод, как VectorEnv.reset_env: время идет заново, выстрелов не было
+                simulation.game.reset_game()
+                simulation.game.game_state = "playing"
+                simulation.game.last_shot = None
+                simulation.tick = 0
+    return num_envs * steps / (time.perf_counter() - started)
+
+
+def main():
+    """Замер производительности пакетной среды со случайными действиями"""
+    parser = argparse.ArgumentParser(description="Пакетная среда игры Астероиды")
+    parser.add_argument("--envs", type=int, default=64, help="число игр")
+    parser.add_argument("--steps", type=int, default=1000, help="число шагов")
+    parser.add_argument("--seed", type=int, default=0, help="начальное зерно")
+    parser.add_argument("--workers", type=int, default=1, help="число процессов (больше 1 - ParallelVectorEnv)")
+    parser.add_argument("--compare", action="store_true", help="сравнить с циклом по отдельным играм")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    actions = rng.random((args.steps, args.envs, len(ACTIONS))) < 0.3
+
+    if args.workers > 1:
+        env = ParallelVectorEnv(args.envs, args.workers, seed=args.seed)
+    else:
+        env = VectorEnv(args.envs, seed=args.seed)
+    env.reset()
+    started = time.perf_counter()
+    for step in range(args.steps):
+        env.step(actions[step])
+    rate = args.envs * args.steps / (time.perf_counter() - started)
+    print(f"{type(env).__name__}: {args.envs} игр, {args.workers} процессов, {rate:.0f} шагов/с, "
+          f"эпизодов завершено {env.episodes}")
+    if args.workers > 1:
+        env.close()
+
+    if args.compare:
+        config = GameConfig(ROTATE_SPRITES=False)
+        separate = run_separate(args.envs, args.steps, actions, args.seed, ENV_MAX_TICKS, config)
+        print(f"Отдельные игры: {separate:.0f} шагов/с (среда быстрее в {rate / separate:.2f} раза)")
+
+
+if __name__ == "__main__":
+    main()